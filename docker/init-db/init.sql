@@ -6,3 +6,14 @@ CREATE TABLE IF NOT EXISTS countries(
     country_id SERIAL PRIMARY KEY,
     country_name VARCHAR(30) UNIQUE NOT NULL
 );
+
+CREATE TABLE IF NOT EXISTS leagues(
+    league_id SERIAL PRIMARY KEY,
+    league_name VARCHAR(50) UNIQUE NOT NULL,
+    country_id INTEGER REFERENCES countries(country_id)
+);
+
+CREATE TABLE IF NOT EXISTS clubs(
+    club_id VARCHAR(8) PRIMARY KEY,
+    club_name VARCHAR(100) NOT NULL
+);
@@ -0,0 +1,149 @@
+import logging
+import time
+
+from scrapy import Request
+from scrapy.dupefilters import RFPDupeFilter
+from scrapy.utils.job import job_dir
+from scrapy.utils.project import data_path
+from w3lib.url import canonicalize_url
+
+from .httpcache import page_class
+from .utils.bloom import BloomFilter
+from .utils.urls import PageType, route
+
+logger = logging.getLogger(__name__)
+
+# Sent by SeenPagesMiddleware once a callback handled a response without error
+page_parsed = object()
+
+# Only pages that link nowhere new are skipped; hubs are always fetched
+LEAF_PAGES = (PageType.PLAYER, PageType.SQUAD)
+
+
+class PersistentDupeFilter(RFPDupeFilter):
+    """
+    Dupefilter that also remembers pages parsed in earlier runs.
+
+    Every player and squad page whose callback succeeded is added to a Bloom
+    filter in ``SEEN_URLS_FILE`` (see ``SeenPagesMiddleware``). The key is
+    made from the spider, the page class (see ``httpcache.page_class``), a
+    freshness period and the canonical URL. A later run that schedules the
+    same page within the same period skips it. The period is
+    ``SEEN_URLS_TTLS[page class]`` seconds long. With a TTL of 0 the period
+    never ends, which suits finished seasons. Page classes missing from
+    ``SEEN_URLS_TTLS`` are never skipped.
+
+    Competition, history and other hub pages are never skipped, since the
+    pages they link to would be lost with them, and neither are start
+    requests. ``SEEN_URLS_IGNORE`` turns skipping off for one run while
+    still recording what it parses.
+
+    Keys carry the spider name because spiders read different things from the
+    same page. Requests with ``dont_filter`` bypass the filter as usual.
+    """
+
+    def __init__(self, path=None, debug=False, *, fingerprinter=None,
+                 seen: BloomFilter | None = None, ttls: dict | None = None,
+                 spider_name: str = "", stats=None, ignore: bool = False):
+        super().__init__(path, debug, fingerprinter=fingerprinter)
+        self.seen = seen
+        self.ttls = ttls or {}
+        self.spider_name = spider_name
+        self.stats = stats
+        self.ignore = ignore
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        seen = None
+        if settings.getbool("SEEN_URLS_ENABLED", True):
+            seen = BloomFilter(
+                data_path(settings.get("SEEN_URLS_FILE", "seen_urls.bloom")),
+                capacity=settings.getint("SEEN_URLS_CAPACITY", 20_000_000),
+                error_rate=settings.getfloat("SEEN_URLS_ERROR_RATE", 0.001),
+            )
+        dupefilter = cls(
+            job_dir(settings),
+            settings.getbool("DUPEFILTER_DEBUG"),
+            fingerprinter=crawler.request_fingerprinter,
+            seen=seen,
+            ttls=settings.getdict("SEEN_URLS_TTLS"),
+            spider_name=crawler.spider.name if crawler.spider else "",
+            stats=crawler.stats,
+            ignore=settings.getbool("SEEN_URLS_IGNORE"),
+        )
+        if seen is not None:
+            crawler.signals.connect(dupefilter.page_parsed, signal=page_parsed)
+        return dupefilter
+
+    def key(self, url: str, now: float | None = None) -> bytes | None:
+        """Bloom filter key of a URL, or None if the page is never skipped."""
+        if route(url).page_type not in LEAF_PAGES:
+            return None
+        page = page_class(url)
+        ttl = self.ttls.get(page)
+        if ttl is None:
+            return None
+        period = int((time.time() if now is None else now) // ttl) if ttl else 0
+        return f"{self.spider_name}|{page}|{period}|{canonicalize_url(url)}".encode()
+
+    def request_seen(self, request: Request) -> bool:
+        if super().request_seen(request):
+            return True
+        if (self.seen is None or self.ignore or request.method != "GET"
+                or request.meta.get("is_start_request")):
+            return False
+        key = self.key(request.url)
+        if key is not None and key in self.seen:
+            self._inc_stat("seen_urls/skipped")
+            if self.debug:
+                self.logger.debug(f"Skipped page parsed in an earlier run: {request.url}")
+            return True
+        return False
+
+    def page_parsed(self, response, request, spider):
+        if response.status != 200 or request.method != "GET":
+            return
+        key = self.key(request.url)
+        if key is not None and self.seen.add(key):
+            self._inc_stat("seen_urls/added")
+
+    def close(self, reason: str) -> None:
+        super().close(reason)
+        if self.seen is not None:
+            self.seen.close()
+
+    def _inc_stat(self, key: str):
+        if self.stats:
+            self.stats.inc_value(key)
+
+
+class SeenPagesMiddleware:
+    """
+    Spider middleware that sends ``page_parsed`` once a callback is done.
+
+    The signal goes out only after everything the callback returned has
+    been passed on without an exception, so a page whose callback failed
+    is not remembered and gets fetched again by the next run.
+    """
+
+    def __init__(self, crawler):
+        self.crawler = crawler
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(crawler)
+
+    def process_spider_output(self, response, result, spider):
+        yield from result
+        self._parsed(response, spider)
+
+    async def process_spider_output_async(self, response, result, spider):
+        async for item_or_request in result:
+            yield item_or_request
+        self._parsed(response, spider)
+
+    def _parsed(self, response, spider):
+        self.crawler.signals.send_catch_log(
+            page_parsed, response=response, request=response.request, spider=spider
+        )
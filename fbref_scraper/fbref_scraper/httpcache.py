@@ -0,0 +1,214 @@
+import hashlib
+import logging
+import sqlite3
+import time
+import zlib
+from datetime import date
+from pathlib import Path
+
+from scrapy import Spider
+from scrapy.http import Headers, Request, Response
+from scrapy.responsetypes import responsetypes
+from scrapy.settings import BaseSettings
+from scrapy.utils.project import data_path
+from w3lib.http import headers_dict_to_raw, headers_raw_to_dict
+import zstandard
+
+from .utils.planner import current_season_start
+from .utils.urls import PageType, route
+
+logger = logging.getLogger(__name__)
+
+def page_class(url: str, today: date | None = None) -> str:
+    """Sort a fbref URL into one of the cache lifetime classes."""
+    page = route(url)
+    if page.page_type is PageType.HISTORY:
+        return "history"
+    if page.season_end is not None and page.season_end <= current_season_start(today):
+        return "finished_season"
+    if page.page_type is PageType.SQUAD:
+        return "squad"
+    if page.page_type in (PageType.COMPETITION, PageType.COMPETITION_SEASON):
+        return "current_season"
+    return "default"
+
+
+class Codec:
+    """Compresses cached bodies with zstd; zlib entries from older caches still decompress."""
+
+    name = "zstd"
+
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    @staticmethod
+    def decompress(codec: str, data: bytes) -> bytes:
+        if codec == "zstd":
+            return zstandard.ZstdDecompressor().decompress(data)
+        return zlib.decompress(data)
+
+
+class FbrefCacheStorage:
+    """
+    HTTP cache storage with compressed, content-addressed bodies.
+
+    Responses are indexed by request fingerprint in a SQLite file inside
+    ``HTTPCACHE_DIR``. Bodies are stored once per content hash, so pages
+    that are fetched under several URLs share their body. How long an entry
+    stays fresh depends on the page class (see ``page_class``) and
+    ``HTTPCACHE_TTLS``; a lifetime of 0 never expires. Once the compressed
+    bodies exceed ``HTTPCACHE_MAX_SIZE`` bytes, the least recently used
+    entries are evicted. The size is read from the database, so several
+    processes sharing one cache directory all see the same total.
+    """
+
+    def __init__(self, settings: BaseSettings):
+        self.cachedir = Path(data_path(settings["HTTPCACHE_DIR"]))
+        self.default_ttl = settings.getint("HTTPCACHE_EXPIRATION_SECS")
+        self.ttls: dict[str, int] = settings.getdict("HTTPCACHE_TTLS")
+        self.max_size = settings.getint("HTTPCACHE_MAX_SIZE")
+        self.codec = Codec(settings.getint("HTTPCACHE_COMPRESSION_LEVEL", 10))
+        self.db: sqlite3.Connection | None = None
+
+    def open_spider(self, spider: Spider) -> None:
+        self.cachedir.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.cachedir / "fbref_cache.sqlite", timeout=30)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS responses (
+                fingerprint TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                headers BLOB NOT NULL,
+                body_hash TEXT NOT NULL,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+            CREATE INDEX IF NOT EXISTS responses_body_hash ON responses (body_hash);
+            CREATE TABLE IF NOT EXISTS bodies (
+                hash TEXT PRIMARY KEY,
+                codec TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                data BLOB NOT NULL
+            );
+        """)
+        self._fingerprinter = spider.crawler.request_fingerprinter
+        logger.debug(
+            f"Using fbref cache storage in {self.cachedir} ({self.total_size()} bytes)",
+            extra={"spider": spider},
+        )
+
+    def close_spider(self, spider: Spider) -> None:
+        if self.db:
+            self.db.close()
+            self.db = None
+
+    def retrieve_response(self, spider: Spider, request: Request) -> Response | None:
+        """Return the cached response, or None if it is missing or expired."""
+        return self._load(request, check_ttl=True)
+
+    def stale_response(self, spider: Spider, request: Request) -> Response | None:
+        """Return the cached response even if it expired, e.g. to answer a 304."""
+        return self._load(request, check_ttl=False)
+
+    def _load(self, request: Request, check_ttl: bool) -> Response | None:
+        fingerprint = self._fingerprinter.fingerprint(request).hex()
+        row = self.db.execute(
+            "SELECT r.url, r.status, r.headers, r.stored_at, b.codec, b.data "
+            "FROM responses r JOIN bodies b ON b.hash = r.body_hash "
+            "WHERE r.fingerprint = ?",
+            (fingerprint,),
+        ).fetchone()
+        if row is None:
+            return None
+        url, status, raw_headers, stored_at, codec, data = row
+        ttl = self.ttl(request.url)
+        if check_ttl and 0 < ttl < time.time() - stored_at:
+            return None
+
+        self.db.execute(
+            "UPDATE responses SET accessed_at = ? WHERE fingerprint = ?",
+            (time.time(), fingerprint),
+        )
+        self.db.commit()
+        body = Codec.decompress(codec, data)
+        headers = Headers(headers_raw_to_dict(raw_headers))
+        respcls = responsetypes.from_args(headers=headers, url=url, body=body)
+        request.meta["cache_timestamp"] = stored_at
+        return respcls(url=url, status=status, headers=headers, body=body)
+
+    def store_response(self, spider: Spider, request: Request, response: Response) -> None:
+        """Store the response, reusing the stored body if the content is already known."""
+        fingerprint = self._fingerprinter.fingerprint(request).hex()
+        body_hash = hashlib.blake2b(response.body, digest_size=16).hexdigest()
+        now = time.time()
+
+        if self.db.execute("SELECT 1 FROM bodies WHERE hash = ?", (body_hash,)).fetchone() is None:
+            data = self.codec.compress(response.body)
+            self.db.execute(
+                "INSERT INTO bodies (hash, codec, size, data) VALUES (?, ?, ?, ?)",
+                (body_hash, self.codec.name, len(data), data),
+            )
+
+        previous = self.db.execute(
+            "SELECT body_hash FROM responses WHERE fingerprint = ?", (fingerprint,)
+        ).fetchone()
+        self.db.execute(
+            "INSERT OR REPLACE INTO responses "
+            "(fingerprint, url, status, headers, body_hash, stored_at, accessed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (fingerprint, response.url, response.status,
+             headers_dict_to_raw(response.headers), body_hash, now, now),
+        )
+        if previous and previous[0] != body_hash:
+            self._drop_orphan_bodies([previous[0]])
+        self.db.commit()
+
+        if 0 < self.max_size < self.total_size():
+            self._evict()
+
+    def ttl(self, url: str) -> int:
+        return self.ttls.get(page_class(url), self.default_ttl)
+
+    def total_size(self) -> int:
+        """Compressed size of all stored bodies, as other processes may have changed it."""
+        return self.db.execute("SELECT COALESCE(SUM(size), 0) FROM bodies").fetchone()[0]
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until the cache is at 90% of its limit."""
+        target = self.max_size * 0.9
+        evicted = 0
+        while (excess := self.total_size() - target) > 0:
+            rows = self.db.execute(
+                "SELECT r.fingerprint, r.body_hash, b.size "
+                "FROM responses r JOIN bodies b ON b.hash = r.body_hash "
+                "ORDER BY r.accessed_at LIMIT 100"
+            ).fetchall()
+            if not rows:
+                break
+            # Stop at the entry that frees enough; shared bodies are caught by the next pass
+            batch, freed = [], 0
+            for fingerprint, body_hash, size in rows:
+                batch.append((fingerprint, body_hash))
+                freed += size
+                if freed >= excess:
+                    break
+            self.db.executemany(
+                "DELETE FROM responses WHERE fingerprint = ?", [(fp,) for fp, _ in batch]
+            )
+            self._drop_orphan_bodies({body_hash for _, body_hash in batch})
+            evicted += len(batch)
+        self.db.commit()
+        logger.debug(f"Evicted {evicted} cached responses, {self.total_size()} bytes left")
+
+    def _drop_orphan_bodies(self, hashes) -> None:
+        for body_hash in hashes:
+            if self.db.execute(
+                "SELECT 1 FROM responses WHERE body_hash = ? LIMIT 1", (body_hash,)
+            ).fetchone():
+                continue
+            self.db.execute("DELETE FROM bodies WHERE hash = ?", (body_hash,))
@@ -3,6 +3,10 @@
 # See documentation in:
 # https://docs.scrapy.org/en/latest/topics/items.html
 
+import sys
+from dataclasses import dataclass
+from typing import ClassVar
+
 import scrapy
 
 
@@ -15,6 +19,13 @@ class FbrefScraperItem(scrapy.Item):
 class PlayerItem(scrapy.Item):
     player_id = scrapy.Field()
     player_name = scrapy.Field()
+    first_name = scrapy.Field()
+    last_name = scrapy.Field()
+    date_of_birth = scrapy.Field()
+    position = scrapy.Field()
+    nationality = scrapy.Field()
+    club = scrapy.Field()
+    url = scrapy.Field()
 
 
 class CountryItem(scrapy.Item):
@@ -31,6 +42,157 @@ class LeagueItem(scrapy.Item):
     league_id = scrapy.Field()
     league_name = scrapy.Field()
     country_id = scrapy.Field()
+    country = scrapy.Field()
+
+
+class CompetitionItem(scrapy.Item):
+    competition_id = scrapy.Field()
+    name = scrapy.Field()
+    country = scrapy.Field()
+    tier = scrapy.Field()
+    url = scrapy.Field()
+    seasons = scrapy.Field()
+
+
+class SeasonItem(scrapy.Item):
+    season_id = scrapy.Field()
+    year = scrapy.Field()
+    competition = scrapy.Field()
+    competition_url = scrapy.Field()
+    url = scrapy.Field()
+    clubs = scrapy.Field()
+
+
+class PlayerStatsItem(scrapy.Item):
+    player_id = scrapy.Field()
+    season = scrapy.Field()
+    club = scrapy.Field()
+    league = scrapy.Field()
+    position = scrapy.Field()
+    matches_played = scrapy.Field()
+    goals = scrapy.Field()
+    assists = scrapy.Field()
+    yellow_cards = scrapy.Field()
+    red_cards = scrapy.Field()
+    minutes_played = scrapy.Field()
+    url = scrapy.Field()
+
+
+class ColumnBatchItem(scrapy.Item):
+    # A whole table as a utils.columns.ColumnBatch, written as batch.item_type rows
+    batch = scrapy.Field()
+
+
+# Compact records
+#
+# Slotted dataclasses with the same fields as the items above, for crawls that
+# keep many rows in flight. ItemAdapter handles them like any other item, and
+# ``item_type`` names the item they stand in for, so pipelines and writers
+# treat a PlayerStatsRecord as a PlayerStatsItem. Values that repeat on
+# nearly every row (season, league, club, position) are interned, so the rows
+# share one string each instead of holding copies.
+
+
+def item_class_name(item) -> str:
+    """Name of the item class an item is handled as."""
+    return getattr(type(item), "item_type", None) or type(item).__name__
+
+
+def _intern(record, names: tuple[str, ...]) -> None:
+    for name in names:
+        value = getattr(record, name)
+        if type(value) is str:
+            setattr(record, name, sys.intern(value))
+
+
+@dataclass(slots=True, eq=False)
+class PlayerRecord:
+    item_type: ClassVar[str] = "PlayerItem"
+    interned: ClassVar[tuple[str, ...]] = ("position", "nationality", "club")
+
+    player_id: str | None = None
+    player_name: str | None = None
+    first_name: str | None = None
+    last_name: str | None = None
+    date_of_birth: str | None = None
+    position: str | None = None
+    nationality: str | None = None
+    club: str | None = None
+    url: str | None = None
+
+    def __post_init__(self):
+        _intern(self, self.interned)
+
+
+@dataclass(slots=True, eq=False)
+class ClubRecord:
+    item_type: ClassVar[str] = "ClubItem"
+    interned: ClassVar[tuple[str, ...]] = ("club_id", "club_name")
+
+    club_id: str | None = None
+    club_name: str | None = None
+
+    def __post_init__(self):
+        _intern(self, self.interned)
+
+
+@dataclass(slots=True, eq=False)
+class LeagueRecord:
+    item_type: ClassVar[str] = "LeagueItem"
+    interned: ClassVar[tuple[str, ...]] = ("league_id", "league_name", "country_id", "country")
+
+    league_id: str | None = None
+    league_name: str | None = None
+    country_id: str | None = None
+    country: str | None = None
+
+    def __post_init__(self):
+        _intern(self, self.interned)
+
+
+@dataclass(slots=True, eq=False)
+class PlayerStatsRecord:
+    item_type: ClassVar[str] = "PlayerStatsItem"
+    interned: ClassVar[tuple[str, ...]] = ("season", "club", "league", "position")
+
+    player_id: str | None = None
+    season: str | None = None
+    club: str | None = None
+    league: str | None = None
+    position: str | None = None
+    matches_played: int | None = None
+    goals: int | None = None
+    assists: int | None = None
+    yellow_cards: int | None = None
+    red_cards: int | None = None
+    minutes_played: int | None = None
+    url: str | None = None
+
+    def __post_init__(self):
+        _intern(self, self.interned)
+
+
+# Record class for each item class that has one
+RECORDS = {
+    record.item_type: record
+    for record in (PlayerRecord, ClubRecord, LeagueRecord, PlayerStatsRecord)
+}
 
 
-__all__ = ["FbrefScraperItem", "PlayerItem", "CountryItem", "ClubItem", "LeagueItem"]
+__all__ = [
+    "FbrefScraperItem",
+    "PlayerItem",
+    "CountryItem",
+    "ClubItem",
+    "LeagueItem",
+    "CompetitionItem",
+    "SeasonItem",
+    "PlayerStatsItem",
+    "ColumnBatchItem",
+    "PlayerRecord",
+    "ClubRecord",
+    "LeagueRecord",
+    "PlayerStatsRecord",
+    "RECORDS",
+    "item_class_name",
+]
@@ -1,40 +1,38 @@
 #!/usr/bin/env python3
-from typing import Tuple
-import re
-
-from dotenv.variables import Literal
-
 """
 Main runner script for FBRef scraper spiders.
-Provides easy commands to run different spiders and manage the scraping process.
+
+Runs the league, squad, player and statistics spiders as one chained crawl
+in a single process; each stage passes the URLs it finds to the next one in
+memory. Run from the project directory (next to scrapy.cfg):
+
+    python -m fbref_scraper.main
+    python -m fbref_scraper.main --until player_spider
+    python -m fbref_scraper.main --urls https://fbref.com/en/comps/9/2023-2024/2023-2024-Premier-League-Stats
 """
-import json
-import sys
-import subprocess
-from pathlib import Path
-import jsonlines
-import requests
-
-urls = [
-    "https://www.fbref.com/en/comps/9/2024-2025/2024-2025-Premier-League-Stats",
-    "https://www.fbref.com/en/comps/12/2024-2025/2024-2025-La-Liga-Stats",
-    "https://www.fbref.com/en/comps/11/2024-2025/2024-2025-Serie-A-Stats",
-    "https://www.fbref.com/en/comps/20/2024-2025/2024-2025-Bundesliga-Stats",
-    "https://www.fbref.com/en/comps/13/2024-2025/2024-2025-Ligue-1-Stats",
-]
-
-
-def _extract_season_and_league(url: str) -> dict[str, str]:
-    d = {}
-    pattern = r"https:\/\/w{3}.fbref.com\/en\/comps\/\d+\/\d{4}-\d{4}\/(\d{4}-\d{4}).([A-Za-z\-\d?]+)-Stats"
-    match = re.search(pattern, url)
-    if match:
-        d["season"] = match.group(1)
-        d["league"] = match.group(2)
-    return d
-
-for url in urls:
-    u = _extract_season_and_league(url)
-    print(u["league"])
+import argparse
+
+from fbref_scraper.orchestrator import run
+from fbref_scraper.spiders.league_spider import LeagueSpider
+from fbref_scraper.spiders.player_spider import PlayerSpider
+from fbref_scraper.spiders.squad_spider import SquadSpider
+from fbref_scraper.spiders.statistics_spider import StatisticsSpider
+
+STAGES = (LeagueSpider, SquadSpider, PlayerSpider, StatisticsSpider)
+
+
+def main(argv=None):
+    stage_names = [stage.name for stage in STAGES]
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--urls", help="comma separated league season pages to start from")
+    parser.add_argument("--until", choices=stage_names, default=stage_names[-1],
+                        help="last stage to run")
+    args = parser.parse_args(argv)
+
+    stages = STAGES[:stage_names.index(args.until) + 1]
+    kwargs = {"urls": args.urls} if args.urls else {}
+    run(stages, **kwargs)
 
 
+if __name__ == "__main__":
+    main()
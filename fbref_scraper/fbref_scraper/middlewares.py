@@ -3,11 +3,19 @@
 # See documentation in:
 # https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
+import sqlite3
+import time
+from pathlib import Path
+
 from scrapy import signals
+from scrapy.exceptions import NotConfigured
+from scrapy.utils.project import data_path
 
 # useful for handling different item types with a single interface
 from itemadapter import ItemAdapter
 
+from .httpcache import FbrefCacheStorage
+
 
 class FbrefScraperSpiderMiddleware:
     # Not all methods need to be defined. If a method is not defined,
@@ -54,47 +62,133 @@ class FbrefScraperSpiderMiddleware:
 
 
 class FbrefScraperDownloaderMiddleware:
-    # Not all methods need to be defined. If a method is not defined,
-    # scrapy acts as if the downloader middleware does not modify the
-    # passed objects.
+    """
+    Conditional revalidation of pages fetched before.
+
+    The ETag and Last-Modified validators of every 200 response are stored
+    per URL and sent back as ``If-None-Match`` / ``If-Modified-Since`` on
+    the next request for that URL. A 304 is answered with the page from the
+    HTTP cache, even if it expired there, and flagged ``not_modified`` so
+    the staleness history knows it did not change. If the cache has
+    dropped the page since, it is fetched again without validators.
+
+    Runs between the HTTP cache and the downloader, so only requests that
+    really go out are revalidated and the cache stores the full page.
+    Responses the cache serves are passed by untouched; validators are only
+    stored for pages that came from the network.
+    """
+
+    def __init__(self, store_dir: str, storage: FbrefCacheStorage, stats=None):
+        self.store_path = Path(data_path(store_dir)) / "validators.sqlite"
+        self.storage = storage
+        self.stats = stats
+        self.db: sqlite3.Connection | None = None
 
     @classmethod
     def from_crawler(cls, crawler):
         # This method is used by Scrapy to create your spiders.
-        s = cls()
+        settings = crawler.settings
+        # Pages are only kept by the HTTP cache, so a 304 needs it
+        if not settings.getbool("REVALIDATION_ENABLED") or not settings.getbool("HTTPCACHE_ENABLED"):
+            raise NotConfigured
+        s = cls(settings.get("REVALIDATION_DIR", "revalidation"),
+                FbrefCacheStorage(settings), crawler.stats)
         crawler.signals.connect(s.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(s.spider_closed, signal=signals.spider_closed)
         return s
 
     def process_request(self, request, spider):
-        # Called for each request that goes through the downloader
-        # middleware.
-
-        # Must either:
-        # - return None: continue processing this request
-        # - or return a Response object
-        # - or return a Request object
-        # - or raise IgnoreRequest: process_exception() methods of
-        #   installed downloader middleware will be called
+        if not self._applies(request):
+            return None
+        row = self.db.execute(
+            "SELECT etag, last_modified FROM validators WHERE url = ?", (request.url,)
+        ).fetchone()
+        if row is None:
+            return None
+        etag, last_modified = row
+        if etag:
+            request.headers.setdefault(b"If-None-Match", etag)
+        if last_modified:
+            request.headers.setdefault(b"If-Modified-Since", last_modified)
+        request.meta["revalidating"] = True
+        self._inc_stat("revalidation/sent")
         return None
 
     def process_response(self, request, response, spider):
-        # Called with the response returned from the downloader.
-
-        # Must either;
-        # - return a Response object
-        # - return a Request object
-        # - or raise IgnoreRequest
+        # Pages served by the HTTP cache never went out, so there is nothing
+        # new to learn from them
+        if not self._applies(request) or "cached" in response.flags:
+            return response
+        if response.status == 304 and request.meta.get("revalidating"):
+            return self._cached_response(request, response, spider)
+        if response.status == 200:
+            self._store(request, response)
         return response
 
-    def process_exception(self, request, exception, spider):
-        # Called when a download handler or a process_request()
-        # (from other downloader middleware) raises an exception.
-
-        # Must either:
-        # - return None: continue processing this exception
-        # - return a Response object: stops process_exception() chain
-        # - return a Request object: stops process_exception() chain
-        pass
-
     def spider_opened(self, spider):
         spider.logger.info("Spider opened: %s" % spider.name)
+        self.store_path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.store_path, timeout=30)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        columns = {row[1] for row in self.db.execute("PRAGMA table_info(validators)")}
+        if "body" in columns:
+            # Older stores kept a copy of every page; validators are cheap to learn again
+            self.db.execute("DROP TABLE validators")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS validators (
+                url TEXT PRIMARY KEY,
+                etag BLOB,
+                last_modified BLOB,
+                stored_at REAL NOT NULL
+            )
+        """)
+        self.storage.open_spider(spider)
+
+    def spider_closed(self, spider):
+        if self.db:
+            self.db.close()
+            self.db = None
+            self.storage.close_spider(spider)
+
+    def _applies(self, request) -> bool:
+        return (
+            self.db is not None
+            and request.method == "GET"
+            and not request.meta.get("dont_revalidate")
+        )
+
+    def _store(self, request, response):
+        etag = response.headers.get(b"ETag")
+        last_modified = response.headers.get(b"Last-Modified")
+        if not etag and not last_modified:
+            return
+        self.db.execute(
+            "INSERT OR REPLACE INTO validators (url, etag, last_modified, stored_at) "
+            "VALUES (?, ?, ?, ?)",
+            (request.url, etag, last_modified, time.time()),
+        )
+        self.db.commit()
+
+    def _cached_response(self, request, response, spider):
+        cached = self.storage.stale_response(spider, request)
+        if cached is None:
+            self._inc_stat("revalidation/refetched")
+            meta = {key: value for key, value in request.meta.items() if key != "revalidating"}
+            retry = request.replace(dont_filter=True, meta={**meta, "dont_revalidate": True})
+            for name in (b"If-None-Match", b"If-Modified-Since"):
+                retry.headers.pop(name, None)
+            return retry
+        headers = cached.headers.copy()
+        # Newer validators from the 304 replace the cached ones
+        for name in (b"ETag", b"Last-Modified", b"Date", b"Cache-Control", b"Expires"):
+            if name in response.headers:
+                headers[name] = response.headers[name]
+        self._inc_stat("revalidation/not_modified")
+        cached = cached.replace(headers=headers, flags=response.flags + ["not_modified"],
+                                request=request)
+        self._store(request, cached)
+        return cached
+
+    def _inc_stat(self, key: str):
+        if self.stats:
+            self.stats.inc_value(key)
@@ -0,0 +1,182 @@
+import logging
+import uuid
+from collections import deque
+from typing import Any, AsyncIterator, Callable, Sequence
+
+from scrapy import Request, Spider, signals
+from scrapy.crawler import CrawlerProcess
+from scrapy.exceptions import DontCloseSpider
+from scrapy.settings import Settings
+from scrapy.utils.project import get_project_settings
+
+from .scheduler import RequestBudget
+from .throttle import AdaptiveRateMiddleware
+from .utils.players import PlayerRegistry
+
+logger = logging.getLogger(__name__)
+
+
+class UrlQueue:
+    """
+    URLs one stage hands to the next, kept in memory.
+
+    Every URL is queued once. Listeners are called whenever URLs are added
+    or the queue is closed, so the next stage can schedule them right away
+    instead of waiting for its idle check.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pending: deque[tuple[str, dict]] = deque()
+        self.seen: set[str] = set()
+        self.closed = False
+        self.listeners: list[Callable[[], None]] = []
+
+    def __len__(self) -> int:
+        return len(self.pending)
+
+    def put(self, url: str, meta: dict | None = None) -> bool:
+        """Queue a URL; returns False if it was queued before or the queue is closed."""
+        if self.closed or url in self.seen:
+            return False
+        self.seen.add(url)
+        self.pending.append((url, meta or {}))
+        self._notify()
+        return True
+
+    def take(self) -> list[tuple[str, dict]]:
+        """Remove and return everything queued so far."""
+        taken = list(self.pending)
+        self.pending.clear()
+        return taken
+
+    def close(self):
+        """Mark the producing stage as finished."""
+        self.closed = True
+        self._notify()
+
+    @property
+    def done(self) -> bool:
+        return self.closed and not self.pending
+
+    def listen(self, listener: Callable[[], None]):
+        self.listeners.append(listener)
+
+    def _notify(self):
+        for listener in self.listeners:
+            listener()
+
+
+class StageSpider(Spider):
+    """
+    Spider that can run as one stage of a chained crawl.
+
+    Standalone it crawls ``urls`` (comma separated) or its ``start_urls``.
+    Given an ``inbox`` it crawls what the previous stage sends instead, and
+    stays open until that stage has finished and the inbox is empty.
+    ``emit`` passes a URL on to the next stage's ``outbox``; it does nothing
+    when the spider runs on its own. ``player_registry`` and
+    ``request_budget`` are shared by all stages of a run.
+    """
+
+    inbox: UrlQueue | None = None
+    outbox: UrlQueue | None = None
+    player_registry: PlayerRegistry | None = None
+    request_budget: RequestBudget | None = None
+
+    def __init__(self, urls: str | None = None, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if urls:
+            self.start_urls = urls.split(',')
+        if self.player_registry is None:
+            self.player_registry = PlayerRegistry()
+        self._opened = False
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        crawler.signals.connect(spider._spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(spider._spider_idle, signal=signals.spider_idle)
+        crawler.signals.connect(spider._spider_closed, signal=signals.spider_closed)
+        if spider.inbox is not None:
+            spider.inbox.listen(spider._feed)
+        return spider
+
+    async def start(self) -> AsyncIterator[Any]:
+        if self.inbox is None:
+            async for request in super().start():
+                yield request
+            return
+        for request in self._take():
+            yield request
+
+    def emit(self, url: str, **meta) -> None:
+        """Send a URL to the next stage."""
+        if self.outbox is not None and self.outbox.put(url, meta):
+            self.crawler.stats.inc_value("stage/emitted")
+
+    def _take(self) -> list[Request]:
+        # URLs handed on by the previous stage are not start requests, even
+        # when start() yields them, so the seen-pages filter applies to them
+        requests = [Request(url, callback=self.parse, meta={**meta, "is_start_request": False})
+                    for url, meta in self.inbox.take()]
+        if requests:
+            self.crawler.stats.inc_value("stage/received", len(requests))
+        return requests
+
+    def _feed(self):
+        if not self._opened or self.crawler.engine is None:
+            return
+        for request in self._take():
+            self.crawler.engine.crawl(request)
+
+    def _spider_opened(self, spider):
+        if spider is self:
+            self._opened = True
+
+    def _spider_idle(self, spider):
+        if spider is not self or self.inbox is None:
+            return
+        self._feed()
+        if not self.inbox.closed:
+            raise DontCloseSpider
+
+    def _spider_closed(self, spider, reason):
+        if spider is not self:
+            return
+        self._opened = False
+        if self.outbox is not None:
+            self.outbox.close()
+            logger.info(f"{self.name} finished ({reason}), "
+                        f"{len(self.outbox.seen)} URLs sent to {self.outbox.name}")
+
+
+def run(stages: Sequence[type[StageSpider]], settings: Settings | None = None,
+        **first_stage_kwargs) -> None:
+    """Crawl ``stages`` in one process, each feeding the next through a ``UrlQueue``.
+
+    All stages start together in one reactor; later stages wait for URLs
+    instead of files, and start crawling as soon as the first ones arrive.
+    ``first_stage_kwargs`` are passed to the first stage, e.g. ``urls``.
+
+    Every stage is its own crawler, but they share one rate-control state
+    per host (``RATE_CONTROL_GROUP``), so together they stay within the
+    rate a single spider would get, and one ``SCHEDULER_REQUEST_BUDGET``.
+    """
+    settings = settings or get_project_settings()
+    group = f"run-{uuid.uuid4().hex}"
+    settings.set("RATE_CONTROL_GROUP", group)
+    process = CrawlerProcess(settings)
+    player_registry = PlayerRegistry()
+    request_budget = RequestBudget(settings.getint("SCHEDULER_REQUEST_BUDGET", 0))
+    inbox = None
+    for position, stage in enumerate(stages):
+        outbox = UrlQueue(stages[position + 1].name) if position + 1 < len(stages) else None
+        kwargs = first_stage_kwargs if position == 0 else {}
+        process.crawl(stage, inbox=inbox, outbox=outbox, player_registry=player_registry,
+                      request_budget=request_budget, **kwargs)
+        inbox = outbox
+    try:
+        process.start()
+    finally:
+        AdaptiveRateMiddleware.release_group(group)
@@ -0,0 +1,167 @@
+import functools
+import logging
+import multiprocessing
+import os
+import pickle
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable
+
+from scrapy import Request, signals
+from scrapy.http import HtmlResponse, Response, TextResponse
+from scrapy.utils.defer import maybe_deferred_to_future
+from twisted.internet import defer, reactor
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FollowUp:
+    """A request made by a pure parser, naming its callback instead of holding it."""
+
+    url: str
+    callback: str = "parse"
+    meta: dict = field(default_factory=dict)
+    cb_kwargs: dict = field(default_factory=dict)
+    priority: int = 0
+    dont_filter: bool = False
+
+
+@dataclass
+class Page:
+    """What a worker needs to rebuild the response."""
+
+    url: str
+    status: int
+    headers: dict
+    body: bytes
+    encoding: str | None
+    meta: dict
+
+
+def _picklable(value) -> bool:
+    try:
+        pickle.dumps(value)
+    except Exception:
+        return False
+    return True
+
+
+def _page(response: Response) -> Page:
+    return Page(
+        url=response.url,
+        status=response.status,
+        headers=dict(response.headers),
+        body=response.body,
+        encoding=response.encoding if isinstance(response, TextResponse) else None,
+        # Meta may hold things like the download slot; only send what survives pickling
+        meta={key: value for key, value in response.meta.items() if _picklable(value)},
+    )
+
+
+def _run(parser: Callable, page: Page, kwargs: dict) -> list:
+    """Worker side: rebuild the response and run the parser on it."""
+    request = Request(page.url, meta=page.meta)
+    response = HtmlResponse(page.url, status=page.status, headers=page.headers,
+                            body=page.body, encoding=page.encoding or "utf-8", request=request)
+    return list(parser(response, **kwargs) or ())
+
+
+def _to_output(spider, response: Response, results: Iterable) -> Iterable:
+    for result in results:
+        if isinstance(result, FollowUp):
+            yield Request(
+                response.urljoin(result.url),
+                callback=getattr(spider, result.callback),
+                meta=result.meta,
+                cb_kwargs=result.cb_kwargs,
+                priority=result.priority,
+                dont_filter=result.dont_filter,
+            )
+        else:
+            yield result
+
+
+class ParsePool:
+    """
+    Process pool for CPU heavy spider callbacks.
+
+    One pool per crawler, started on first use and shut down when the
+    spider closes. At most ``PARSE_POOL_MAX_PENDING`` pages are handed to
+    the workers at a time; further callbacks wait for a free slot, which
+    keeps Scrapy's scraper slot full and so slows the downloads down too.
+    Workers are spawned rather than forked, so they don't inherit the
+    reactor's or the database writers' threads.
+    """
+
+    _pools: dict[int, "ParsePool"] = {}
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        self.slots = defer.DeferredSemaphore(max(1, max_pending))
+
+    @classmethod
+    def for_crawler(cls, crawler) -> "ParsePool | None":
+        """The crawler's pool, or None when ``PARSE_POOL_ENABLED`` is off."""
+        if not crawler.settings.getbool("PARSE_POOL_ENABLED"):
+            return None
+        pool = cls._pools.get(id(crawler))
+        if pool is None:
+            workers = crawler.settings.getint("PARSE_POOL_WORKERS") or os.cpu_count() or 1
+            max_pending = crawler.settings.getint("PARSE_POOL_MAX_PENDING") or 2 * workers
+            pool = cls._pools[id(crawler)] = cls(workers, max_pending)
+            crawler.signals.connect(pool.close, signal=signals.spider_closed)
+            crawler.signals.connect(lambda: cls._pools.pop(id(crawler), None),
+                                    signal=signals.engine_stopped, weak=False)
+            logger.info(f"Parsing pure callbacks in {workers} worker processes")
+        return pool
+
+    async def run(self, parser: Callable, response: Response, kwargs: dict) -> list:
+        await maybe_deferred_to_future(self.slots.acquire())
+        try:
+            d = defer.Deferred()
+            future = self.executor.submit(_run, parser, _page(response), kwargs)
+            future.add_done_callback(lambda f: reactor.callFromThread(self._resolve, d, f))
+            return await maybe_deferred_to_future(d)
+        finally:
+            self.slots.release()
+
+    @staticmethod
+    def _resolve(d: defer.Deferred, future: Future):
+        error = future.exception()
+        if error is not None:
+            d.errback(error)
+        else:
+            d.callback(future.result())
+
+    def close(self, spider=None):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def pure_parser(parser: Callable[..., Iterable[Any]]):
+    """Turn a module level parser into a spider callback that may run in another process.
+
+    ``parser(response, **cb_kwargs)`` must only read the response and return
+    items, and ``FollowUp``s for new requests. With ``PARSE_POOL_ENABLED``
+    it runs in the crawler's ``ParsePool``, otherwise in the reactor thread
+    as usual.
+    """
+    if "<locals>" in parser.__qualname__ or parser.__name__ == "<lambda>":
+        raise TypeError(f"{parser.__qualname__} must be a module level function to run in a worker")
+
+    @functools.wraps(parser)
+    async def callback(spider, response: Response, **kwargs):
+        pool = ParsePool.for_crawler(spider.crawler)
+        if pool is None:
+            results = parser(response, **kwargs) or ()
+        else:
+            results = await pool.run(parser, response, kwargs)
+            spider.crawler.stats.inc_value("parsepool/pages")
+        for output in _to_output(spider, response, results):
+            yield output
+
+    callback.pure_parser = parser
+    return callback
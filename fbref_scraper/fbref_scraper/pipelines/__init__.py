@@ -1,5 +1,6 @@
 from .database import DatabasePipeline
 from .validation import ValidationPipeline
 from .cleaning import CleaningPipeline
+from .fused import FusedPipeline
 
-__all__ = ['CleaningPipeline', 'ValidationPipeline', 'DatabasePipeline']
+__all__ = ['CleaningPipeline', 'ValidationPipeline', 'DatabasePipeline', 'FusedPipeline']
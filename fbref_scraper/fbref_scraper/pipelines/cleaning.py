@@ -1,6 +1,20 @@
 import re
 from itemadapter import ItemAdapter
 
+from ..items import item_class_name
+from ..utils.schema import ITEM_FAMILIES
+from ..utils.urls import route
+
+TEXT_FIELDS = ('name', 'first_name', 'last_name', 'country', 'league',
+               'nationality', 'club', 'position', 'competition')
+NUMERIC_FIELDS = ('players_count',)
+# Id field and the part of the routed URL it is taken from
+ID_FIELDS = {'player_id': 'player_id', 'club_id': 'squad_id',
+             'competition_id': 'comp_id', 'season_id': 'season'}
+
+WHITESPACE_RE = re.compile(r'\s+')
+NON_DIGIT_RE = re.compile(r'[^\d]')
+
 
 class CleaningPipeline:
     """Pipeline for cleaning and normalizing scraped data."""
@@ -9,36 +23,35 @@ class CleaningPipeline:
         adapter = ItemAdapter(item)
         
         # Clean text fields by stripping whitespace and normalizing
-        text_fields = ['name', 'first_name', 'last_name', 'country', 'league', 
-                      'nationality', 'club', 'position', 'competition']
-        
-        for field in text_fields:
+        for field in TEXT_FIELDS:
             if adapter.get(field):
                 # Strip whitespace and normalize spaces
-                adapter[field] = re.sub(r'\s+', ' ', str(adapter[field]).strip())
+                adapter[field] = WHITESPACE_RE.sub(' ', str(adapter[field]).strip())
         
         # Clean URLs
         if adapter.get('url'):
             adapter['url'] = adapter['url'].strip()
             
-        # Clean numeric fields
-        numeric_fields = ['goals', 'assists', 'yellow_cards', 'red_cards', 
-                         'matches_played', 'minutes_played', 'players_count']
-        
-        for field in numeric_fields:
+        # Coerce stat items to the types in the schema registry
+        family = ITEM_FAMILIES.get(item_class_name(item))
+        if family is not None:
+            for field, convert in family.converters:
+                if adapter.get(field) is not None:
+                    adapter[field] = convert(adapter[field])
+
+        for field in NUMERIC_FIELDS:
             if adapter.get(field):
                 # Remove non-numeric characters and convert to int
-                cleaned_value = re.sub(r'[^\d]', '', str(adapter[field]))
+                cleaned_value = NON_DIGIT_RE.sub('', str(adapter[field]))
                 adapter[field] = int(cleaned_value) if cleaned_value else 0
         
         # Clean IDs (extract from URLs if needed)
-        id_fields = ['player_id', 'club_id', 'competition_id', 'season_id']
-        for field in id_fields:
+        for field, part in ID_FIELDS.items():
             if adapter.get(field) and isinstance(adapter[field], str):
                 # Extract ID from URL pattern if it looks like a URL
                 if adapter[field].startswith('http'):
-                    id_match = re.search(r'/([a-fA-F0-9-]+)/', adapter[field])
-                    if id_match:
-                        adapter[field] = id_match.group(1)
+                    extracted = getattr(route(adapter[field]), part)
+                    if extracted:
+                        adapter[field] = extracted
         
         return item
\ No newline at end of file
@@ -1,72 +1,688 @@
+import io
+import json
+import time
+from dataclasses import dataclass, is_dataclass
+from functools import cached_property
+from operator import attrgetter
+
 import psycopg2
 from psycopg2._psycopg import cursor, connection
+from psycopg2.extras import execute_values
+from psycopg2.pool import PoolError
 from scrapy import Spider, Item
 from scrapy.crawler import Crawler
 from itemadapter import ItemAdapter
+from twisted.internet import defer, reactor, task, threads
+from twisted.python.threadpool import ThreadPool
+
+from ..items import ColumnBatchItem, item_class_name
+from ..utils.connection_pool import ConnectionPool
+from ..utils.dimensions import DIMENSIONS, DimensionCache
+from ..utils.fingerprints import FingerprintIndex
+from ..utils.schema import FAMILIES
+
+
+@dataclass(frozen=True)
+class TableWriter:
+    """Describes how one item class is written to its table.
+
+    ``fields`` are read from the item and written to ``columns`` in the same
+    order. Rows sharing the ``conflict`` key are upserted, without a key
+    duplicates are ignored.
+    """
+
+    table: str
+    fields: tuple[str, ...]
+    columns: tuple[str, ...]
+    conflict: tuple[str, ...] = ()
+    json_fields: tuple[str, ...] = ()
+    natural_key: tuple[str, ...] = ()
+    # (column, dimension) pairs whose names are replaced by the dimension's key
+    lookups: tuple[tuple[str, str], ...] = ()
+    # Dimension this table backs; written rows are added to the cache
+    dimension: str = ""
+    # Creates the table before the first batch a spider writes to it
+    ddl: str = ""
+
+    def members(self, rows: list[tuple]) -> dict:
+        """Map name to key for rows written to a dimension table."""
+        dimension = DIMENSIONS[self.dimension]
+        name = self.columns.index(dimension.name_column)
+        key = self.columns.index(dimension.id_column)
+        return {row[name]: row[key] for row in rows}
+
+    @property
+    def writes_keys(self) -> bool:
+        """Whether rows carry their dimension key, or the database generates it."""
+        return DIMENSIONS[self.dimension].id_column in self.columns
+
+    def names(self, rows: list[tuple]) -> set:
+        """Dimension names of rows written to a dimension table."""
+        name = self.columns.index(DIMENSIONS[self.dimension].name_column)
+        return {row[name] for row in rows}
+
+    def key(self, row: tuple) -> tuple:
+        """Natural key values of a row, used to fingerprint it."""
+        columns = self.natural_key or self.conflict
+        return tuple(row[self.columns.index(column)] for column in columns)
+
+    @property
+    def fingerprinted(self) -> bool:
+        """Whether a row that is unchanged since it was written can be skipped.
+
+        Without a conflict key changed rows are ignored by the database, so
+        remembering them would hide the change unless the key is the whole row.
+        """
+        return bool(self.conflict) or set(self.natural_key) == set(self.columns)
+
+    @property
+    def sql(self) -> str:
+        return f"INSERT INTO {self.table} AS target ({', '.join(self.columns)}) VALUES %s {self.on_conflict}"
+
+    @property
+    def on_conflict(self) -> str:
+        """Upsert clause that leaves rows alone when nothing changed."""
+        if not self.conflict:
+            return "ON CONFLICT DO NOTHING"
+        updated = [column for column in self.columns if column not in self.conflict]
+        updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in updated)
+        current = ", ".join(f"target.{column}" for column in updated)
+        incoming = ", ".join(f"EXCLUDED.{column}" for column in updated)
+        return (
+            f"ON CONFLICT ({', '.join(self.conflict)}) DO UPDATE SET {updates} "
+            f"WHERE ({current}) IS DISTINCT FROM ({incoming})"
+        )
+
+    @property
+    def staging_table(self) -> str:
+        return "staging_" + self.table.replace(".", "_")
+
+    def merge(self, cur: cursor, rows: list[tuple]) -> int:
+        """COPY rows into a temporary staging table and upsert them in one statement.
+
+        Returns the number of rows inserted or changed.
+        """
+        columns = ", ".join(self.columns)
+        cur.execute(
+            f"CREATE TEMP TABLE IF NOT EXISTS {self.staging_table} ON COMMIT DELETE ROWS "
+            f"AS SELECT {columns} FROM {self.table} WITH NO DATA"
+        )
+        data = io.StringIO("".join(
+            "\t".join(_copy_value(value) for value in row) + "\n" for row in rows
+        ))
+        cur.copy_expert(f"COPY {self.staging_table} ({columns}) FROM STDIN", data)
+        cur.execute(
+            f"INSERT INTO {self.table} AS target ({columns}) "
+            f"SELECT {columns} FROM {self.staging_table} {self.on_conflict}"
+        )
+        return cur.rowcount
+
+    def row(self, adapter: ItemAdapter) -> tuple:
+        """Build the parameter tuple for one item."""
+        return tuple(
+            json.dumps(adapter.get(field) or []) if field in self.json_fields
+            else adapter.get(field)
+            for field in self.fields
+        )
+
+    @cached_property
+    def record_row(self):
+        """Build the parameter tuple straight from a compact record's attributes."""
+        if self.json_fields:
+            return lambda record: self.row(ItemAdapter(record))
+        if len(self.fields) == 1:
+            get = attrgetter(self.fields[0])
+            return lambda record: (get(record),)
+        return attrgetter(*self.fields)
+
+    def dedupe(self, rows: list[tuple]) -> list[tuple]:
+        """Keep the last row per conflict key.
+
+        Postgres refuses to upsert the same key twice in one statement.
+        """
+        if not self.conflict:
+            return rows
+        positions = [self.columns.index(column) for column in self.conflict]
+        unique = {tuple(row[i] for i in positions): row for row in rows}
+        return list(unique.values())
+
+
+def _copy_value(value) -> str:
+    """Render a value for COPY's text format."""
+    if value is None:
+        return "\\N"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+WRITERS = {
+    "PlayerItem": TableWriter(
+        table="players",
+        fields=("player_id", "first_name", "last_name", "date_of_birth",
+                "position", "nationality", "club", "url"),
+        columns=("id", "first_name", "last_name", "date_of_birth",
+                 "position", "nationality", "club", "url"),
+        conflict=("id",),
+    ),
+    "CountryItem": TableWriter(
+        table="football.countries",
+        fields=("country",),
+        columns=("country_name",),
+        natural_key=("country_name",),
+        dimension="countries",
+    ),
+    "LeagueItem": TableWriter(
+        table="football.leagues",
+        fields=("league_name", "country"),
+        columns=("league_name", "country_id"),
+        conflict=("league_name",),
+        lookups=(("country_id", "countries"),),
+        dimension="leagues",
+    ),
+    "ClubItem": TableWriter(
+        table="football.clubs",
+        fields=("club_id", "club_name"),
+        columns=("club_id", "club_name"),
+        conflict=("club_id",),
+        dimension="clubs",
+    ),
+    "CompetitionItem": TableWriter(
+        table="competitions",
+        fields=("competition_id", "name", "country", "tier", "url", "seasons"),
+        columns=("id", "name", "country", "tier", "url", "seasons"),
+        conflict=("id",),
+        json_fields=("seasons",),
+    ),
+    "SeasonItem": TableWriter(
+        table="seasons",
+        fields=("season_id", "year", "competition", "competition_url", "url", "clubs"),
+        columns=("id", "year", "competition", "competition_url", "url", "clubs"),
+        conflict=("id",),
+        json_fields=("clubs",),
+    ),
+}
+
+# Stat tables are described by the schema registry
+WRITERS.update({
+    family.item_type: TableWriter(
+        table=family.table,
+        fields=family.fields,
+        columns=family.fields,
+        conflict=family.key,
+        ddl=family.ddl(),
+    )
+    for family in FAMILIES.values()
+})
 
 
 class DatabasePipeline:
-    """Pipeline for storing items in PostgreSQL database."""
+    """Pipeline for storing items in PostgreSQL database.
 
-    def __init__(self, settings):
+    Items are buffered per item class and written with one multi-row
+    statement when ``DATABASE_BATCH_SIZE`` rows are waiting, when
+    ``DATABASE_FLUSH_INTERVAL`` seconds have passed, and when the spider
+    closes. Tables with a natural key are merged through a temporary
+    staging table (``DATABASE_MERGE_WRITES``) and rows whose values did not
+    change are left untouched. With ``DATABASE_SKIP_UNCHANGED`` items whose
+    content hash matches the one stored at their last write are dropped
+    before they are buffered.
+
+    With ``DATABASE_ASYNC_WRITES`` the batches are written by a thread pool
+    instead of the reactor thread. At most ``DATABASE_WRITER_QUEUE_SIZE`` rows
+    may be waiting; beyond that ``process_item`` holds items back until the
+    writers catch up, which slows the crawl down to the database's pace.
+    """
+
+    def __init__(self, settings, batch_size: int = 500, flush_interval: float = 5.0,
+                 async_writes: bool = False, writer_threads: int = 1,
+                 queue_size: int = 5000, merge_writes: bool = True,
+                 skip_unchanged: bool = True, pool_options: dict | None = None,
+                 stats=None):
         self.settings = settings
-        self.connection:connection|None = None
-        self.cursor: cursor|None = None
+        self.pool_options = pool_options or {}
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.async_writes = async_writes
+        self.writer_threads = max(1, writer_threads)
+        self.queue_size = max(self.batch_size, queue_size)
+        self.merge_writes = merge_writes
+        self.fingerprints = FingerprintIndex() if skip_unchanged else None
+        self.created_tables: set[str] = set()
+        self.dimensions = DimensionCache()
+        self.stats = stats
+        self.pool: ConnectionPool | None = None
+        self.buffers: dict[str, list[tuple]] = {}
+        self.last_flush: dict[str, float] = {}
+        self.retry_at: dict[str, float] = {}
+        self.closing = False
+        self.flush_loop: task.LoopingCall | None = None
+        self.threadpool: ThreadPool | None = None
+        self.pending_rows = 0
+        self.in_flight: set[defer.Deferred] = set()
+        self.waiting: list[tuple[defer.Deferred, Item]] = []
 
     @classmethod
     def from_crawler(cls, crawler: Crawler):
-        return cls(settings=crawler.settings.get("DATABASE_SETTINGS"))
+        return cls(
+            settings=crawler.settings.get("DATABASE_SETTINGS"),
+            batch_size=crawler.settings.getint("DATABASE_BATCH_SIZE", 500),
+            flush_interval=crawler.settings.getfloat("DATABASE_FLUSH_INTERVAL", 5.0),
+            async_writes=crawler.settings.getbool("DATABASE_ASYNC_WRITES"),
+            writer_threads=crawler.settings.getint("DATABASE_WRITER_THREADS", 1),
+            queue_size=crawler.settings.getint("DATABASE_WRITER_QUEUE_SIZE", 5000),
+            merge_writes=crawler.settings.getbool("DATABASE_MERGE_WRITES", True),
+            skip_unchanged=crawler.settings.getbool("DATABASE_SKIP_UNCHANGED", True),
+            pool_options={
+                "min_size": crawler.settings.getint("DATABASE_POOL_MIN_SIZE", 1),
+                "max_size": crawler.settings.getint("DATABASE_POOL_MAX_SIZE", 8),
+                "check_interval": crawler.settings.getfloat("DATABASE_POOL_CHECK_INTERVAL", 30.0),
+            },
+            stats=crawler.stats,
+        )
 
     def open_spider(self, spider: Spider):
-        """Initialize database connection when spider opens."""
+        """Attach to the shared connection pool when spider opens."""
         try:
-            spider_name = spider.name
-            if spider_name == 'club_spider':
-                self.connection = psycopg2.connect(**self.settings)
-                self.cursor = self.connection.cursor()
-                spider.logger.info(
-                    f"Spider: {spider_name} succesfully connected with database"
-                )
+            self.pool = ConnectionPool.shared(self.settings, **self.pool_options)
+            with self.pool.connection() as conn:
+                loaded = self.dimensions.load(conn)
+            spider.logger.info(f"Loaded {loaded} dimension members")
+            # Stat tables and their fingerprints are set up once the spider writes to them
+            if self.fingerprints is not None:
+                with self.pool.connection() as conn:
+                    with conn.cursor() as cur:
+                        self.fingerprints.create_table(cur)
+                    conn.commit()
+            spider.logger.info(
+                f"Spider: {spider.name} succesfully connected with database"
+            )
         except Exception as e:
             spider.logger.error(f"Error connecting to database: {e}")
+            if self.pool:
+                self.pool.release()
+                self.pool = None
+            return
+
+        if self.async_writes:
+            self.threadpool = ThreadPool(
+                minthreads=1, maxthreads=self.writer_threads, name="database-writer"
+            )
+            self.threadpool.start()
+        if self.flush_interval > 0:
+            self.flush_loop = task.LoopingCall(self._flush_expired, spider)
+            self.flush_loop.start(self.flush_interval, now=False)
 
     def close_spider(self, spider):
-        """Close database connection when spider closes."""
-        if self.connection:
-            self.connection.close()
-            spider.logger.info("Database connection closed")
+        """Flush buffered rows and leave the connection pool when spider closes."""
+        if self.flush_loop and self.flush_loop.running:
+            self.flush_loop.stop()
+        if not self.pool:
+            return None
+        self.closing = True
+        self.flush_all(spider)
+        if not self.in_flight:
+            self._close_connections(spider)
+            return None
+        d = defer.DeferredList(list(self.in_flight))
+        d.addBoth(lambda _: self._close_connections(spider))
+        return d
 
     def process_item(self, item:Item, spider):
-        """Process and store item in database."""
-        if not self.connection:
+        """Buffer item, or every row of a column batch, and write full batches."""
+        if not self.pool:
             spider.logger.warning("No database connection available")
             return item
 
-        adapter = ItemAdapter(item)
-        item_type = type(item).__name__
+        if isinstance(item, ColumnBatchItem):
+            batch = item["batch"]
+            item_type = batch.item_type
+            writer = WRITERS.get(item_type)
+            if writer is None:
+                return item
+            for row in batch.rows(writer.fields):
+                self._buffer_row(item_type, writer, row, spider)
+        else:
+            item_type = item_class_name(item)
+            writer = WRITERS.get(item_type)
+            if writer is None:
+                return item
+            if is_dataclass(item):
+                row = writer.record_row(item)
+            else:
+                row = writer.row(ItemAdapter(item))
+            self._buffer_row(item_type, writer, row, spider)
+        return self._admit(item, spider)
+
+    def _admit(self, item, spider):
+        """Pass a buffered item on, or hold it back while the writers are behind."""
+        if not self.async_writes:
+            return item
+        if self.pending_rows < self.queue_size:
+            return defer.succeed(item)
+        self._inc_stat("database/backpressure_waits")
+        # Partly filled buffers count against the queue too, so send them off
+        # or nothing in flight would ever free the space
+        self.flush_all(spider)
+        d = defer.Deferred()
+        self.waiting.append((d, item))
+        return d
+
+    def _buffer_row(self, item_type: str, writer: TableWriter, row: tuple, spider):
+        """Add a row to its buffer unless it is unchanged, flushing a full buffer."""
+        if self.fingerprints is not None and writer.fingerprinted:
+            if writer.table not in self.fingerprints.loaded:
+                self._load_fingerprints(writer.table, spider)
+            if self.fingerprints.is_unchanged(writer.table, writer.key(row), row):
+                self._inc_stat("database/skipped_unchanged")
+                return
+        buffer = self.buffers.setdefault(item_type, [])
+        if not buffer:
+            self.last_flush[item_type] = time.monotonic()
+        buffer.append(row)
+        self.pending_rows += 1
+        self._set_queue_depth()
+        if len(buffer) >= self.batch_size:
+            self.flush(item_type, spider)
 
+    def _load_fingerprints(self, table: str, spider):
+        """Load the stored fingerprints of a table the first time a row of it is buffered."""
         try:
-            # if item_type == "PlayerItem":
-            #     self._insert_player(adapter)
-            if item_type == "ClubItem":
-                self._insert_club(adapter)
-            # elif item_type == "CompetitionItem":
-            #     self._insert_competition(adapter)
-            # elif item_type == "SeasonItem":
-            #     self._insert_season(adapter)
-            # elif item_type == "PlayerStatsItem":
-            #     self._insert_player_stats(adapter)
-
-            self.connection.commit()
-        except Exception as e:
-            self.connection.rollback()
-            spider.logger.error(f"Error inserting item: {e}")
+            with self.pool.connection() as conn:
+                loaded = self.fingerprints.load(conn, table)
+        except PoolError:
+            # Writers hold every connection; try again with the next row
+            return
+        except psycopg2.Error as e:
+            spider.logger.warning(f"Could not load row fingerprints for {table}: {e}")
+            self.fingerprints.loaded.add(table)
+            return
+        spider.logger.info(f"Loaded {loaded} row fingerprints for {table}")
+
+    def flush_all(self, spider):
+        """Write every non-empty buffer."""
+        for item_type in list(self.buffers):
+            self.flush(item_type, spider)
+
+    def flush(self, item_type: str, spider):
+        """Write the buffered rows of one item class in a single statement.
+
+        If the batch fails it is retried row by row so a single bad row only
+        loses itself. A batch that could not be written at all, because no
+        connection was free or the database was unreachable, goes back into
+        the buffer and is tried again after ``DATABASE_FLUSH_INTERVAL``. When
+        the spider closes it is written from a thread, which may wait for a
+        connection.
+        """
+        if not self.closing and time.monotonic() < self.retry_at.get(item_type, 0):
+            return
+        buffered = self.buffers.pop(item_type, [])
+        self.last_flush[item_type] = time.monotonic()
+        if not buffered:
+            return
+
+        writer = WRITERS[item_type]
+        rows = writer.dedupe(buffered)
+        if self.threadpool is None:
+            # The pool fails fast on the reactor thread instead of waiting, and
+            # a connection lost twice ends up here too
+            try:
+                result = self._write(writer, rows, spider)
+            except psycopg2.Error as e:
+                if not self.closing:
+                    self._requeue(item_type, buffered, e, spider)
+                    return
+                spider.logger.warning(f"Writing {item_type} batch failed ({e}), "
+                                      f"retrying from a thread")
+                d = threads.deferToThread(self._write, writer, rows, spider)
+            else:
+                self._batch_written(result, len(buffered), len(rows))
+                return
+        else:
+            d = threads.deferToThreadPool(
+                reactor, self.threadpool, self._write, writer, rows, spider
+            )
+        self.in_flight.add(d)
+        d.addCallback(self._batch_written, len(buffered), len(rows))
+        d.addErrback(self._batch_failed, buffered, item_type, spider)
+        d.addBoth(self._batch_done, d)
+
+    def _requeue(self, item_type: str, buffered: list[tuple], error, spider):
+        """Put a batch that could not be written back in front of its buffer."""
+        spider.logger.warning(f"Writing {item_type} batch failed ({error}), "
+                              f"keeping {len(buffered)} rows for the next flush")
+        self.buffers[item_type] = buffered + self.buffers.get(item_type, [])
+        self.retry_at[item_type] = time.monotonic() + max(self.flush_interval, 1.0)
+        self._inc_stat("database/flushes_deferred")
 
-        return item
+    def _write_batch(self, conn: connection, writer: TableWriter, rows: list[tuple],
+                     spider) -> tuple[int, int, float]:
+        """Write rows on the given connection.
 
-    def _create_tables(self):
+        Returns the number of rejected rows, the number of rows that matched
+        what was already stored and the time spent in seconds.
+        """
+        started = time.perf_counter()
+        self._create_table(conn, writer)
+        cur = conn.cursor()
+        written = rows
+        unchanged = 0
+        try:
+            values = self._resolve_lookups(conn, writer, rows)
+            if self.merge_writes and writer.conflict:
+                unchanged = len(rows) - writer.merge(cur, values)
+            else:
+                execute_values(cur, writer.sql, values, page_size=len(values))
+            hashes = self._store_fingerprints(cur, writer, written)
+            conn.commit()
+        except psycopg2.Error as e:
+            if conn.closed:
+                raise
+            conn.rollback()
+            spider.logger.warning(
+                f"Batch of {len(rows)} rows for {writer.table} failed ({e}), retrying row by row"
+            )
+            written, hashes = self._write_fallback(conn, cur, writer, rows, spider)
+        finally:
+            cur.close()
+        if self.fingerprints is not None:
+            self.fingerprints.remember(writer.table, hashes)
+        if writer.dimension and written:
+            self._learn_members(conn, writer, written, spider)
+        return len(rows) - len(written), unchanged, time.perf_counter() - started
+
+    def _create_table(self, conn: connection, writer: TableWriter):
+        """Create a stat table before the first batch written to it."""
+        if not writer.ddl or writer.table in self.created_tables:
+            return
+        cur = conn.cursor()
+        try:
+            cur.execute(writer.ddl)
+            conn.commit()
+        except psycopg2.Error:
+            if not conn.closed:
+                conn.rollback()
+            raise
+        finally:
+            cur.close()
+        self.created_tables.add(writer.table)
+
+    def _write_fallback(self, conn: connection, cur: cursor, writer: TableWriter,
+                        rows: list[tuple], spider) -> tuple[list[tuple], dict[int, int]]:
+        """Write a failed batch row by row, dropping whatever the database rejects.
+
+        Returns the rows that were written and their fingerprints. Only a lost
+        connection is raised.
+        """
+        kept, values = self._resolve_each(conn, writer, rows, spider)
+        written = [rows[kept[i]] for i in self._write_rows(cur, writer, values, spider)]
+        try:
+            hashes = self._store_fingerprints(cur, writer, written)
+            conn.commit()
+        except psycopg2.Error as e:
+            if conn.closed:
+                raise
+            conn.rollback()
+            spider.logger.error(f"Committing {len(written)} rows for {writer.table} failed: {e}")
+            return [], {}
+        return written, hashes
+
+    def _learn_members(self, conn: connection, writer: TableWriter, rows: list[tuple], spider):
+        """Add rows written to a dimension table to the cache."""
+        if writer.writes_keys:
+            self.dimensions.add(writer.dimension, writer.members(rows))
+            return
+        try:
+            self.dimensions.learn(conn, writer.dimension, writer.names(rows))
+        except psycopg2.Error as e:
+            if conn.closed:
+                raise
+            conn.rollback()
+            spider.logger.warning(f"Could not read back {writer.dimension} keys: {e}")
+
+    def _write(self, writer: TableWriter, rows: list[tuple], spider):
+        """Write a batch on a pooled connection, retrying once if the connection drops."""
+        try:
+            with self.pool.connection() as conn:
+                return self._write_batch(conn, writer, rows, spider)
+        except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+            spider.logger.warning(f"Lost database connection ({e}), reconnecting")
+        with self.pool.connection() as conn:
+            return self._write_batch(conn, writer, rows, spider)
+
+    def _write_rows(self, cur: cursor, writer: TableWriter, rows: list[tuple],
+                    spider) -> list[int]:
+        """Write rows one at a time, skipping the ones the database rejects.
+
+        Returns the positions of the rows that were written. The caller commits.
+        """
+        written = []
+        for i, row in enumerate(rows):
+            try:
+                cur.execute("SAVEPOINT row_insert")
+                execute_values(cur, writer.sql, [row])
+                cur.execute("RELEASE SAVEPOINT row_insert")
+                written.append(i)
+            except psycopg2.Error as e:
+                cur.execute("ROLLBACK TO SAVEPOINT row_insert")
+                spider.logger.error(f"Error inserting item into {writer.table}: {e}")
+        return written
+
+    def _resolve_lookups(self, conn: connection, writer: TableWriter,
+                         rows: list[tuple]) -> list[tuple]:
+        """Swap dimension names for their keys, creating unknown members first."""
+        if not writer.lookups:
+            return rows
+        keys = {}
+        for column, dimension in writer.lookups:
+            position = writer.columns.index(column)
+            keys[position] = self.dimensions.resolve(
+                conn, dimension, {row[position] for row in rows}
+            )
+        return [
+            tuple(keys[i][value] if i in keys else value for i, value in enumerate(row))
+            for row in rows
+        ]
+
+    def _resolve_each(self, conn: connection, writer: TableWriter, rows: list[tuple],
+                      spider) -> tuple[list[int], list[tuple]]:
+        """Resolve lookups one member at a time, leaving out rows whose member can't be created.
+
+        Returns the positions of the rows kept and their values.
+        """
+        if not writer.lookups:
+            return list(range(len(rows))), rows
+        keys = {}
+        for column, dimension in writer.lookups:
+            position = writer.columns.index(column)
+            keys[position] = {}
+            for value in {row[position] for row in rows}:
+                try:
+                    keys[position].update(self.dimensions.resolve(conn, dimension, {value}))
+                except psycopg2.Error as e:
+                    if conn.closed:
+                        raise
+                    conn.rollback()
+                    spider.logger.error(f"Error adding {value!r} to {dimension}: {e}")
+        kept = [i for i, row in enumerate(rows)
+                if all(row[position] in resolved for position, resolved in keys.items())]
+        return kept, [
+            tuple(keys[i][value] if i in keys else value for i, value in enumerate(rows[k]))
+            for k in kept
+        ]
+
+    def _store_fingerprints(self, cur: cursor, writer: TableWriter,
+                            rows: list[tuple]) -> dict[int, int]:
+        if self.fingerprints is None or not writer.fingerprinted:
+            return {}
+        entries = [(writer.key(row), row) for row in rows]
+        return self.fingerprints.store(cur, writer.table, entries)
+
+    def _batch_written(self, result: tuple[int, int, float], buffered: int, rows: int):
+        failed, unchanged, elapsed = result
+        self._inc_stat("database/flushes")
+        self._inc_stat("database/rows_written", rows - failed - unchanged)
+        if unchanged:
+            self._inc_stat("database/rows_unchanged", unchanged)
+        if failed:
+            self._inc_stat("database/rows_failed", failed)
+        if self.stats:
+            latency_ms = int(elapsed * 1000)
+            self.stats.set_value("database/write_latency_ms", latency_ms)
+            self.stats.max_value("database/write_latency_ms_max", latency_ms)
+        self._release(buffered)
+
+    def _batch_failed(self, failure, buffered: list[tuple], item_type: str, spider):
+        if not self.closing and failure.check(psycopg2.Error):
+            self._requeue(item_type, buffered, failure.getErrorMessage(), spider)
+            return
+        spider.logger.error(f"Writing {item_type} batch failed, dropping {len(buffered)} rows: "
+                            f"{failure.getErrorMessage()}")
+        self._inc_stat("database/rows_dropped", len(buffered))
+        self._release(len(buffered))
+
+    def _batch_done(self, _, d: defer.Deferred):
+        self.in_flight.discard(d)
+
+    def _release(self, rows: int):
+        """Free queue space and let held-back items continue."""
+        self.pending_rows -= rows
+        self._set_queue_depth()
+        while self.waiting and self.pending_rows < self.queue_size:
+            d, item = self.waiting.pop(0)
+            d.callback(item)
+
+    def _close_connections(self, spider):
+        if self.threadpool:
+            self.threadpool.stop()
+            self.threadpool = None
+        self.pool.release()
+        self.pool = None
+        spider.logger.info("Database connection closed")
+
+    def _set_queue_depth(self):
+        if self.stats:
+            self.stats.set_value("database/queue_depth", self.pending_rows)
+            self.stats.max_value("database/queue_depth_max", self.pending_rows)
+
+    def _inc_stat(self, key: str, count: int = 1):
+        if self.stats:
+            self.stats.inc_value(key, count)
+
+    def _flush_expired(self, spider):
+        """Write buffers that have been waiting longer than the flush interval."""
+        now = time.monotonic()
+        for item_type in list(self.buffers):
+            if now - self.last_flush.get(item_type, now) >= self.flush_interval:
+                self.flush(item_type, spider)
+
+    def _create_tables(self, cur: cursor):
         """Create database tables if they don't exist."""
-        # self.cursor.execute("CREATE SCHEMA IF NOT EXISTS testforme")
+        # cur.execute("CREATE SCHEMA IF NOT EXISTS testforme")
         tables = {
             "competitions": """
                 CREATE TABLE IF NOT EXISTS competitions (
@@ -115,155 +731,13 @@ class DatabasePipeline:
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )
             """,
-            "player_stats": """
-                CREATE TABLE IF NOT EXISTS football.player_stats (
-                    id SERIAL PRIMARY KEY,
-                    player_id VARCHAR(255) NOT NULL,
-                    season VARCHAR(50),
-                    club VARCHAR(255),
-                    league VARCHAR(255),
-                    position VARCHAR(50),
-                    matches_played INTEGER,
-                    goals INTEGER,
-                    assists INTEGER,
-                    yellow_cards INTEGER,
-                    red_cards INTEGER,
-                    minutes_played INTEGER,
-                    url VARCHAR(512),
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE(player_id, season, club)
-                )
-            """,
         }
 
         for table_name, create_sql in tables.items():
-            self.cursor.execute(create_sql)
-
-    def _insert_player(self, adapter):
-        """Insert player item into database."""
-        sql = """
-            INSERT INTO players (id, first_name, last_name, date_of_birth, position, nationality, club, url)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT (id) DO UPDATE SET
-                first_name = EXCLUDED.first_name,
-                last_name = EXCLUDED.last_name,
-                date_of_birth = EXCLUDED.date_of_birth,
-                position = EXCLUDED.position,
-                nationality = EXCLUDED.nationality,
-                club = EXCLUDED.club,
-                url = EXCLUDED.url
-        """
-        self.cursor.execute(
-            sql,
-            (
-                adapter.get("player_id"),
-                adapter.get("first_name"),
-                adapter.get("last_name"),
-                adapter.get("date_of_birth"),
-                adapter.get("position"),
-                adapter.get("nationality"),
-                adapter.get("club"),
-                adapter.get("url"),
-            ),
-        )
-
-    def _insert_club(self, adapter):
-        """Insert club item into database."""
-        sql = """
-            INSERT INTO football.clubs (club_id, club_name)
-            VALUES (%s, %s)
-        """
-        self.cursor.execute(
-            sql,
-            (
-                adapter.get("club_id"),
-                adapter.get("club_name"),
-            ),
-        )
-
-    def _insert_competition(self, adapter):
-        """Insert competition item into database."""
-        sql = """
-            INSERT INTO competitions (id, name, country, tier, url, seasons)
-            VALUES (%s, %s, %s, %s, %s, %s)
-            ON CONFLICT (id) DO UPDATE SET
-                name = EXCLUDED.name,
-                country = EXCLUDED.country,
-                tier = EXCLUDED.tier,
-                url = EXCLUDED.url,
-                seasons = EXCLUDED.seasons
-        """
-        import json
-
-        self.cursor.execute(
-            sql,
-            (
-                adapter.get("competition_id"),
-                adapter.get("name"),
-                adapter.get("country"),
-                adapter.get("tier"),
-                adapter.get("url"),
-                json.dumps(adapter.get("seasons", [])),
-            ),
-        )
-
-    def _insert_season(self, adapter):
-        """Insert season item into database."""
-        sql = """
-            INSERT INTO seasons (id, year, competition, competition_url, url, clubs)
-            VALUES (%s, %s, %s, %s, %s, %s)
-            ON CONFLICT (id) DO UPDATE SET
-                year = EXCLUDED.year,
-                competition = EXCLUDED.competition,
-                competition_url = EXCLUDED.competition_url,
-                url = EXCLUDED.url,
-                clubs = EXCLUDED.clubs
-        """
-        import json
-
-        self.cursor.execute(
-            sql,
-            (
-                adapter.get("season_id"),
-                adapter.get("year"),
-                adapter.get("competition"),
-                adapter.get("competition_url"),
-                adapter.get("url"),
-                json.dumps(adapter.get("clubs", [])),
-            ),
-        )
+            cur.execute(create_sql)
+        self._create_stat_tables(cur)
 
-    def _insert_player_stats(self, adapter):
-        """Insert player stats item into database."""
-        sql = """
-            INSERT INTO player_stats (player_id, season, club, league, position, matches_played, 
-                                    goals, assists, yellow_cards, red_cards, minutes_played, url)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT (player_id, season, club) DO UPDATE SET
-                league = EXCLUDED.league,
-                position = EXCLUDED.position,
-                matches_played = EXCLUDED.matches_played,
-                goals = EXCLUDED.goals,
-                assists = EXCLUDED.assists,
-                yellow_cards = EXCLUDED.yellow_cards,
-                red_cards = EXCLUDED.red_cards,
-                minutes_played = EXCLUDED.minutes_played,
-                url = EXCLUDED.url
-        """
-        self.cursor.execute(
-            sql,
-            (
-                adapter.get("player_id"),
-                adapter.get("season"),
-                adapter.get("club"),
-                adapter.get("league"),
-                adapter.get("position"),
-                adapter.get("matches_played"),
-                adapter.get("goals"),
-                adapter.get("assists"),
-                adapter.get("yellow_cards"),
-                adapter.get("red_cards"),
-                adapter.get("minutes_played"),
-                adapter.get("url"),
-            ),
-        )
+    def _create_stat_tables(self, cur: cursor):
+        """Create the stat family tables from the schema registry."""
+        for family in FAMILIES.values():
+            cur.execute(family.ddl())
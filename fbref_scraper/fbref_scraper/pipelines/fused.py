@@ -0,0 +1,215 @@
+from dataclasses import dataclass, field, fields, is_dataclass
+from typing import Callable
+
+import scrapy
+from itemadapter import ItemAdapter
+from scrapy.exceptions import DropItem
+
+from .. import items
+from ..items import ColumnBatchItem
+from ..utils.schema import ITEM_FAMILIES
+from ..utils.urls import route
+from .cleaning import ID_FIELDS, NON_DIGIT_RE, NUMERIC_FIELDS, TEXT_FIELDS, WHITESPACE_RE
+from .database import WRITERS, DatabasePipeline, TableWriter
+from .validation import ABSOLUTE_URL_ITEMS, REQUIRED_FIELDS
+
+
+class _RecordValues:
+    """Dict-like access to a compact record's attributes."""
+
+    __slots__ = ("record",)
+
+    def __init__(self, record):
+        self.record = record
+
+    def get(self, name: str, default=None):
+        return getattr(self.record, name, default)
+
+    def __setitem__(self, name: str, value):
+        setattr(self.record, name, value)
+
+
+class _ItemValues:
+    """
+    Dict-like access to a scrapy.Item through its public mapping API.
+
+    Reads come from one copy of the values, since ``Item.get`` costs several
+    calls per field; writes go to the item and the copy alike. Make one per
+    item and share it between ``clean``, ``validate`` and ``row``.
+    """
+
+    __slots__ = ("item", "values", "get")
+
+    def __init__(self, item: scrapy.Item):
+        self.item = item
+        self.values = dict(item)
+        self.get = self.values.get
+
+    def __setitem__(self, name: str, value):
+        self.item[name] = value
+        self.values[name] = value
+
+
+def _declared_fields(item_class: type) -> set[str] | None:
+    """Fields an item class can hold, or None when any key may turn up."""
+    if isinstance(item_class, type) and issubclass(item_class, scrapy.Item):
+        return set(item_class.fields)
+    if is_dataclass(item_class):
+        return {f.name for f in fields(item_class)}
+    return None
+
+
+@dataclass
+class ItemPlan:
+    """
+    Everything the fused pipeline does to one item class, worked out once.
+
+    Only the fields the class declares are visited, so a ClubItem is not
+    checked for nationality or players_count on every row.
+    """
+
+    item_type: str
+    values: Callable
+    text_fields: tuple[str, ...] = ()
+    clean_url: bool = False
+    converters: tuple[tuple[str, Callable], ...] = ()
+    numeric_fields: tuple[str, ...] = ()
+    id_fields: tuple[tuple[str, str], ...] = ()
+    required: tuple[str, ...] = ()
+    absolute_url: bool = False
+    writer: TableWriter | None = None
+    row: Callable | None = field(default=None, repr=False)
+
+    @classmethod
+    def build(cls, item_class: type) -> "ItemPlan":
+        item_type = getattr(item_class, "item_type", None) or item_class.__name__
+        declared = _declared_fields(item_class)
+
+        def present(names):
+            return tuple(name for name in names if declared is None or name in declared)
+
+        record = is_dataclass(item_class)
+        if record:
+            values = _RecordValues
+        elif isinstance(item_class, type) and issubclass(item_class, scrapy.Item):
+            values = _ItemValues
+        else:
+            values = ItemAdapter
+        family = ITEM_FAMILIES.get(item_type)
+        converters = tuple((name, convert) for name, convert in family.converters
+                           if name in present((name,))) if family else ()
+        converted = {name for name, _ in converters}
+        # Required fields the class lacks stay in, so such items are dropped
+        # just as ValidationPipeline drops them
+        required = REQUIRED_FIELDS.get(item_type, ())
+        if family is not None:
+            # Once converted, stat values are always numbers or None, so
+            # only the family's required fields are left to check
+            required += tuple(name for name in family.required_fields if name not in required)
+        writer = WRITERS.get(item_type)
+        plan = cls(
+            item_type=item_type,
+            values=values,
+            # The family's text converter already normalises whitespace
+            text_fields=tuple(name for name in present(TEXT_FIELDS) if name not in converted),
+            clean_url=bool(present(("url",))),
+            converters=converters,
+            numeric_fields=present(NUMERIC_FIELDS),
+            id_fields=tuple((name, ID_FIELDS[name]) for name in present(ID_FIELDS)),
+            required=required,
+            absolute_url=item_type in ABSOLUTE_URL_ITEMS,
+            writer=writer,
+        )
+        if writer is not None:
+            if record:
+                plan.row = lambda values: writer.record_row(values.record)
+            elif writer.json_fields:
+                plan.row = writer.row
+            else:
+                names = writer.fields
+                plan.row = lambda values: tuple(map(values.get, names))
+        return plan
+
+    def clean(self, values) -> None:
+        """What CleaningPipeline does, limited to the class's fields.
+
+        ``values`` is the item as wrapped by ``self.values``, which ``validate``
+        and ``row`` take as well.
+        """
+        get = values.get
+        for name in self.text_fields:
+            value = get(name)
+            if value:
+                values[name] = WHITESPACE_RE.sub(" ", str(value).strip())
+        if self.clean_url:
+            url = get("url")
+            if url:
+                values["url"] = url.strip()
+        for name, convert in self.converters:
+            value = get(name)
+            if value is not None:
+                values[name] = convert(value)
+        for name in self.numeric_fields:
+            value = get(name)
+            if value:
+                digits = NON_DIGIT_RE.sub("", str(value))
+                values[name] = int(digits) if digits else 0
+        for name, part in self.id_fields:
+            value = get(name)
+            if value and isinstance(value, str) and value.startswith("http"):
+                extracted = getattr(route(value), part)
+                if extracted:
+                    values[name] = extracted
+
+    def validate(self, values) -> None:
+        """What ValidationPipeline does, after ``clean``; raises DropItem for invalid items."""
+        get = values.get
+        for name in self.required:
+            if not get(name):
+                raise DropItem(f"Missing required field: {name}")
+        if self.absolute_url and not (get("url") or "").startswith("http"):
+            raise DropItem(f"Invalid URL format: {get('url')}")
+
+
+class FusedPipeline(DatabasePipeline):
+    """Cleaning, validation and database writes in a single pipeline stage.
+
+    Does what CleaningPipeline, ValidationPipeline and DatabasePipeline do
+    one after the other, but each item class gets an ``ItemPlan`` when the
+    spider opens (or when an unknown class first shows up), so per item
+    there is no string dispatch, no ItemAdapter and no work on fields the
+    class doesn't have. Use it instead of those three, not alongside them.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.plans: dict[type, ItemPlan] = {}
+
+    def open_spider(self, spider):
+        for value in vars(items).values():
+            if isinstance(value, type) and value is not ColumnBatchItem and (
+                issubclass(value, scrapy.Item) or is_dataclass(value)
+            ):
+                self.plans[value] = ItemPlan.build(value)
+        super().open_spider(spider)
+
+    def process_item(self, item, spider):
+        """Clean and validate an item, then buffer its row like DatabasePipeline."""
+        if isinstance(item, ColumnBatchItem):
+            return super().process_item(item, spider)
+
+        plan = self.plans.get(type(item))
+        if plan is None:
+            plan = self.plans[type(item)] = ItemPlan.build(type(item))
+        values = plan.values(item)
+        plan.clean(values)
+        plan.validate(values)
+
+        if not self.pool:
+            spider.logger.warning("No database connection available")
+            return item
+        if plan.writer is None:
+            return item
+        self._buffer_row(plan.item_type, plan.writer, plan.row(values), spider)
+        return self._admit(item, spider)
+
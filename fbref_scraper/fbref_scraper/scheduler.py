@@ -0,0 +1,200 @@
+import hashlib
+import logging
+import math
+import sqlite3
+import time
+from pathlib import Path
+
+from scrapy import Request, signals
+from scrapy.core.scheduler import Scheduler
+from scrapy.utils.project import data_path
+from w3lib.url import canonicalize_url
+
+from .httpcache import page_class
+
+logger = logging.getLogger(__name__)
+
+
+class PageHistory:
+    """
+    When each page was last fetched and when its content last changed.
+
+    Kept per canonical URL in a SQLite file. A page counts as changed when
+    the hash of its body differs from the one stored for the previous fetch;
+    a 304 from revalidation counts as unchanged.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.path, timeout=30)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                body_hash TEXT NOT NULL,
+                last_seen REAL NOT NULL,
+                last_changed REAL NOT NULL
+            )
+        """)
+
+    def get(self, url: str) -> tuple[float, float] | None:
+        """``(last_seen, last_changed)`` of a page, or None if it was never fetched."""
+        return self.db.execute(
+            "SELECT last_seen, last_changed FROM pages WHERE url = ?", (canonicalize_url(url),)
+        ).fetchone()
+
+    def record(self, url: str, body: bytes | None, now: float | None = None) -> bool:
+        """Record a fetch of the page; ``body`` None means not modified. Returns whether it changed."""
+        url, now = canonicalize_url(url), time.time() if now is None else now
+        row = self.db.execute("SELECT body_hash FROM pages WHERE url = ?", (url,)).fetchone()
+        if body is None:
+            if row is None:
+                return False
+            self.db.execute("UPDATE pages SET last_seen = ? WHERE url = ?", (now, url))
+            self.db.commit()
+            return False
+        body_hash = hashlib.blake2b(body, digest_size=16).hexdigest()
+        if row is not None and row[0] == body_hash:
+            self.db.execute("UPDATE pages SET last_seen = ? WHERE url = ?", (now, url))
+            changed = False
+        else:
+            self.db.execute(
+                "INSERT OR REPLACE INTO pages (url, body_hash, last_seen, last_changed) "
+                "VALUES (?, ?, ?, ?)",
+                (url, body_hash, now, now),
+            )
+            changed = row is not None
+        self.db.commit()
+        return changed
+
+    def close(self):
+        self.db.close()
+
+
+class RequestBudget:
+    """
+    How many requests a crawl may send over the network.
+
+    One budget is shared by every stage of an orchestrated run, so the
+    limit holds for the run rather than for each spider. A limit of 0 means
+    no limit.
+    """
+
+    def __init__(self, limit: int = 0):
+        self.limit = limit
+        self.spent = 0
+
+    @property
+    def exhausted(self) -> bool:
+        return 0 < self.limit <= self.spent
+
+    def spend(self):
+        self.spent += 1
+
+    def refund(self):
+        """Give back a request that was answered without going out."""
+        self.spent = max(0, self.spent - 1)
+
+
+class StalenessScheduler(Scheduler):
+    """
+    Scheduler that fetches the pages most likely to have changed first.
+
+    Every request gets a score between 0 and 1, the chance that its page
+    changed since it was last fetched, assuming pages change at random at a
+    steady rate. The expected time between changes comes from
+    ``STALENESS_CHANGE_INTERVALS`` for the page class (see
+    ``httpcache.page_class``); a page that has stayed unchanged for longer
+    than that is taken to change that rarely instead. An interval of 0 means
+    the page never changes once fetched, and pages never fetched score 1.
+    The score, scaled to ``STALENESS_PRIORITY_RANGE``, is added to the
+    request's priority.
+
+    With ``SCHEDULER_REQUEST_BUDGET`` set, the scheduler stops handing out
+    requests after that many went out over the network, so with a fixed
+    budget the pages most likely to have changed are the ones fetched.
+    Every request handed out is counted, and given back when the HTTP
+    cache answers it. A spider with a ``request_budget`` (see
+    ``orchestrator.run``) spends that one instead of its own.
+    """
+
+    def __init__(self, *args, history: PageHistory | None = None, intervals: dict | None = None,
+                 priority_range: int = 100, budget: RequestBudget | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.history = history
+        self.intervals = intervals or {}
+        self.priority_range = priority_range
+        self.budget = budget or RequestBudget()
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        scheduler = super().from_crawler(crawler)
+        scheduler.history = PageHistory(
+            data_path(settings.get("STALENESS_HISTORY_FILE", "page_history.sqlite"))
+        )
+        scheduler.intervals = settings.getdict("STALENESS_CHANGE_INTERVALS")
+        scheduler.priority_range = settings.getint("STALENESS_PRIORITY_RANGE", 100)
+        scheduler.budget = RequestBudget(settings.getint("SCHEDULER_REQUEST_BUDGET", 0))
+        crawler.signals.connect(scheduler.response_received, signal=signals.response_received)
+        return scheduler
+
+    def open(self, spider):
+        if getattr(spider, "request_budget", None) is not None:
+            self.budget = spider.request_budget
+        return super().open(spider)
+
+    def score(self, url: str, now: float | None = None) -> float:
+        """Chance that the page changed since it was last fetched."""
+        seen = self.history.get(url) if self.history else None
+        if seen is None:
+            return 1.0
+        last_seen, last_changed = seen
+        page = page_class(url)
+        interval = self.intervals.get(page, self.intervals.get("default", 86400))
+        if not interval:
+            return 0.0
+        interval = max(interval, last_seen - last_changed)
+        now = time.time() if now is None else now
+        return 1 - math.exp(-max(0.0, now - last_seen) / interval)
+
+    def enqueue_request(self, request: Request) -> bool:
+        # Retries and redirects keep the score of the original request
+        if "staleness" not in request.meta and request.method == "GET":
+            score = self.score(request.url)
+            request.meta["staleness"] = score
+            request.priority += round(score * self.priority_range)
+        return super().enqueue_request(request)
+
+    def next_request(self) -> Request | None:
+        if self.budget.exhausted:
+            return None
+        request = super().next_request()
+        if request is not None:
+            self.budget.spend()
+        return request
+
+    def has_pending_requests(self) -> bool:
+        return not self.budget.exhausted and super().has_pending_requests()
+
+    def response_received(self, response, request, spider):
+        if "cached" in response.flags:
+            self.budget.refund()
+            return
+        if self.history is None or request.method != "GET":
+            return
+        if response.status == 200:
+            body = None if "not_modified" in response.flags else response.body
+            self.stats.inc_value("staleness/recorded")
+            if self.history.record(request.url, body):
+                self.stats.inc_value("staleness/changed")
+
+    def close(self, reason: str):
+        if self.budget.exhausted and len(self):
+            logger.info(f"Request budget of {self.budget.limit} spent, "
+                        f"{len(self)} requests left unscheduled")
+            self.stats.set_value("staleness/left_unscheduled", len(self))
+        if self.history is not None:
+            self.history.close()
+        return super().close(reason)
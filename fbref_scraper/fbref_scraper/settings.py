@@ -19,7 +19,9 @@ NEWSPIDER_MODULE = "fbref_scraper.spiders"
 ADDONS = {}
 
 
-# Crawl responsibly by identifying yourself (and your website) on the user-agent
+# Crawl responsibly by identifying yourself (and your website) on the user-agent.
+# The curl download handler sends the impersonated browser's own User-Agent
+# instead, so only requests that fall back to Scrapy's handler use this one
 USER_AGENT = (
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 "
     "(KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36"
@@ -31,7 +33,8 @@ ROBOTSTXT_OBEY = False
 # Concurrency and throttling settings
 # CONCURRENT_REQUESTS = 16
 CONCURRENT_REQUESTS_PER_DOMAIN = 1
-DOWNLOAD_DELAY = 6
+# Request pacing is done by the adaptive rate controller below
+DOWNLOAD_DELAY = 0
 
 # Disable cookies (enabled by default)
 # COOKIES_ENABLED = False
@@ -47,15 +50,21 @@ DOWNLOAD_DELAY = 6
 
 # Enable or disable spider middlewares
 # See https://docs.scrapy.org/en/latest/topics/spider-middleware.html
-# SPIDER_MIDDLEWARES = {
-#    "fbref_scraper.middlewares.FbrefScraperSpiderMiddleware": 543,
-# }
+# SeenPagesMiddleware records a page as fetched once its callback succeeded
+SPIDER_MIDDLEWARES = {
+   "fbref_scraper.dupefilters.SeenPagesMiddleware": 50,
+}
 
 # Enable or disable downloader middlewares
 # See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
-# DOWNLOADER_MIDDLEWARES = {
-#    "fbref_scraper.middlewares.FbrefScraperDownloaderMiddleware": 543,
-# }
+# Revalidation sits between the HTTP cache (900) and the downloader so only
+# requests that actually go out carry If-None-Match / If-Modified-Since
+DOWNLOADER_MIDDLEWARES = {
+   "fbref_scraper.middlewares.FbrefScraperDownloaderMiddleware": 950,
+   "fbref_scraper.throttle.AdaptiveRateMiddleware": 960,
+}
+REVALIDATION_ENABLED = True
+REVALIDATION_DIR = "revalidation"
 
 # Enable or disable extensions
 # See https://docs.scrapy.org/en/latest/topics/extensions.html
@@ -70,6 +79,41 @@ ITEM_PIPELINES = {
     # "fbref_scraper.pipelines.validation.ValidationPipeline": 200,  # Then validate
      "fbref_scraper.pipelines.database.DatabasePipeline": 300,      # Finally store in DB
 }
+# FusedPipeline cleans, validates and stores in one stage, with the work for
+# each item class planned once. It replaces all three pipelines above:
+# ITEM_PIPELINES = {"fbref_scraper.pipelines.fused.FusedPipeline": 300}
+
+# Adaptive per-domain rate controller. Starts at one request every
+# RATE_CONTROL_START_DELAY seconds, speeds up while fbref answers cleanly and
+# backs off on 429s, Retry-After and Cloudflare challenges
+RATE_CONTROL_ENABLED = True
+RATE_CONTROL_START_DELAY = 6.0
+RATE_CONTROL_MIN_DELAY = 2.0
+RATE_CONTROL_MAX_DELAY = 120.0
+RATE_CONTROL_PROBE_AFTER = 20
+RATE_CONTROL_TARGET_LATENCY = 3.0
+# Crawlers with the same group share one rate per domain. orchestrator.run
+# sets a fresh group for its stages, so a chained run stays within the rate
+# above instead of getting it once per stage
+RATE_CONTROL_GROUP = ""
+# Requests per second per domain for all crawler processes on this host
+# together, coordinated through HOST_RATE_BUDGET_FILE. 0 disables it
+HOST_RATE_BUDGET = 0.5
+HOST_RATE_BUDGET_FILE = "host_rate_budget"
+
+# Download through curl-impersonate with a browser TLS / HTTP/2 fingerprint,
+# keeping one pooled session per host. Requires the asyncio reactor
+DOWNLOAD_HANDLERS = {
+    "http": "fbref_scraper.handlers.CurlCffiDownloadHandler",
+    "https": "fbref_scraper.handlers.CurlCffiDownloadHandler",
+}
+TWISTED_REACTOR = "twisted.internet.asyncioreactor.AsyncioSelectorReactor"
+CURL_IMPERSONATE = "chrome"
+# Attempts on a dropped connection before the error reaches RetryMiddleware
+CURL_RETRY_TIMES = 2
+CURL_MAX_CONNECTIONS_PER_HOST = 4
+# Seconds an idle connection is kept for reuse
+CURL_CONNECTION_MAX_AGE = 300
 
 # Enable and configure the AutoThrottle extension (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/autothrottle.html
@@ -86,11 +130,71 @@ AUTOTHROTTLE_DEBUG = False
 
 # Enable and configure HTTP caching (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html#httpcache-middleware-settings
-# HTTPCACHE_ENABLED = True
-# HTTPCACHE_EXPIRATION_SECS = 0
-# HTTPCACHE_DIR = "httpcache"
-# HTTPCACHE_IGNORE_HTTP_CODES = []
-# HTTPCACHE_STORAGE = "scrapy.extensions.httpcache.FilesystemCacheStorage"
+HTTPCACHE_ENABLED = True
+HTTPCACHE_EXPIRATION_SECS = 86400
+HTTPCACHE_DIR = "httpcache"
+HTTPCACHE_IGNORE_HTTP_CODES = [304, 403, 429, 500, 502, 503, 504]
+HTTPCACHE_STORAGE = "fbref_scraper.httpcache.FbrefCacheStorage"
+# Seconds a cached page stays fresh per page class, 0 never expires
+HTTPCACHE_TTLS = {
+    "finished_season": 0,
+    "history": 7 * 86400,
+    "current_season": 6 * 3600,
+    "squad": 6 * 3600,
+}
+# Least recently used entries are evicted once compressed bodies exceed this
+HTTPCACHE_MAX_SIZE = 2 * 1024 ** 3
+HTTPCACHE_COMPRESSION_LEVEL = 10
+
+# Remember parsed player and squad pages across runs (see
+# dupefilters.PersistentDupeFilter). A page is skipped for
+# SEEN_URLS_TTLS[page class] seconds after it was parsed, 0 skips it for
+# good; classes left out are always fetched. SEEN_URLS_IGNORE fetches
+# everything for one run, e.g. scrapy crawl ... -s SEEN_URLS_IGNORE=1
+DUPEFILTER_CLASS = "fbref_scraper.dupefilters.PersistentDupeFilter"
+SEEN_URLS_ENABLED = True
+SEEN_URLS_IGNORE = False
+SEEN_URLS_FILE = "seen_urls.bloom"
+SEEN_URLS_CAPACITY = 20_000_000
+SEEN_URLS_ERROR_RATE = 0.001
+SEEN_URLS_TTLS = {
+    "finished_season": 0,
+    "history": 7 * 86400,
+    "squad": 6 * 3600,
+    "default": 86400,
+}
+
+# Fetch the pages most likely to have changed first (see
+# scheduler.StalenessScheduler). Expected seconds between changes per page
+# class, 0 for pages that never change once fetched. With
+# SCHEDULER_REQUEST_BUDGET set, a run (or a standalone spider) stops after
+# that many requests sent over the network; HTTP cache hits are free
+SCHEDULER = "fbref_scraper.scheduler.StalenessScheduler"
+STALENESS_HISTORY_FILE = "page_history.sqlite"
+STALENESS_CHANGE_INTERVALS = {
+    "finished_season": 0,
+    "current_season": 7 * 86400,
+    "squad": 7 * 86400,
+    "history": 30 * 86400,
+    "default": 14 * 86400,
+}
+STALENESS_PRIORITY_RANGE = 100
+SCHEDULER_REQUEST_BUDGET = 0
+
+# Yield whole stat tables as typed column batches (ColumnBatchItem) instead of
+# one item per row. DatabasePipeline writes them as rows of the batch's item type
+COLUMNAR_ITEMS = False
+
+# Yield slotted dataclass records (items.RECORDS) instead of scrapy.Item rows
+# where a spider supports it. Pipelines treat them as the item they stand in for
+COMPACT_ITEMS = False
+
+# Run callbacks built with parsepool.pure_parser in worker processes instead of
+# the reactor thread. 0 workers means one per CPU; at most
+# PARSE_POOL_MAX_PENDING pages (default twice the workers) are queued at once
+PARSE_POOL_ENABLED = False
+PARSE_POOL_WORKERS = 0
+PARSE_POOL_MAX_PENDING = 0
 
 # Set settings whose default value is deprecated to a future-proof value
 FEED_EXPORT_ENCODING = "utf-8"
@@ -103,3 +207,29 @@ DATABASE_SETTINGS = {
     "database": os.getenv("POSTGRES_DB"),
     "port": os.getenv("POSTGRES_PORT"),
 }
+
+# Rows are buffered per item class and written in one statement once this
+# many are waiting, or when the oldest has waited DATABASE_FLUSH_INTERVAL seconds
+DATABASE_BATCH_SIZE = 500
+DATABASE_FLUSH_INTERVAL = 5.0
+
+# Write batches from a thread pool instead of the reactor thread. Once
+# DATABASE_WRITER_QUEUE_SIZE rows are waiting, items are held back until the
+# writers catch up
+DATABASE_ASYNC_WRITES = False
+DATABASE_WRITER_THREADS = 1
+DATABASE_WRITER_QUEUE_SIZE = 5000
+
+# COPY batches into a temporary staging table and merge them with one
+# INSERT ... SELECT ... ON CONFLICT instead of a multi-row VALUES upsert
+DATABASE_MERGE_WRITES = True
+
+# Keep a content hash per natural key in football.row_fingerprints and drop
+# items that are identical to what was written last time
+DATABASE_SKIP_UNCHANGED = True
+
+# Connection pool shared by every spider and pipeline in the process. Idle
+# connections are pinged after DATABASE_POOL_CHECK_INTERVAL seconds
+DATABASE_POOL_MIN_SIZE = 1
+DATABASE_POOL_MAX_SIZE = 8
+DATABASE_POOL_CHECK_INTERVAL = 30.0
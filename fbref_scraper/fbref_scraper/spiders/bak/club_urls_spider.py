@@ -4,7 +4,7 @@ import scrapy
 from scrapy.http import Response, TextResponse
 
 from ..items import ClubItem
-from ..utils.urls import extract_club_id, extract_club_name
+from ..utils.urls import extract_club_id, extract_club_name, league_name, route
 
 
 class ClubUrlsSpider(scrapy.Spider):
@@ -106,21 +106,8 @@ class ClubUrlsSpider(scrapy.Spider):
     
     def _extract_league_name(self, url: str) -> str:
         """Extract league name from the competition URL."""
-        if "Premier-League" in url:
-            return "Premier League"
-        elif "La-Liga" in url:
-            return "La Liga"
-        elif "Ligue-1" in url:
-            return "Ligue 1"
-        elif "Bundesliga" in url:
-            return "Bundesliga"
-        elif "Serie-A" in url:
-            return "Serie A"
-        else:
-            return "Unknown"
+        return league_name(url)
     
     def _extract_season_from_url(self, url: str) -> str:
         """Extract season from club URL."""
-        import re
-        match = re.search(r'/(\d{4}-\d{4})/', url)
-        return match.group(1) if match else "Unknown"
+        return route(url).season or "Unknown"
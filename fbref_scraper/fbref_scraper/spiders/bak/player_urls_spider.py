@@ -1,19 +1,21 @@
 import scrapy
 from scrapy.http import Response, TextResponse
 from fbref_scraper.items import PlayerItem
-from fbref_scraper.utils.urls import extract_player_id, extract_club_id
+from fbref_scraper.utils.players import PlayerRegistry
+from fbref_scraper.utils.urls import extract_player_id, extract_club_id, route
 
 
 class PlayerUrlsSpider(scrapy.Spider):
     name = "player_urls"
     
     custom_settings = {
-        'DOWNLOAD_DELAY': 10,  # Increased delay for player pages
+        'RATE_CONTROL_START_DELAY': 10,  # Increased delay for player pages
         'CONCURRENT_REQUESTS_PER_DOMAIN': 1,
     }
     
     def __init__(self, club_urls=None, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        self.player_registry = PlayerRegistry()
         # Can be initialized with specific club URLs, or use default top clubs
         if club_urls:
             self.start_urls = club_urls.split(',')
@@ -55,6 +57,15 @@ class PlayerUrlsSpider(scrapy.Spider):
         for link in player_links:
             if link:
                 player_url = response.urljoin(link)
+                # Each player page is requested once per run; other clubs and
+                # seasons are merged into the player's contexts
+                if not self.player_registry.add(player_url, {
+                    'club': club_name,
+                    'club_id': club_id,
+                    'season': season,
+                    'league': league
+                }):
+                    continue
                 yield scrapy.Request(
                     url=player_url,
                     callback=self.parse_player,
@@ -120,7 +131,7 @@ class PlayerUrlsSpider(scrapy.Spider):
         if nationality:
             player_item['nationality'] = nationality.strip()
         
-        yield player_item
+        yield self.player_registry.resolve(player_item['player_id'], player_item)
     
     def _extract_club_name(self, response: Response) -> str:
         """Extract club name from the page."""
@@ -136,9 +147,7 @@ class PlayerUrlsSpider(scrapy.Spider):
     
     def _extract_season_from_url(self, url: str) -> str:
         """Extract season from URL."""
-        import re
-        match = re.search(r'/(\d{4}-\d{4})/', url)
-        return match.group(1) if match else "Unknown"
+        return route(url).season or "Unknown"
     
     def _extract_league_from_url(self, url: str) -> str:
         """Extract league from URL context."""
@@ -1,14 +1,66 @@
+import re
+
 import scrapy
 from scrapy.http import Response, TextResponse
 from fbref_scraper.items import SeasonItem
-from fbref_scraper.utils.urls import extract_season_id
+from fbref_scraper.parsepool import pure_parser
+from fbref_scraper.utils.planner import UrlPlanner
+from fbref_scraper.utils.urls import extract_season_id, get_leagues_history_url, league_name
+
+
+def parse_season_page(response: Response):
+    """
+    Parse individual season page to extract season information and clubs.
+    
+    Args:
+        response: HTTP response object containing the season page
+        
+    Yields:
+        SeasonItem: Season item with detailed information
+    """
+    if not isinstance(response, TextResponse):
+        return
+        
+    season_year = response.meta.get('season_year', 'Unknown')
+    competition_name = response.meta.get('competition_name', 'Unknown')
+    competition_url = response.meta.get('competition_url', '')
+    season_url = response.meta.get('season_url', response.url)
+    
+    season_item = SeasonItem()
+    season_item['season_id'] = extract_season_id(season_url)
+    season_item['year'] = season_year
+    season_item['competition'] = competition_name
+    season_item['competition_url'] = competition_url
+    season_item['url'] = season_url
+    
+    # Extract clubs participating in this season
+    clubs = []
+    club_links = response.xpath(
+        '//table[contains(@id, "overall") or contains(@id, "results")]//td[contains(@class, "left") and contains(@data-stat, "team")]//a'
+    )
+    
+    for club_link in club_links:
+        club_name = club_link.xpath('.//text()').get()
+        club_url = club_link.xpath('.//@href').get()
+        
+        if club_name and club_url:
+            clubs.append({
+                'name': club_name.strip(),
+                'url': response.urljoin(club_url)
+            })
+    
+    season_item['clubs'] = clubs
+    
+    yield season_item
 
 
 class SeasonSpider(scrapy.Spider):
     name = "seasons"
     
-    def __init__(self, *args, **kwargs):
+    def __init__(self, from_history: bool = False, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        # Season URLs are planned locally unless from_history is set
+        self.from_history = from_history not in (False, "0", "false", "False")
         # Start with history pages for major competitions
         self.start_urls = [
             "https://fbref.com/en/comps/9/history/Premier-League-Seasons",
@@ -18,6 +70,25 @@ class SeasonSpider(scrapy.Spider):
             "https://fbref.com/en/comps/11/history/Serie-A-Seasons",
         ]
     
+    async def start(self):
+        if self.from_history:
+            async for request in super().start():
+                yield request
+            return
+        planner = UrlPlanner()
+        for planned in planner.season_urls(first="2010-2011"):
+            competition = planner.competitions[planned.comp_id]
+            yield scrapy.Request(
+                url=planned.url,
+                callback=self.parse_season,
+                meta={
+                    'season_year': planned.season,
+                    'competition_name': self._extract_competition_name(planned.url),
+                    'competition_url': get_leagues_history_url(competition.slug, planned.comp_id),
+                    'season_url': planned.url
+                }
+            )
+
     def parse(self, response: Response, **kwargs):
         """
         Parse competition history page to extract season URLs.
@@ -58,69 +129,14 @@ class SeasonSpider(scrapy.Spider):
                         }
                     )
     
-    def parse_season(self, response: Response):
-        """
-        Parse individual season page to extract season information and clubs.
-        
-        Args:
-            response: HTTP response object containing the season page
-            
-        Yields:
-            SeasonItem: Season item with detailed information
-        """
-        if not isinstance(response, TextResponse):
-            return
-            
-        season_year = response.meta.get('season_year', 'Unknown')
-        competition_name = response.meta.get('competition_name', 'Unknown')
-        competition_url = response.meta.get('competition_url', '')
-        season_url = response.meta.get('season_url', response.url)
-        
-        season_item = SeasonItem()
-        season_item['season_id'] = extract_season_id(season_url)
-        season_item['year'] = season_year
-        season_item['competition'] = competition_name
-        season_item['competition_url'] = competition_url
-        season_item['url'] = season_url
-        
-        # Extract clubs participating in this season
-        clubs = []
-        club_links = response.xpath(
-            '//table[contains(@id, "overall") or contains(@id, "results")]//td[contains(@class, "left") and contains(@data-stat, "team")]//a'
-        )
-        
-        for club_link in club_links:
-            club_name = club_link.xpath('.//text()').get()
-            club_url = club_link.xpath('.//@href').get()
-            
-            if club_name and club_url:
-                clubs.append({
-                    'name': club_name.strip(),
-                    'url': response.urljoin(club_url)
-                })
-        
-        season_item['clubs'] = clubs
-        
-        yield season_item
-    
+    parse_season = pure_parser(parse_season_page)
+
     def _extract_competition_name(self, url: str) -> str:
         """Extract competition name from history URL."""
-        if "Premier-League" in url:
-            return "Premier League"
-        elif "La-Liga" in url:
-            return "La Liga"
-        elif "Ligue-1" in url:
-            return "Ligue 1"
-        elif "Bundesliga" in url:
-            return "Bundesliga"
-        elif "Serie-A" in url:
-            return "Serie A"
-        else:
-            return "Unknown"
+        return league_name(url)
     
     def _is_valid_season(self, season_text: str) -> bool:
         """Check if season is valid/recent enough to process."""
-        import re
         # Extract year from season text (e.g., "2023-2024" -> 2023)
         match = re.search(r'(\d{4})', season_text)
         if match:
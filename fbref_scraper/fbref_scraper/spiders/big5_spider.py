@@ -0,0 +1,72 @@
+from typing import Any, AsyncIterator
+
+from scrapy import Request, Spider
+from scrapy.http import Response, TextResponse
+
+from ..items import ClubItem, ColumnBatchItem
+from ..parsepool import pure_parser
+from ..utils.columns import extract_columns
+from ..utils.schema import BIG5_PAGES, FAMILIES
+from ..utils.tables import page_tables
+from ..utils.planner import UrlPlanner, parse_seasons
+from ..utils.urls import get_big5_stats_url
+
+SQUADS = FAMILIES["big5_squad_standard"]
+
+
+def parse_big5_table(response: Response, **kwargs) -> Any:
+    """Read the family table of a Big 5 stats page into one column batch.
+
+    Clubs of the squad page are yielded as ClubItems as well.
+    """
+    if not isinstance(response, TextResponse):
+        return
+    family = FAMILIES[response.meta["family"]]
+    table = next((table for table_id, table in page_tables(response).items()
+                  if family.matches(table_id)), None)
+    if table is None:
+        return
+    batch = extract_columns(table, family.columns(), family.item_type,
+                            {"season": response.meta["season"]})
+    if not batch:
+        return
+    yield ColumnBatchItem(batch=batch)
+
+    if family is SQUADS:
+        for club_id, club_name in zip(batch.column("club_id"), batch.column("club_name")):
+            club_item = ClubItem()
+            club_item['club_id'] = club_id
+            club_item['club_name'] = club_name
+            yield club_item
+
+
+class Big5Spider(Spider):
+    """
+    Season stats of every club and player in the Big 5 leagues.
+
+    Reads the Big 5 aggregate pages, one request per stat family and season,
+    instead of a league page plus one squad page per club. Rows keep their
+    club and league (``club_id``, ``competition_id``, ``league``), so they
+    can still be split per league.
+    """
+
+    name = "big5_spider"
+
+    def __init__(self, seasons: str = "2024-2025", families: str | None = None, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # e.g. "2024-2025", "2017-2018:2024-2025" or "2019-2020,2021-2022"
+        self.seasons = parse_seasons(seasons)
+        self.families = families.split(',') if families else list(BIG5_PAGES)
+        unknown = set(self.families) - set(BIG5_PAGES)
+        if unknown:
+            raise ValueError(f"Unknown Big 5 stat families: {', '.join(sorted(unknown))}")
+
+    async def start(self) -> AsyncIterator[Any]:
+        for season in self.seasons:
+            yield Request(get_big5_stats_url(season, "stats", "squads"), callback=self.parse,
+                          meta={"season": season, "family": SQUADS.name})
+        for planned in UrlPlanner().big5_urls(self.seasons, self.families):
+            yield Request(planned.url, callback=self.parse,
+                          meta={"season": planned.season, "family": f"big5_{planned.kind}"})
+
+    parse = pure_parser(parse_big5_table)
@@ -1,9 +1,40 @@
+import logging
 from typing import AsyncIterator, Tuple
-import re
 from scrapy import Spider
 from scrapy.http import Request, Response
 from typing import Any
 from ..items import ClubItem
+from ..parsepool import pure_parser
+from ..utils.tables import page_tables
+from ..utils.urls import PageType, route
+
+logger = logging.getLogger(__name__)
+
+
+def parse_clubs(response: Response, **kwargs) -> Any:
+    table = page_tables(response).first("overall")
+    if table is None:
+        return
+    teams_xpath = './/td[contains(@class,"left") and contains(@data-stat, "team")]/a/@href'
+    urls = table.xpath(teams_xpath)
+    for url in urls:
+        club = _extract_club_id_and_club_name(url.get())
+        # The team column can also link elsewhere, e.g. to a country page
+        if club is None:
+            continue
+        id, name = club
+        club_item = ClubItem()
+        club_item['club_id'] = id
+        club_item['club_name'] = name
+        logger.debug(f"Extracted club {name} ({id})")
+        yield club_item
+
+
+def _extract_club_id_and_club_name(club_url: str) -> Tuple[str, str] | None:
+    page = route(club_url)
+    if page.page_type is not PageType.SQUAD:
+        return None
+    return page.squad_id, page.name
 
 
 class ClubSpider(Spider):
@@ -17,22 +48,4 @@ class ClubSpider(Spider):
         for url in urls:
             yield Request(url=url, callback=self.parse)
 
-    def parse(self, response: Response, **kwargs) -> Any:
-        teams_xpath = '//table[contains(@id, "overall")]//td[contains(@class,"left") and contains(@data-stat, "team")]/a/@href'
-        urls = response.xpath(teams_xpath)
-        for url in urls:
-            id, name = self._extract_club_id_and_club_name(url.get())
-            club_item = ClubItem()
-            club_item['club_id'] = id
-            club_item['club_name'] = name
-            print("EXTRACTED URLS. ID: ", id, ", NAME: ", name)
-            yield club_item
-
-    def _extract_club_id_and_club_name(self, club_url: str) -> Tuple[str, str] | None:
-        pattern = r"\/en\/squads\/(\w+)\/\w+-\w+\/(.+)-Stats"
-        match = re.match(pattern, club_url)
-        if not match:
-            return None
-        club_id = match.group(1).strip()
-        club_name = match.group(2).replace("-"," ").strip()
-        return club_id, club_name
+    parse = pure_parser(parse_clubs)
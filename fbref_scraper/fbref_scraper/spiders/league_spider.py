@@ -1,39 +1,65 @@
 from typing import AsyncIterator, Tuple
-import re
-from scrapy import Spider
 from scrapy.http import Request, Response
 from typing import Any
+from ..orchestrator import StageSpider
+from ..utils.planner import UrlPlanner, parse_seasons
+from ..utils.tables import page_tables
+from ..utils.urls import PageType, route
 
+TEAM_LINKS_XPATH = './/td[contains(@class,"left") and contains(@data-stat, "team")]/a/@href'
 
-class LeagueSpider(Spider):
+
+class LeagueSpider(StageSpider):
     name = "league_spider"
 
+    start_urls = [
+        "https://www.fbref.com/en/comps/9/2024-2025/2024-2025-Premier-League-Stats",
+        "https://www.fbref.com/en/comps/12/2024-2025/2024-2025-La-Liga-Stats",
+        "https://www.fbref.com/en/comps/11/2024-2025/2024-2025-Serie-A-Stats",
+        "https://www.fbref.com/en/comps/20/2024-2025/2024-2025-Bundesliga-Stats",
+        "https://www.fbref.com/en/comps/13/2024-2025/2024-2025-Ligue-1-Stats",
+    ]
+
+    def __init__(self, seasons: str | None = None, competitions: str | None = None,
+                 *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Plan the season pages locally, e.g. seasons="2010-2011:2024-2025"
+        # and competitions="9,12" (all five leagues by default)
+        planner = UrlPlanner()
+        comp_ids = [c.strip() for c in competitions.split(',') if c.strip()] if competitions else None
+        for comp_id in comp_ids or ():
+            planner.competition(comp_id)
+        if seasons:
+            self.start_urls = [
+                planned.url
+                for season in parse_seasons(seasons)
+                for planned in planner.season_urls(comp_ids, season, season)
+            ]
+        elif comp_ids:
+            self.start_urls = [url for url in self.start_urls
+                               if route(url).comp_id in comp_ids]
+
     async def start(self) -> AsyncIterator[Any]:
-        urls = [
-            "https://www.fbref.com/en/comps/9/2024-2025/2024-2025-Premier-League-Stats",
-            "https://www.fbref.com/en/comps/12/2024-2025/2024-2025-La-Liga-Stats",
-            "https://www.fbref.com/en/comps/11/2024-2025/2024-2025-Serie-A-Stats",
-            "https://www.fbref.com/en/comps/20/2024-2025/2024-2025-Bundesliga-Stats",
-            "https://www.fbref.com/en/comps/13/2024-2025/2024-2025-Ligue-1-Stats",
-        ]
-        for url in urls:
+        for url in self.start_urls:
             league_id, season, league = self._extract_season_and_league(url)
             yield Request(url=url, callback=self.parse,
                           meta={"league_id": league_id, "league": league, "season": season})
 
     def parse(self, response: Response, **kwargs) -> Any:
-
+        """Send the squad pages of a league season to the next stage."""
         league_id = response.meta.get("league_id", "unknown")
         league = response.meta.get("league", "unknown")
         season = response.meta.get("season", "unknown")
+        self.logger.info(f"League {league} ({league_id}), season {season}")
 
-        print("LEAGUE ID = ", league_id)
-        print("LEAGUEEEEEEEEE = ", league)
-        print("SEASONNNNNNNN = ", season)
+        table = page_tables(response).first("overall")
+        if table is None:
+            return
+        for href in table.xpath(TEAM_LINKS_XPATH).getall():
+            self.emit(response.urljoin(href), league=league, season=season)
 
     def _extract_season_and_league(self, url_to_parse: str) -> Tuple[str, str, str]:
-        pattern = r"https:\/\/w{3}.fbref.com\/en\/comps\/(\d+)\/\d{4}-\d{4}\/(\d{4}-\d{4}).([A-Za-z\-\d?]+)-Stats"
-        match = re.search(pattern, url_to_parse)
-        if not match:
+        page = route(url_to_parse)
+        if page.page_type is not PageType.COMPETITION_SEASON:
             return "unknown", "unknown", "unknown"
-        return match.group(1), match.group(2), match.group(3)
+        return page.comp_id, page.season, page.slug
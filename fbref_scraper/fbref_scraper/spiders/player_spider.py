@@ -0,0 +1,57 @@
+from typing import Any
+
+from scrapy.http import Response, TextResponse
+
+from ..items import PlayerItem
+from ..orchestrator import StageSpider
+from ..utils.urls import extract_player_id
+
+
+class PlayerSpider(StageSpider):
+    """Player pages: yields the player and sends the page on to the statistics stage."""
+
+    name = "player_spider"
+
+    def parse(self, response: Response, **kwargs) -> Any:
+        if not isinstance(response, TextResponse):
+            return
+
+        player_id = extract_player_id(response.url)
+        player_item = PlayerItem()
+        player_item['player_id'] = player_id
+        player_item['url'] = response.url
+        player_item['club'] = response.meta.get('club', 'Unknown')
+
+        full_name = response.xpath('//h1/span/text()').get()
+        if full_name:
+            full_name = full_name.strip()
+            player_item['player_name'] = full_name
+            name_parts = full_name.split()
+            if len(name_parts) >= 2:
+                player_item['first_name'] = ' '.join(name_parts[:-1])
+                player_item['last_name'] = name_parts[-1]
+            else:
+                player_item['first_name'] = full_name
+                player_item['last_name'] = ''
+
+        dob = response.xpath('//span[@id="necro-birth"]/@data-birth').get()
+        if not dob:
+            dob = response.xpath('//p[contains(text(), "Born:")]/text()').re_first(r'Born:\s*([\d-]+)')
+        if dob:
+            player_item['date_of_birth'] = dob.strip()
+
+        # e.g. "<strong>Position:</strong> FW (AM-WM, right) ▪ <strong>Footed:</strong> ..."
+        position = response.xpath('//strong[contains(text(), "Position:")]/following-sibling::text()').re_first(r'([^(▪]+)')
+        if position:
+            player_item['position'] = position.strip()
+
+        nationality = response.xpath('//strong[contains(text(), "Citizenship:")]/following-sibling::a/text()').get()
+        if nationality:
+            player_item['nationality'] = nationality.strip()
+
+        # One item per player; each club and season is a row of the statistics stage
+        yield self.player_registry.resolve(player_id, player_item)
+
+        # The statistics stage reads the same page, which comes from the HTTP cache
+        self.emit(response.url, **{key: response.meta[key] for key in
+                                   ('club', 'club_id', 'season', 'league') if key in response.meta})
@@ -0,0 +1,46 @@
+from typing import Any
+
+from scrapy.http import Response, TextResponse
+
+from ..items import ClubItem
+from ..orchestrator import StageSpider
+from ..utils.tables import page_tables
+from ..utils.urls import PageType, route
+
+PLAYER_LINKS_XPATH = './/th[contains(@data-stat, "player")]/a/@href'
+
+
+class SquadSpider(StageSpider):
+    """Club squad pages: yields the club and sends its players to the next stage."""
+
+    name = "squad_spider"
+
+    def parse(self, response: Response, **kwargs) -> Any:
+        if not isinstance(response, TextResponse):
+            return
+        page = route(response.url)
+        if page.page_type is not PageType.SQUAD:
+            return
+
+        club_item = ClubItem()
+        club_item['club_id'] = page.squad_id
+        club_item['club_name'] = page.name
+        yield club_item
+
+        table = page_tables(response).first("stats_standard")
+        if table is None:
+            return
+        context = {
+            "club": page.name,
+            "club_id": page.squad_id,
+            "season": page.season or response.meta.get("season"),
+            "league": response.meta.get("league"),
+        }
+        for href in table.xpath(PLAYER_LINKS_XPATH).getall():
+            # Players already on another squad page are fetched once; this
+            # squad is only counted
+            url = response.urljoin(href)
+            if self.player_registry.add(url, context):
+                self.emit(url, **context)
+            else:
+                self.crawler.stats.inc_value("players/merged_contexts")
@@ -0,0 +1,54 @@
+from typing import Any
+
+from scrapy.http import Response, TextResponse
+
+from ..items import ColumnBatchItem, PlayerStatsItem, PlayerStatsRecord
+from ..orchestrator import StageSpider
+from ..utils.columns import extract_columns
+from ..utils.schema import FAMILIES, TOTAL_SEASONS
+from ..utils.tables import extract_rows, page_tables
+from ..utils.urls import extract_player_id
+
+PLAYER_STATS = FAMILIES['player_stats']
+PLAYER_STATS_COLUMNS = PLAYER_STATS.columns()
+coerce_player_stats = PLAYER_STATS.coercer()
+
+# Domestic league seasons only; the cup, international and national team
+# tables share its (player, season, club) key and would overwrite its rows
+LEAGUE_TABLE = "stats_standard_dom_lg"
+
+
+class StatisticsSpider(StageSpider):
+    """Per-season statistics from player pages."""
+
+    name = "statistics_spider"
+
+    custom_settings = {
+        'RATE_CONTROL_START_DELAY': 12,
+    }
+
+    def parse(self, response: Response, **kwargs) -> Any:
+        if not isinstance(response, TextResponse):
+            return
+
+        player_id = extract_player_id(response.url)
+        columnar = self.settings.getbool('COLUMNAR_ITEMS')
+        item_class = PlayerStatsRecord if self.settings.getbool('COMPACT_ITEMS') else PlayerStatsItem
+
+        table = page_tables(response).get(LEAGUE_TABLE)
+        if table is None:
+            return
+        if columnar:
+            # The season column skips Career and Total rows itself
+            batch = extract_columns(table, PLAYER_STATS_COLUMNS, PLAYER_STATS.item_type,
+                                    {'player_id': player_id, 'url': response.url})
+            if batch:
+                yield ColumnBatchItem(batch=batch)
+            return
+
+        for row in extract_rows(table):
+            values = coerce_player_stats(row)
+            # Career and total rows have no single season
+            if values['season'] in TOTAL_SEASONS or values['season'] is None:
+                continue
+            yield item_class(player_id=player_id, url=response.url, **values)
@@ -0,0 +1,317 @@
+import fcntl
+import os
+import struct
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from scrapy import signals
+from scrapy.downloadermiddlewares.retry import get_retry_request
+from scrapy.exceptions import NotConfigured
+from scrapy.utils.defer import maybe_deferred_to_future
+from scrapy.utils.httpobj import urlparse_cached
+from scrapy.utils.project import data_path
+from twisted.internet import reactor
+from twisted.internet.task import deferLater
+
+CHALLENGE_MARKERS = (b"Just a moment...", b"challenge-platform", b"cf-browser-verification")
+
+
+@dataclass
+class TokenBucket:
+    """Token bucket for one domain; the rate is adjusted while crawling."""
+
+    rate: float
+    burst: float = 1.0
+    tokens: float = 1.0
+    updated: float = field(default_factory=time.monotonic)
+    paused_until: float = 0.0
+
+    def reserve(self, now: float) -> float:
+        """Take a token and return how many seconds to wait before using it.
+
+        Tokens taken while the bucket is empty are debt, so concurrent
+        callers queue up one interval apart.
+        """
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        wait = 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+        return max(wait, self.paused_until - now)
+
+
+class HostRateBudget:
+    """
+    Request budget shared by every crawler process on the host.
+
+    The processes agree through a small file holding, per domain, the
+    earliest time the next request may go out. A process takes the next
+    free slot under an exclusive ``flock``, moves the time on by one
+    interval and waits until its slot comes up, so together they never send
+    more than ``rate`` requests per second to a domain however many
+    ``scrapy crawl`` processes are running.
+
+    Each of the ``SLOTS`` records holds a domain hash next to its time.
+    A domain uses the record holding its hash, searching on from the slot
+    its hash points at. A domain without a record takes an empty one, or one
+    whose time has passed, since nobody has to wait for that slot any more.
+    Only with more than ``SLOTS`` domains busy at the same moment would
+    one of them lose its place.
+    """
+
+    SLOTS = 64
+    RECORD = struct.Struct("<Qd")
+
+    def __init__(self, path: str | Path, rate: float):
+        self.path = Path(path)
+        self.interval = 1 / rate
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        size = self.SLOTS * self.RECORD.size
+        if os.fstat(self.fd).st_size < size:
+            os.ftruncate(self.fd, size)
+
+    def reserve(self, domain: str) -> float:
+        """Claim the next slot for ``domain`` and return the seconds until it."""
+        key = hash_domain(domain)
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+        try:
+            now = time.time()
+            index, next_at = self._find(key, now)
+            slot = max(now, next_at)
+            os.pwrite(self.fd, self.RECORD.pack(key, slot + self.interval),
+                      index * self.RECORD.size)
+        finally:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+        return slot - now
+
+    def _find(self, key: int, now: float) -> tuple[int, float]:
+        """Record index for ``key`` and the time stored in it, 0 for a new record."""
+        records = list(self.RECORD.iter_unpack(
+            os.pread(self.fd, self.SLOTS * self.RECORD.size, 0)
+        ))
+        free = None
+        oldest = None
+        for step in range(self.SLOTS):
+            index = (key + step) % self.SLOTS
+            stored_key, next_at = records[index]
+            if stored_key == key:
+                return index, next_at
+            if free is None and (stored_key == 0 or next_at <= now):
+                free = index
+            if oldest is None or next_at < records[oldest][1]:
+                oldest = index
+        return (free if free is not None else oldest), 0.0
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+def hash_domain(domain: str) -> int:
+    """Stable across processes, unlike ``hash``."""
+    value = 14695981039346656037
+    for byte in domain.encode():
+        value = ((value ^ byte) * 1099511628211) % 2 ** 64
+    return value
+
+
+@dataclass
+class DomainState:
+    bucket: TokenBucket
+    ceiling: float
+    successes: int = 0
+    latency: float | None = None
+
+
+class AdaptiveRateMiddleware:
+    """
+    Adaptive per-domain request rate, replacing a fixed ``DOWNLOAD_DELAY``.
+
+    Every request takes a token from its domain's bucket before it is sent.
+    After ``RATE_CONTROL_PROBE_AFTER`` clean responses in a row the rate is
+    raised by 10%, up to a ceiling just below the last rate that got us
+    throttled; the ceiling itself creeps up on every probe. A 429 or 503
+    halves the rate and pauses the domain for ``Retry-After`` (or the
+    current delay), a Cloudflare challenge quarters it and is retried.
+    When the moving average of ``download_latency`` is above
+    ``RATE_CONTROL_TARGET_LATENCY``, probing stops and every response eases
+    the rate off by 10%. Responses served from the HTTP cache, or without a
+    ``download_latency``, count neither way.
+
+    With ``HOST_RATE_BUDGET`` set, every request also has to get a slot from
+    the host-wide budget, which caps all crawler processes together.
+
+    Crawlers with the same ``RATE_CONTROL_GROUP`` share one state per
+    domain, so the stages of an orchestrated run take their tokens from one
+    bucket and a backoff in one stage holds back the others. Their combined
+    rate is then what the settings above describe for a single spider.
+
+    Must run after the HTTP cache in ``DOWNLOADER_MIDDLEWARES`` (a higher
+    number than 900) so cache hits are not throttled.
+    """
+
+    # Domain states of each RATE_CONTROL_GROUP
+    groups: dict[str, dict[str, DomainState]] = {}
+
+    def __init__(self, start_delay: float, min_delay: float, max_delay: float,
+                 probe_after: int, target_latency: float,
+                 host_budget: HostRateBudget | None = None, stats=None,
+                 domains: dict[str, DomainState] | None = None):
+        self.start_rate = 1 / max(start_delay, min_delay, 0.001)
+        self.max_rate = 1 / max(min_delay, 0.001)
+        self.min_rate = 1 / max_delay
+        self.probe_after = probe_after
+        self.target_latency = target_latency
+        self.host_budget = host_budget
+        self.stats = stats
+        self.domains: dict[str, DomainState] = {} if domains is None else domains
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool("RATE_CONTROL_ENABLED"):
+            raise NotConfigured
+        host_budget = None
+        if settings.getfloat("HOST_RATE_BUDGET") > 0:
+            host_budget = HostRateBudget(
+                data_path(settings.get("HOST_RATE_BUDGET_FILE", "host_rate_budget")),
+                settings.getfloat("HOST_RATE_BUDGET"),
+            )
+        middleware = cls(
+            start_delay=settings.getfloat("RATE_CONTROL_START_DELAY", 6.0),
+            min_delay=settings.getfloat("RATE_CONTROL_MIN_DELAY", 2.0),
+            max_delay=settings.getfloat("RATE_CONTROL_MAX_DELAY", 120.0),
+            probe_after=settings.getint("RATE_CONTROL_PROBE_AFTER", 20),
+            target_latency=settings.getfloat("RATE_CONTROL_TARGET_LATENCY", 3.0),
+            host_budget=host_budget,
+            stats=crawler.stats,
+            domains=cls.shared_domains(settings.get("RATE_CONTROL_GROUP")),
+        )
+        crawler.signals.connect(middleware.spider_closed, signal=signals.spider_closed)
+        return middleware
+
+    @classmethod
+    def shared_domains(cls, group: str | None) -> dict[str, DomainState] | None:
+        """Domain states of a group, created on first use; None without a group."""
+        if not group:
+            return None
+        return cls.groups.setdefault(group, {})
+
+    @classmethod
+    def release_group(cls, group: str) -> None:
+        cls.groups.pop(group, None)
+
+    def spider_closed(self, spider):
+        if self.host_budget is not None:
+            self.host_budget.close()
+
+    async def process_request(self, request, spider):
+        state = self._state(request)
+        while True:
+            now = time.monotonic()
+            wait = state.bucket.reserve(now)
+            if wait > 0:
+                await self._sleep(wait)
+                # A backoff may have started while this request was waiting
+                if state.bucket.paused_until > time.monotonic():
+                    state.bucket.tokens += 1
+                    continue
+            break
+        if self.host_budget is not None:
+            wait = self.host_budget.reserve(self._domain(request))
+            if wait > 0:
+                self._inc_stat("ratecontrol/host_budget_waits")
+                await self._sleep(wait)
+        return None
+
+    @staticmethod
+    async def _sleep(seconds: float):
+        await maybe_deferred_to_future(deferLater(reactor, seconds, lambda: None))
+
+    def process_response(self, request, response, spider):
+        # Cache hits pass back through here but never touched the network
+        if "cached" in response.flags:
+            return response
+        state = self._state(request)
+        if self._is_challenge(response):
+            self._inc_stat("ratecontrol/challenges")
+            self._back_off(state, factor=0.25, pause=max(60.0, 1 / state.bucket.rate))
+            retry = get_retry_request(request, spider=spider, reason="cloudflare_challenge")
+            return retry or response
+        if response.status in (429, 503):
+            pause = self._retry_after(response) or 1 / state.bucket.rate
+            self._back_off(state, factor=0.5, pause=pause)
+            return response
+
+        latency = request.meta.get("download_latency")
+        if latency is None:
+            # Without a timing there is no evidence the domain can take more
+            return response
+        state.latency = latency if state.latency is None else 0.8 * state.latency + 0.2 * latency
+        if state.latency > self.target_latency:
+            self._set_rate(state, state.bucket.rate * 0.9)
+            state.successes = 0
+        else:
+            state.successes += 1
+            if state.successes >= self.probe_after:
+                state.successes = 0
+                state.ceiling = min(self.max_rate, state.ceiling * 1.02)
+                self._set_rate(state, min(state.bucket.rate * 1.1, state.ceiling))
+        return response
+
+    @staticmethod
+    def _domain(request) -> str:
+        return request.meta.get("download_slot") or urlparse_cached(request).hostname or ""
+
+    def _state(self, request) -> DomainState:
+        domain = self._domain(request)
+        state = self.domains.get(domain)
+        if state is None:
+            state = self.domains[domain] = DomainState(
+                bucket=TokenBucket(rate=self.start_rate), ceiling=self.max_rate
+            )
+            self._record_rate(state)
+        return state
+
+    def _back_off(self, state: DomainState, factor: float, pause: float):
+        self._inc_stat("ratecontrol/backoffs")
+        self._inc_stat("ratecontrol/wasted_requests")
+        state.ceiling = max(self.min_rate, state.bucket.rate * 0.9)
+        state.successes = 0
+        state.bucket.paused_until = max(state.bucket.paused_until, time.monotonic() + pause)
+        self._set_rate(state, state.bucket.rate * factor)
+
+    def _set_rate(self, state: DomainState, rate: float):
+        state.bucket.rate = min(self.max_rate, max(self.min_rate, rate))
+        self._record_rate(state)
+
+    def _record_rate(self, state: DomainState):
+        if self.stats:
+            self.stats.set_value("ratecontrol/rate", round(state.bucket.rate, 4))
+            self.stats.set_value("ratecontrol/delay", round(1 / state.bucket.rate, 2))
+
+    @staticmethod
+    def _is_challenge(response) -> bool:
+        if response.status not in (403, 503):
+            return False
+        if response.headers.get(b"cf-mitigated", b"").lower() == b"challenge":
+            return True
+        head = response.body[:4096]
+        return any(marker in head for marker in CHALLENGE_MARKERS)
+
+    @staticmethod
+    def _retry_after(response) -> float | None:
+        value = response.headers.get(b"Retry-After")
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            # HTTP-date form; fbref sends seconds, so fall back to the delay
+            return None
+
+    def _inc_stat(self, key: str):
+        if self.stats:
+            self.stats.inc_value(key)
@@ -0,0 +1,228 @@
+import math
+from array import array
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass, field
+
+from parsel import Selector
+
+from .tables import HEADER_ROW_CLASSES
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+INT = "int"
+FLOAT = "float"
+CATEGORY = "category"
+TEXT = "text"
+# fbref id taken from the cell's link, e.g. "e342ad68" from /en/players/e342ad68/...
+ID = "id"
+
+
+@dataclass(frozen=True)
+class Column:
+    """One output column, read from the first non-empty of ``stats``."""
+
+    name: str
+    stats: tuple[str, ...]
+    kind: str = TEXT
+    # Read the cell's link text instead of the whole cell, e.g. "Premier League"
+    # rather than "eng Premier League"
+    label: bool = False
+    # Rows where this column is empty are skipped
+    required: bool = False
+    # Rows where this column holds one of these values are skipped, e.g. the
+    # "Career" and "Total" rows of a player's season table
+    exclude: tuple[str, ...] = ()
+    # Value for empty text cells
+    default: str | None = None
+
+
+@dataclass(slots=True)
+class Categorical:
+    """Dictionary encoded strings: one small int code per row."""
+
+    codes: array = field(default_factory=lambda: array("i"))
+    categories: list[str] = field(default_factory=list)
+    index: dict[str, int] = field(default_factory=dict)
+
+    def append(self, value: str | None) -> None:
+        if not value:
+            self.codes.append(-1)
+            return
+        code = self.index.get(value)
+        if code is None:
+            code = self.index[value] = len(self.categories)
+            self.categories.append(value)
+        self.codes.append(code)
+
+    def tolist(self) -> list[str | None]:
+        categories = self.categories
+        return [categories[code] if code >= 0 else None for code in self.codes]
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+
+def _new_column(kind: str):
+    if kind == INT:
+        return array("q")
+    if kind == FLOAT:
+        return array("d")
+    if kind == CATEGORY:
+        return Categorical()
+    return []
+
+
+def to_int(text: str) -> int:
+    """Parse a fbref count such as "2,401"; anything unreadable is 0."""
+    try:
+        return int(text.replace(",", ""))
+    except ValueError:
+        try:
+            return int(float(text.replace(",", "")))
+        except ValueError:
+            return 0
+
+
+def to_float(text: str) -> float:
+    """Parse a fbref rate such as "0.45" or "1,024.5"; anything unreadable is NaN."""
+    try:
+        return float(text.replace(",", ""))
+    except ValueError:
+        return math.nan
+
+
+@dataclass
+class ColumnBatch:
+    """
+    A whole table as typed columns instead of one item per row.
+
+    Counts are ``array('q')`` (missing values are 0, as in the row items),
+    rates and expected values ``array('d')`` with NaN for missing, and
+    repeated names like position, club and league are dictionary encoded.
+    ``constants`` holds values shared by every row, such as the page URL.
+    """
+
+    item_type: str
+    columns: dict[str, array | Categorical | list] = field(default_factory=dict)
+    constants: dict[str, object] = field(default_factory=dict)
+    length: int = 0
+
+    def __len__(self) -> int:
+        return self.length
+
+    def column(self, name: str) -> list:
+        """Values of one column as Python objects, missing values as None."""
+        if name not in self.columns:
+            return [self.constants.get(name)] * self.length
+        values = self.columns[name]
+        if isinstance(values, Categorical):
+            return values.tolist()
+        if isinstance(values, array) and values.typecode == "d":
+            return [None if math.isnan(value) else value for value in values]
+        return list(values)
+
+    def rows(self, fields: Sequence[str]) -> Iterator[tuple]:
+        """Rebuild row tuples in ``fields`` order, for writers that need rows."""
+        return zip(*(self.column(name) for name in fields)) if self.length else iter(())
+
+    def to_numpy(self) -> dict:
+        """Columns as NumPy arrays; categorical columns become (codes, categories)."""
+        if numpy is None:
+            raise RuntimeError("to_numpy needs numpy, which is not installed")
+        result = {}
+        for name, values in self.columns.items():
+            if isinstance(values, Categorical):
+                result[name] = (numpy.frombuffer(values.codes, dtype=numpy.int32),
+                                numpy.array(values.categories, dtype=object))
+            elif isinstance(values, array):
+                result[name] = numpy.frombuffer(values, dtype=numpy.dtype(values.typecode))
+            else:
+                result[name] = numpy.array(values, dtype=object)
+        return result
+
+    def to_arrow(self):
+        """Columns and constants as a ``pyarrow.Table``."""
+        if pyarrow is None:
+            raise RuntimeError("to_arrow needs pyarrow, which is not installed")
+        arrays = {}
+        for name, values in self.columns.items():
+            if isinstance(values, Categorical):
+                codes = pyarrow.array(values.codes, type=pyarrow.int32(),
+                                      mask=[code < 0 for code in values.codes])
+                arrays[name] = pyarrow.DictionaryArray.from_arrays(codes, values.categories)
+            elif isinstance(values, array) and values.typecode == "d":
+                arrays[name] = pyarrow.array(values, from_pandas=True)
+            else:
+                arrays[name] = pyarrow.array(values)
+        for name, value in self.constants.items():
+            arrays.setdefault(name, pyarrow.array([value] * self.length))
+        return pyarrow.table(arrays)
+
+
+def _cell_text(cell, column: Column) -> str:
+    if column.kind == ID:
+        link = cell.find(".//a")
+        parts = (link.get("href") or "").split("/") if link is not None else []
+        return parts[3] if len(parts) > 3 else ""
+    if column.label:
+        link = cell.find(".//a")
+        if link is not None:
+            cell = link
+    return "".join(cell.itertext()).strip()
+
+
+def extract_columns(table: Selector, columns: Sequence[Column], item_type: str,
+                    constants: dict | None = None) -> ColumnBatch:
+    """Parse a fbref table straight into typed columns.
+
+    Works like ``extract_rows`` but converts every cell on the spot, so no
+    row record or item is built in between.
+    """
+    batch = ColumnBatch(item_type, {c.name: _new_column(c.kind) for c in columns},
+                        dict(constants or {}))
+    wanted: dict[str, list[tuple[int, int, Column]]] = {}
+    for position, column in enumerate(columns):
+        for priority, stat in enumerate(column.stats):
+            wanted.setdefault(stat, []).append((position, priority, column))
+    targets = [batch.columns[column.name] for column in columns]
+    required = [i for i, column in enumerate(columns) if column.required]
+    excluded = [(i, column.exclude) for i, column in enumerate(columns) if column.exclude]
+
+    for tr in table.root.iterfind(".//tbody/tr"):
+        if HEADER_ROW_CLASSES.intersection((tr.get("class") or "").split()):
+            continue
+        cells: list[tuple[int, str] | None] = [None] * len(columns)
+        for cell in tr:
+            stat = cell.get("data-stat")
+            if stat not in wanted:
+                continue
+            for position, priority, column in wanted[stat]:
+                current = cells[position]
+                if current is not None and current[0] <= priority:
+                    continue
+                text = _cell_text(cell, column)
+                if text:
+                    cells[position] = (priority, text)
+        if any(cells[i] is None for i in required):
+            continue
+        if any(cells[i] is not None and cells[i][1] in values for i, values in excluded):
+            continue
+        for position, column in enumerate(columns):
+            text = cells[position][1] if cells[position] is not None else ""
+            target = targets[position]
+            if column.kind == INT:
+                target.append(to_int(text) if text else 0)
+            elif column.kind == FLOAT:
+                target.append(to_float(text) if text else math.nan)
+            else:
+                target.append(text or column.default)
+        batch.length += 1
+    return batch
@@ -0,0 +1,138 @@
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+import psycopg2
+from psycopg2._psycopg import connection
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+from psycopg2.pool import PoolError, ThreadedConnectionPool
+from twisted.python.threadable import isInIOThread
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionPool:
+    """
+    Process-wide pool of PostgreSQL connections.
+
+    Every crawler in the process that asks for the same ``DATABASE_SETTINGS``
+    gets the same pool, so several spiders share at most ``max_size``
+    connections. Connections idle for longer than ``check_interval`` seconds
+    are pinged before they are handed out, broken ones are replaced, and
+    reconnects back off with jitter so a database restart doesn't get hit by
+    every thread at once.
+
+    Called from the reactor thread, where waiting would stall the whole
+    crawl, the pool never waits: it raises ``PoolError`` at once when no
+    connection is free or the database can't be reached.
+    """
+
+    _pools: dict[tuple, "ConnectionPool"] = {}
+    _lock = threading.Lock()
+
+    def __init__(self, settings: dict, min_size: int = 1, max_size: int = 8,
+                 check_interval: float = 30.0, connect_retries: int = 5):
+        self.settings = settings
+        self.max_size = max(1, max_size)
+        self.check_interval = check_interval
+        self.connect_retries = connect_retries
+        self.pool = ThreadedConnectionPool(min(min_size, self.max_size), self.max_size, **settings)
+        self.slots = threading.BoundedSemaphore(self.max_size)
+        self.last_used: dict[int, float] = {}
+        self.users = 0
+
+    @classmethod
+    def shared(cls, settings: dict, **kwargs) -> "ConnectionPool":
+        """Return the pool for these connection settings, creating it on first use.
+
+        Every call must be paired with ``release``.
+        """
+        key = tuple(sorted((name, str(value)) for name, value in settings.items()))
+        with cls._lock:
+            pool = cls._pools.get(key)
+            if pool is None:
+                pool = cls._pools[key] = cls(settings, **kwargs)
+            pool.users += 1
+            return pool
+
+    def release(self) -> None:
+        """Drop one user of a shared pool and close it when nobody is left."""
+        with self._lock:
+            self.users -= 1
+            if self.users > 0:
+                return
+            for key, pool in list(self._pools.items()):
+                if pool is self:
+                    del self._pools[key]
+        self.pool.closeall()
+
+    @contextmanager
+    def connection(self, timeout: float = 60.0) -> Iterator[connection]:
+        """Check out a healthy connection for the duration of the block.
+
+        Waits up to ``timeout`` seconds when every connection is in use,
+        except on the reactor thread. A connection that broke inside the
+        block is thrown away instead of going back to the pool.
+        """
+        in_reactor = isInIOThread()
+        if in_reactor:
+            if not self.slots.acquire(blocking=False):
+                raise PoolError("No database connection free")
+        elif not self.slots.acquire(timeout=timeout):
+            raise PoolError(f"No database connection free after {timeout} seconds")
+        try:
+            conn = self._checkout(wait=not in_reactor)
+            try:
+                yield conn
+            finally:
+                self._checkin(conn)
+        finally:
+            self.slots.release()
+
+    def _checkout(self, wait: bool = True) -> connection:
+        for attempt in range(self.connect_retries):
+            try:
+                conn = self.pool.getconn()
+            except psycopg2.OperationalError as e:
+                if not wait:
+                    raise PoolError(f"Database unreachable ({e})") from e
+                delay = min(0.5 * 2 ** attempt, 10.0) * random.uniform(0.5, 1.0)
+                logger.warning(f"Database unreachable ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+            if self._is_healthy(conn):
+                return conn
+            logger.info("Replacing broken database connection")
+            self.last_used.pop(id(conn), None)
+            self.pool.putconn(conn, close=True)
+        raise PoolError(f"Could not get a database connection after {self.connect_retries} attempts")
+
+    def _checkin(self, conn: connection) -> None:
+        try:
+            if not conn.closed and conn.info.transaction_status != TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+        except psycopg2.Error:
+            pass
+        if conn.closed:
+            self.last_used.pop(id(conn), None)
+            self.pool.putconn(conn, close=True)
+            return
+        self.last_used[id(conn)] = time.monotonic()
+        self.pool.putconn(conn)
+
+    def _is_healthy(self, conn: connection) -> bool:
+        if conn.closed:
+            return False
+        last_used = self.last_used.get(id(conn))
+        if last_used is not None and time.monotonic() - last_used < self.check_interval:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
@@ -0,0 +1,114 @@
+import logging
+import threading
+from dataclasses import dataclass
+
+import psycopg2
+from psycopg2._psycopg import connection
+from psycopg2.extras import execute_values
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Dimension:
+    """A lookup table that maps a natural name to its key."""
+
+    table: str
+    name_column: str
+    id_column: str
+    creatable: bool = True
+
+
+DIMENSIONS = {
+    "countries": Dimension("football.countries", "country_name", "country_id"),
+    "leagues": Dimension("football.leagues", "league_name", "league_id"),
+    # Club ids come from fbref, so unknown clubs can't be created from a name
+    "clubs": Dimension("football.clubs", "club_name", "club_id", creatable=False),
+}
+
+
+class DimensionCache:
+    """
+    In-memory copy of the dimension tables.
+
+    Everything is loaded when the spider opens, so resolving a name to its
+    key is a dictionary lookup. Names that are not known yet are inserted in
+    one statement per batch and their new keys are added to the cache, which
+    is shared by the writer threads.
+    """
+
+    def __init__(self, dimensions: dict[str, Dimension] | None = None):
+        self.dimensions = dimensions or DIMENSIONS
+        self.keys: dict[str, dict[str, int | str]] = {name: {} for name in self.dimensions}
+        self.lock = threading.Lock()
+
+    def load(self, conn: connection) -> int:
+        """Read every dimension table and return the number of members loaded."""
+        loaded = 0
+        for name, dimension in self.dimensions.items():
+            try:
+                with conn.cursor() as cur:
+                    cur.execute(f"SELECT {dimension.name_column}, {dimension.id_column} FROM {dimension.table}")
+                    members = dict(cur.fetchall())
+                conn.commit()
+            except psycopg2.Error as e:
+                conn.rollback()
+                logger.warning(f"Could not load dimension {name}: {e}")
+                continue
+            loaded += len(members)
+            self.add(name, members)
+        return loaded
+
+    def get(self, name: str, value: str) -> int | str | None:
+        return self.keys[name].get(value)
+
+    def add(self, name: str, members: dict[str, int | str]) -> None:
+        """Record members that were written to a dimension table elsewhere."""
+        with self.lock:
+            self.keys[name].update(members)
+
+    def resolve(self, conn: connection, name: str, values: set[str]) -> dict[str, int | str]:
+        """Return the keys for ``values``, creating the members that don't exist yet.
+
+        New members are committed straight away so the cache never holds a
+        key whose row was rolled back.
+        """
+        dimension = self.dimensions[name]
+        with self.lock:
+            known = self.keys[name]
+            missing = [value for value in values if value is not None and value not in known]
+        if missing:
+            with conn.cursor() as cur:
+                if dimension.creatable:
+                    execute_values(
+                        cur,
+                        f"INSERT INTO {dimension.table} ({dimension.name_column}) VALUES %s "
+                        f"ON CONFLICT DO NOTHING",
+                        [(value,) for value in missing],
+                    )
+                # Another process may have created some of them, so read the
+                # keys back instead of relying on RETURNING
+                found = self._fetch(cur, dimension, missing)
+            conn.commit()
+            self.add(name, found)
+        with self.lock:
+            return {value: self.keys[name].get(value) for value in values}
+
+    def learn(self, conn: connection, name: str, values: set[str]) -> None:
+        """Read back the keys of members just written to a dimension table by name."""
+        values = [value for value in values if value is not None]
+        if not values:
+            return
+        with conn.cursor() as cur:
+            found = self._fetch(cur, self.dimensions[name], values)
+        conn.commit()
+        self.add(name, found)
+
+    @staticmethod
+    def _fetch(cur, dimension: Dimension, values: list[str]) -> dict[str, int | str]:
+        cur.execute(
+            f"SELECT {dimension.name_column}, {dimension.id_column} FROM {dimension.table} "
+            f"WHERE {dimension.name_column} = ANY(%s)",
+            (values,),
+        )
+        return dict(cur.fetchall())
@@ -0,0 +1,134 @@
+import hashlib
+import threading
+from array import array
+from bisect import bisect_left
+
+from psycopg2._psycopg import connection, cursor
+from psycopg2.extras import execute_values
+
+
+def _hash64(value: str) -> int:
+    """Signed 64 bit hash, so it fits a BIGINT column."""
+    digest = hashlib.blake2b(value.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+class TableHashes:
+    """
+    Fingerprints of one table, keyed by natural key hash.
+
+    Hashes loaded from the database sit in two sorted arrays, 16 bytes per
+    row, and are found by binary search. Hashes written during the run go
+    to a dict that is checked first.
+    """
+
+    __slots__ = ("keys", "values", "recent")
+
+    def __init__(self, keys: array | None = None, values: array | None = None):
+        self.keys = array("q") if keys is None else keys
+        self.values = array("q") if values is None else values
+        self.recent: dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.keys) + len(self.recent)
+
+    def get(self, key_hash: int) -> int | None:
+        fingerprint = self.recent.get(key_hash)
+        if fingerprint is not None:
+            return fingerprint
+        i = bisect_left(self.keys, key_hash)
+        if i < len(self.keys) and self.keys[i] == key_hash:
+            return self.values[i]
+        return None
+
+
+class FingerprintIndex:
+    """
+    Content hashes of stored rows, keyed by table and natural key.
+
+    Both the natural key and the row content are kept as 64 bit hashes (see
+    ``TableHashes``), about 16 MB per million stored rows. The index is
+    persisted in ``football.row_fingerprints``; the rows of a table are
+    loaded the first time the spider writes to it, so a spider only holds
+    the tables it writes.
+
+    Writer threads ``remember`` new hashes while the reactor thread checks
+    items with ``is_unchanged``, so both go through a lock.
+    """
+
+    TABLE = "football.row_fingerprints"
+
+    def __init__(self):
+        self.hashes: dict[str, TableHashes] = {}
+        # Tables whose stored fingerprints were read, or that are checked without them
+        self.loaded: set[str] = set()
+        self.lock = threading.Lock()
+
+    def create_table(self, cur: cursor) -> None:
+        cur.execute(f"""
+            CREATE TABLE IF NOT EXISTS {self.TABLE} (
+                table_name VARCHAR(64) NOT NULL,
+                key_hash BIGINT NOT NULL,
+                fingerprint BIGINT NOT NULL,
+                PRIMARY KEY (table_name, key_hash)
+            )
+        """)
+
+    def load(self, conn: connection, table: str) -> int:
+        """Read the stored fingerprints of one table into memory and return how many were loaded."""
+        keys, values = array("q"), array("q")
+        with conn.cursor(name="row_fingerprints") as cur:
+            cur.itersize = 50_000
+            # The primary key index hands the rows over already sorted
+            cur.execute(
+                f"SELECT key_hash, fingerprint FROM {self.TABLE} "
+                f"WHERE table_name = %s ORDER BY key_hash",
+                (table,),
+            )
+            for key_hash, fingerprint in cur:
+                keys.append(key_hash)
+                values.append(fingerprint)
+        conn.commit()
+        hashes = TableHashes(keys, values)
+        with self.lock:
+            # Hashes remembered while loading are newer than the stored ones
+            if table in self.hashes:
+                hashes.recent.update(self.hashes[table].recent)
+            self.hashes[table] = hashes
+            self.loaded.add(table)
+        return len(keys)
+
+    @staticmethod
+    def fingerprint(key: tuple, row: tuple) -> tuple[int, int]:
+        """Return the hashes of a natural key and of a full row."""
+        return _hash64("\x1f".join(map(str, key))), _hash64(repr(row))
+
+    def is_unchanged(self, table: str, key: tuple, row: tuple) -> bool:
+        key_hash, fingerprint = self.fingerprint(key, row)
+        with self.lock:
+            hashes = self.hashes.get(table)
+            return hashes is not None and hashes.get(key_hash) == fingerprint
+
+    def store(self, cur: cursor, table: str, entries: list[tuple[tuple, tuple]]) -> dict[int, int]:
+        """Persist fingerprints for (key, row) pairs that were just written.
+
+        Runs on the caller's cursor so the fingerprints commit together with
+        the rows they describe. Pass the returned hashes to ``remember`` once
+        that commit succeeded.
+        """
+        if not entries:
+            return {}
+        hashes = dict(self.fingerprint(key, row) for key, row in entries)
+        execute_values(
+            cur,
+            f"INSERT INTO {self.TABLE} (table_name, key_hash, fingerprint) VALUES %s "
+            f"ON CONFLICT (table_name, key_hash) DO UPDATE SET fingerprint = EXCLUDED.fingerprint",
+            [(table, key_hash, fingerprint) for key_hash, fingerprint in hashes.items()],
+            page_size=len(hashes),
+        )
+        return hashes
+
+    def remember(self, table: str, hashes: dict[int, int]) -> None:
+        """Add hashes of committed rows; safe to call from writer threads."""
+        with self.lock:
+            self.hashes.setdefault(table, TableHashes()).recent.update(hashes)
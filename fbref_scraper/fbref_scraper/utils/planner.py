@@ -0,0 +1,163 @@
+from dataclasses import dataclass
+from datetime import date
+from typing import Iterable, Iterator
+
+from .schema import BIG5_PAGES
+from .urls import League, get_big5_stats_url, get_league_years_url
+
+
+def current_season_start(today: date | None = None) -> int:
+    """Start year of the season in progress; European seasons start in July."""
+    today = today or date.today()
+    return today.year if today.month >= 7 else today.year - 1
+
+
+def season_name(start: int) -> str:
+    """2024 -> "2024-2025"."""
+    return f"{start}-{start + 1}"
+
+
+def season_start(season: str) -> int:
+    """ "2024-2025" or "2024" -> 2024.
+
+    Raises:
+        ValueError: If Season format not YYYY-YYYY or YYYY
+    """
+    first, _, second = season.partition("-")
+    if not first.isdigit() or len(first) != 4 or (second and (
+            not second.isdigit() or int(second) != int(first) + 1)):
+        raise ValueError(f"Invalid season {season!r}. Must be in format YYYY-YYYY")
+    return int(first)
+
+
+def parse_seasons(spec: str) -> list[str]:
+    """Seasons from a spider argument: "2024-2025", "2018-2019:2023-2024" or a comma list of both."""
+    seasons = []
+    for part in spec.split(","):
+        first, _, last = part.strip().partition(":")
+        start = season_start(first)
+        end = season_start(last) if last else start
+        if end < start:
+            raise ValueError(f"Invalid season range {part.strip()!r}. Must be in format FIRST:LAST")
+        seasons.extend(season_name(year) for year in range(start, end + 1))
+    return seasons
+
+
+@dataclass(frozen=True)
+class Competition:
+    """
+    What the planner needs to know about a competition to list its seasons.
+
+    ``first_season`` is the start year of the oldest season on the
+    competition's history page; ``missing`` lists start years in between
+    when the competition was not played.
+    """
+
+    comp_id: str
+    slug: str
+    first_season: int
+    missing: frozenset[int] = frozenset()
+
+    def has_season(self, start: int, today: date | None = None) -> bool:
+        return (self.first_season <= start <= current_season_start(today)
+                and start not in self.missing)
+
+
+COMPETITIONS = {
+    League.PREMIER_LEAGUE.id: Competition(
+        League.PREMIER_LEAGUE.id, League.PREMIER_LEAGUE.full_name, 1888,
+        # No league football during the two world wars
+        frozenset([*range(1915, 1919), *range(1939, 1946)]),
+    ),
+    League.LA_LIGA.id: Competition(
+        League.LA_LIGA.id, League.LA_LIGA.full_name, 1928,
+        # Spanish Civil War
+        frozenset(range(1936, 1939)),
+    ),
+    League.SERIE_A.id: Competition(
+        League.SERIE_A.id, League.SERIE_A.full_name, 1929,
+        frozenset(range(1943, 1945)),
+    ),
+    League.BUNDESLIGA.id: Competition(
+        League.BUNDESLIGA.id, League.BUNDESLIGA.full_name, 1963,
+    ),
+    League.LIGUE_1.id: Competition(
+        League.LIGUE_1.id, League.LIGUE_1.full_name, 1932,
+        frozenset(range(1939, 1945)),
+    ),
+}
+
+
+@dataclass(frozen=True)
+class PlannedUrl:
+    """One page of the frontier."""
+
+    url: str
+    comp_id: str
+    season: str
+    # "season" for a competition's season page, otherwise the Big 5 stat family
+    kind: str = "season"
+
+
+class UrlPlanner:
+    """
+    Builds the season URLs of competitions locally instead of reading them
+    from the ``/history/*-Seasons`` pages.
+
+    Season URLs on fbref are deterministic, so for a backfill the whole
+    frontier can be listed up front; seasons the competition didn't have
+    are left out using ``COMPETITIONS``.
+    """
+
+    def __init__(self, competitions: dict[str, Competition] | None = None,
+                 today: date | None = None):
+        self.competitions = competitions or COMPETITIONS
+        self.today = today
+
+    def competition(self, comp_id: str) -> Competition:
+        """
+        The planner's record of a competition.
+
+        Raises:
+            ValueError: If the planner does not know the competition
+        """
+        try:
+            return self.competitions[comp_id]
+        except KeyError:
+            raise ValueError(f"Unknown competition {comp_id!r}. "
+                             f"Must be one of {', '.join(self.competitions)}") from None
+
+    def seasons(self, comp_id: str, first: str | None = None, last: str | None = None) -> list[str]:
+        """Seasons of a competition from ``first`` to ``last`` (both included) that took place."""
+        competition = self.competition(comp_id)
+        start = season_start(first) if first else competition.first_season
+        end = season_start(last) if last else current_season_start(self.today)
+        return [season_name(year) for year in range(start, end + 1)
+                if competition.has_season(year, self.today)]
+
+    def is_valid(self, comp_id: str, season: str) -> bool:
+        """Whether a competition had a season, without asking fbref."""
+        competition = self.competitions.get(comp_id)
+        if competition is None:
+            return False
+        try:
+            return competition.has_season(season_start(season), self.today)
+        except ValueError:
+            return False
+
+    def season_urls(self, comp_ids: Iterable[str] | None = None, first: str | None = None,
+                    last: str | None = None) -> Iterator[PlannedUrl]:
+        """Season pages of every competition, newest season first."""
+        for comp_id in comp_ids or self.competitions:
+            competition = self.competition(comp_id)
+            for season in reversed(self.seasons(comp_id, first, last)):
+                yield PlannedUrl(get_league_years_url(competition.slug, comp_id, season),
+                                 comp_id, season)
+
+    def big5_urls(self, seasons: Iterable[str], families: Iterable[str] | None = None,
+                  scope: str = "players") -> Iterator[PlannedUrl]:
+        """Big 5 stat pages of each season, one per stat family."""
+        for season in seasons:
+            for name in families or BIG5_PAGES:
+                page, _ = BIG5_PAGES[name]
+                yield PlannedUrl(get_big5_stats_url(season, page, scope), "Big5", season, name)
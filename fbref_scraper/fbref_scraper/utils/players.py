@@ -0,0 +1,62 @@
+from dataclasses import dataclass, field
+
+from .urls import extract_player_id
+
+
+@dataclass
+class PlayerEntry:
+    """One player of the run: the page to fetch and the context it was first found in."""
+
+    player_id: str
+    url: str
+    context: dict = field(default_factory=dict)
+
+
+class PlayerRegistry:
+    """
+    Every player seen during a run, keyed by fbref player id.
+
+    A player shows up on the squad page of every club and season they
+    played for. The first sighting asks for the page to be fetched and
+    keeps its context (club, season, league); later ones are only counted,
+    so the page is requested once however many squads list the player.
+
+    The page gives one item, with the club of the first sighting. Every
+    club and season a player played for is already kept by the statistics
+    stage, one stats row each, so the other sightings are not stored.
+    """
+
+    def __init__(self):
+        self.players: dict[str, PlayerEntry] = {}
+        self.merged = 0
+
+    def __len__(self) -> int:
+        return len(self.players)
+
+    def __contains__(self, player_id: str) -> bool:
+        return player_id in self.players
+
+    def add(self, url: str, context: dict | None = None) -> bool:
+        """Record a sighting of the player at ``url``; returns whether the page still has to be fetched."""
+        player_id = extract_player_id(url)
+        if player_id in self.players:
+            self.merged += 1
+            return False
+        context = {key: value for key, value in (context or {}).items() if value is not None}
+        self.players[player_id] = PlayerEntry(player_id, url, context)
+        return True
+
+    def resolve(self, player_id: str, item):
+        """Fill the item parsed from a player's page and return it.
+
+        Fields the item leaves unset, e.g. ``club``, are filled from the
+        context the player was first found in.
+        """
+        entry = self.players.get(player_id)
+        if entry is None:
+            entry = self.players[player_id] = PlayerEntry(player_id, item.get("url", ""))
+        fields = getattr(item, "fields", item)
+        for key, value in entry.context.items():
+            if key in fields and item.get(key) is None:
+                item[key] = value
+        return item
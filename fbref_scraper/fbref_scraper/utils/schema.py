@@ -0,0 +1,392 @@
+import math
+import re
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import cached_property
+
+from .columns import CATEGORY, FLOAT, ID, INT, TEXT, Column, to_float, to_int
+from .tables import TableRow
+
+WHITESPACE_RE = re.compile(r"\s+")
+
+SQL_TYPES = {
+    INT: "INTEGER",
+    FLOAT: "DOUBLE PRECISION",
+    CATEGORY: "VARCHAR(255)",
+    TEXT: "VARCHAR(255)",
+    ID: "VARCHAR(255)",
+}
+
+
+@dataclass(frozen=True)
+class Stat:
+    """One column of a table family.
+
+    ``stat`` is the fbref ``data-stat`` attribute, ``field`` the item field
+    and database column when it differs. Constant stats are not read from
+    the table but filled in from the page (season, club, URL).
+    """
+
+    stat: str
+    kind: str = INT
+    nullable: bool = True
+    field: str = ""
+    fallbacks: tuple[str, ...] = ()
+    label: bool = False
+    constant: bool = False
+    default: str | None = None
+    sql_type: str = ""
+    # Values marking rows that are not data, e.g. totals; those rows are skipped
+    exclude: tuple[str, ...] = ()
+
+    @property
+    def name(self) -> str:
+        return self.field or self.stat
+
+    @property
+    def column(self) -> Column:
+        return Column(self.name, (self.stat, *self.fallbacks), self.kind, label=self.label,
+                      required=not self.nullable, default=self.default, exclude=self.exclude)
+
+    @property
+    def ddl(self) -> str:
+        null = "" if self.nullable else " NOT NULL"
+        return f"{self.name} {self.sql_type or SQL_TYPES[self.kind]}{null}"
+
+
+def _coerce_int(value) -> int:
+    if isinstance(value, int):
+        return value
+    return to_int(str(value)) if value not in (None, "") else 0
+
+
+def _coerce_float(value) -> float | None:
+    if isinstance(value, float):
+        return None if math.isnan(value) else value
+    if value in (None, ""):
+        return None
+    number = to_float(str(value))
+    return None if math.isnan(number) else number
+
+
+def _coerce_text(value) -> str | None:
+    if value is None:
+        return None
+    return WHITESPACE_RE.sub(" ", str(value).strip()) or None
+
+
+CONVERTERS: dict[str, Callable] = {
+    INT: _coerce_int,
+    FLOAT: _coerce_float,
+    CATEGORY: _coerce_text,
+    TEXT: _coerce_text,
+    ID: _coerce_text,
+}
+
+
+@dataclass(frozen=True)
+class TableFamily:
+    """
+    One kind of fbref stats table and everything derived from it.
+
+    The columns for ``extract_columns``, the coercion of row records and
+    items, the validation and the table DDL are all generated from
+    ``stats``, so adding a stat or a family is a change to ``FAMILIES``
+    only.
+    """
+
+    name: str
+    # Matches the ids of the family's tables, e.g. stats_shooting_9
+    table_id: str
+    table: str
+    stats: tuple[Stat, ...]
+    key: tuple[str, ...]
+    # Item class carrying single rows of this family, if there is one
+    item: str = ""
+
+    @property
+    def item_type(self) -> str:
+        """Key of the family's writer in ``WRITERS``."""
+        return self.item or f"stats_{self.name}"
+
+    @property
+    def fields(self) -> tuple[str, ...]:
+        return tuple(stat.name for stat in self.stats)
+
+    @property
+    def numeric_fields(self) -> tuple[str, ...]:
+        return tuple(stat.name for stat in self.stats if stat.kind in (INT, FLOAT))
+
+    @property
+    def required_fields(self) -> tuple[str, ...]:
+        return tuple(stat.name for stat in self.stats if not stat.nullable)
+
+    def matches(self, table_id: str) -> bool:
+        return re.fullmatch(self.table_id, table_id) is not None
+
+    def columns(self) -> tuple[Column, ...]:
+        """Columns to read from the table; constants are added by the caller."""
+        return tuple(stat.column for stat in self.stats if not stat.constant)
+
+    @cached_property
+    def converters(self) -> list[tuple[str, Callable]]:
+        """(field, converter) pairs for coercing item values."""
+        return [(stat.name, CONVERTERS[stat.kind]) for stat in self.stats]
+
+    def coercer(self) -> Callable[[TableRow], dict]:
+        """Compile a function turning a ``TableRow`` into typed field values.
+
+        The lookups for every column are resolved once here, so the returned
+        function only reads cells and converts them.
+        """
+        plan = []
+        for stat in self.stats:
+            if stat.constant:
+                continue
+            if stat.kind == ID:
+                source = "links"
+            elif stat.label:
+                source = "labels"
+            else:
+                source = "values"
+            plan.append((stat.name, (stat.stat, *stat.fallbacks), source, stat.kind,
+                         CONVERTERS[stat.kind], stat.default))
+
+        def coerce(row: TableRow) -> dict:
+            values = {}
+            for name, stats, source, kind, convert, default in plan:
+                cells = getattr(row, source)
+                text = next((cells[stat] for stat in stats if cells.get(stat)), None)
+                if text is None and source == "labels":
+                    text = next((row.values[stat] for stat in stats if row.values.get(stat)), None)
+                if kind == ID and text:
+                    parts = text.split("/")
+                    text = parts[3] if len(parts) > 3 else None
+                value = convert(text)
+                values[name] = default if value is None and default is not None else value
+            return values
+
+        return coerce
+
+    def validate(self, values) -> list[str]:
+        """Problems with a row or item, as messages; empty when it is valid."""
+        problems = [f"Missing required field: {name}"
+                    for name in self.required_fields if not values.get(name)]
+        for stat in self.stats:
+            value = values.get(stat.name)
+            if value is None or stat.kind not in (INT, FLOAT):
+                continue
+            try:
+                int(value) if stat.kind == INT else float(value)
+            except (ValueError, TypeError):
+                problems.append(f"Invalid numeric value for {stat.name}: {value}")
+        return problems
+
+    def ddl(self) -> str:
+        columns = ",\n    ".join(stat.ddl for stat in self.stats)
+        return (
+            f"CREATE TABLE IF NOT EXISTS {self.table} (\n"
+            f"    id SERIAL PRIMARY KEY,\n"
+            f"    {columns},\n"
+            f"    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,\n"
+            f"    UNIQUE({', '.join(self.key)})\n"
+            f")"
+        )
+
+
+def _stats(*names: str, kind: str = INT) -> tuple[Stat, ...]:
+    return tuple(Stat(name, kind) for name in names)
+
+
+# Summary rows of a player's season table, which have no single season
+TOTAL_SEASONS = ("Career", "Total")
+
+# Columns every table on a squad page starts with
+SQUAD_PLAYER = (
+    Stat("player", ID, nullable=False, field="player_id"),
+    Stat("player", TEXT, nullable=False, field="player_name", label=True),
+    Stat("season", TEXT, nullable=False, constant=True, sql_type="VARCHAR(50)"),
+    Stat("club_id", TEXT, nullable=False, constant=True),
+    Stat("position", CATEGORY, sql_type="VARCHAR(50)"),
+)
+SQUAD_KEY = ("player_id", "season", "club_id")
+
+
+def _squad_family(name: str, table_id: str, *stats: Stat) -> TableFamily:
+    return TableFamily(name, table_id, f"football.player_{name}", SQUAD_PLAYER + stats, SQUAD_KEY)
+
+
+FAMILIES = {
+    # Seasons on a player's own page, one PlayerStatsItem per row
+    "player_stats": TableFamily(
+        name="player_stats",
+        table_id=r"stats_standard(_\w+)?",
+        table="football.player_stats",
+        stats=(
+            Stat("player_id", TEXT, nullable=False, constant=True),
+            Stat("season", TEXT, nullable=False, sql_type="VARCHAR(50)",
+                 exclude=TOTAL_SEASONS),
+            Stat("team", CATEGORY, field="club", default="Unknown"),
+            Stat("comp_level", CATEGORY, field="league", label=True, default="Unknown"),
+            Stat("position", CATEGORY, default="Unknown", sql_type="VARCHAR(50)"),
+            # "matches" is the link to the match logs on newer pages
+            Stat("games", field="matches_played", fallbacks=("matches",)),
+            Stat("goals"),
+            Stat("assists"),
+            Stat("cards_yellow", field="yellow_cards"),
+            Stat("cards_red", field="red_cards"),
+            Stat("minutes", field="minutes_played"),
+            Stat("url", TEXT, nullable=False, constant=True, sql_type="VARCHAR(512)"),
+        ),
+        key=("player_id", "season", "club"),
+        item="PlayerStatsItem",
+    ),
+    "standard": _squad_family(
+        "standard", r"stats_standard_\w+",
+        Stat("age", TEXT, sql_type="VARCHAR(10)"),
+        *_stats("games", "games_starts", "minutes", "goals", "assists", "goals_assists",
+                "goals_pens", "pens_made", "pens_att", "cards_yellow", "cards_red",
+                "progressive_carries", "progressive_passes", "progressive_passes_received"),
+        *_stats("minutes_90s", "xg", "npxg", "xg_assist", "npxg_xg_assist", "goals_per90",
+                "assists_per90", "goals_assists_per90", "goals_pens_per90",
+                "goals_assists_pens_per90", "xg_per90", "xg_assist_per90",
+                "xg_xg_assist_per90", "npxg_per90", "npxg_xg_assist_per90", kind=FLOAT),
+    ),
+    "shooting": _squad_family(
+        "shooting", r"stats_shooting_\w+",
+        *_stats("goals", "shots", "shots_on_target", "shots_free_kicks", "pens_made", "pens_att"),
+        *_stats("minutes_90s", "shots_on_target_pct", "shots_per90", "shots_on_target_per90",
+                "goals_per_shot", "goals_per_shot_on_target", "average_shot_distance", "xg",
+                "npxg", "npxg_per_shot", "xg_net", "npxg_net", kind=FLOAT),
+    ),
+    "passing": _squad_family(
+        "passing", r"stats_passing_\w+",
+        *_stats("passes_completed", "passes", "passes_total_distance",
+                "passes_progressive_distance", "passes_completed_short", "passes_short",
+                "passes_completed_medium", "passes_medium", "passes_completed_long",
+                "passes_long", "assists", "assisted_shots", "passes_into_final_third",
+                "passes_into_penalty_area", "crosses_into_penalty_area", "progressive_passes"),
+        *_stats("minutes_90s", "passes_pct", "passes_pct_short", "passes_pct_medium",
+                "passes_pct_long", "xg_assist", "pass_xa", "xg_assist_net", kind=FLOAT),
+    ),
+    "gca": _squad_family(
+        "gca", r"stats_gca_\w+",
+        *_stats("sca", "sca_passes_live", "sca_passes_dead", "sca_take_ons", "sca_shots",
+                "sca_fouled", "sca_defense", "gca", "gca_passes_live", "gca_passes_dead",
+                "gca_take_ons", "gca_shots", "gca_fouled", "gca_defense"),
+        *_stats("minutes_90s", "sca_per90", "gca_per90", kind=FLOAT),
+    ),
+    "defense": _squad_family(
+        "defense", r"stats_defense_\w+",
+        *_stats("tackles", "tackles_won", "tackles_def_3rd", "tackles_mid_3rd",
+                "tackles_att_3rd", "challenge_tackles", "challenges", "challenges_lost",
+                "blocks", "blocked_shots", "blocked_passes", "interceptions",
+                "tackles_interceptions", "clearances", "errors"),
+        *_stats("minutes_90s", "challenge_tackles_pct", kind=FLOAT),
+    ),
+    "possession": _squad_family(
+        "possession", r"stats_possession_\w+",
+        *_stats("touches", "touches_def_pen_area", "touches_def_3rd", "touches_mid_3rd",
+                "touches_att_3rd", "touches_att_pen_area", "touches_live_ball", "take_ons",
+                "take_ons_won", "take_ons_tackled", "carries", "carries_distance",
+                "carries_progressive_distance", "progressive_carries",
+                "carries_into_final_third", "carries_into_penalty_area", "miscontrols",
+                "dispossessed", "passes_received", "progressive_passes_received"),
+        *_stats("minutes_90s", "take_ons_won_pct", "take_ons_tackled_pct", kind=FLOAT),
+    ),
+    "playing_time": _squad_family(
+        "playing_time", r"stats_playing_time_\w+",
+        *_stats("games", "minutes", "minutes_per_game", "games_starts", "minutes_per_start",
+                "games_complete", "games_subs", "minutes_per_sub", "unused_subs",
+                "on_goals_for", "on_goals_against", "plus_minus"),
+        *_stats("minutes_pct", "minutes_90s", "points_per_game", "plus_minus_per90",
+                "plus_minus_wowy", "on_xg_for", "on_xg_against", "xg_plus_minus",
+                "xg_plus_minus_per90", "xg_plus_minus_wowy", kind=FLOAT),
+    ),
+    "misc": _squad_family(
+        "misc", r"stats_misc_\w+",
+        *_stats("cards_yellow", "cards_red", "cards_yellow_red", "fouls", "fouled",
+                "offsides", "crosses", "interceptions", "tackles_won", "pens_won",
+                "pens_conceded", "own_goals", "ball_recoveries", "aerials_won",
+                "aerials_lost"),
+        *_stats("minutes_90s", "aerials_won_pct", kind=FLOAT),
+    ),
+    "keepers": _squad_family(
+        "keepers", r"stats_keeper_(?!adv)\w+",
+        *_stats("gk_games", "gk_games_starts", "gk_minutes", "gk_goals_against",
+                "gk_shots_on_target_against", "gk_saves", "gk_wins", "gk_ties", "gk_losses",
+                "gk_clean_sheets", "gk_pens_att", "gk_pens_allowed", "gk_pens_saved",
+                "gk_pens_missed"),
+        *_stats("minutes_90s", "gk_goals_against_per90", "gk_save_pct",
+                "gk_clean_sheets_pct", "gk_pens_save_pct", kind=FLOAT),
+    ),
+}
+
+# The Big 5 pages list every player of the five leagues in one table per
+# stat family, so club and league are read from each row instead of the page
+BIG5_PLAYER = (
+    Stat("player", ID, nullable=False, field="player_id"),
+    Stat("player", TEXT, nullable=False, field="player_name", label=True),
+    Stat("season", TEXT, nullable=False, constant=True, sql_type="VARCHAR(50)"),
+    Stat("team", ID, nullable=False, field="club_id"),
+    Stat("comp_level", ID, field="competition_id", sql_type="VARCHAR(50)"),
+    Stat("comp_level", CATEGORY, field="league", label=True),
+    Stat("position", CATEGORY, sql_type="VARCHAR(50)"),
+)
+
+# Page segment and table id of each squad family on the Big 5 player pages
+BIG5_PAGES = {
+    "standard": ("stats", "stats_standard"),
+    "shooting": ("shooting", "stats_shooting"),
+    "passing": ("passing", "stats_passing"),
+    "gca": ("gca", "stats_gca"),
+    "defense": ("defense", "stats_defense"),
+    "possession": ("possession", "stats_possession"),
+    "playing_time": ("playingtime", "stats_playing_time"),
+    "misc": ("misc", "stats_misc"),
+    "keepers": ("keepers", "stats_keeper"),
+}
+
+
+def _big5_family(name: str, table_id: str) -> TableFamily:
+    squad = FAMILIES[name]
+    return TableFamily(f"big5_{name}", table_id, f"football.big5_player_{name}",
+                       BIG5_PLAYER + squad.stats[len(SQUAD_PLAYER):], SQUAD_KEY)
+
+
+FAMILIES.update({
+    f"big5_{name}": _big5_family(name, table_id)
+    for name, (_, table_id) in BIG5_PAGES.items()
+})
+
+# One row per club on the Big 5 squad stats page
+FAMILIES["big5_squad_standard"] = TableFamily(
+    name="big5_squad_standard",
+    table_id=r"stats_teams_standard_for",
+    table="football.big5_squad_standard",
+    stats=(
+        Stat("team", ID, nullable=False, field="club_id"),
+        Stat("team", TEXT, nullable=False, field="club_name", label=True),
+        Stat("season", TEXT, nullable=False, constant=True, sql_type="VARCHAR(50)"),
+        Stat("comp_level", ID, field="competition_id", sql_type="VARCHAR(50)"),
+        Stat("comp_level", CATEGORY, field="league", label=True),
+        *_stats("players_used", "games", "games_starts", "minutes", "goals", "assists",
+                "goals_assists", "goals_pens", "pens_made", "pens_att", "cards_yellow",
+                "cards_red", "progressive_carries", "progressive_passes"),
+        *_stats("avg_age", "possession", "minutes_90s", "xg", "npxg", "xg_assist",
+                "npxg_xg_assist", "goals_per90", "assists_per90", "xg_per90",
+                "xg_assist_per90", kind=FLOAT),
+    ),
+    key=("club_id", "season"),
+)
+
+# Families whose rows travel as single items, by item class name
+ITEM_FAMILIES = {family.item: family for family in FAMILIES.values() if family.item}
+
+
+def family_for_table(table_id: str, families=None) -> TableFamily | None:
+    """The squad or Big 5 page family a table belongs to, judged by its id."""
+    for family in (families or FAMILIES).values():
+        if not family.item and family.matches(table_id):
+            return family
+    return None
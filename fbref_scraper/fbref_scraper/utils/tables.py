@@ -0,0 +1,103 @@
+import re
+from collections.abc import Iterator, Mapping
+from dataclasses import dataclass, field
+from weakref import WeakKeyDictionary
+
+from parsel import Selector
+from scrapy.http import TextResponse
+
+# fbref renders the first table of a page and ships the others inside HTML
+# comments, which JavaScript unwraps in the browser
+COMMENT_RE = re.compile(r"<!--(.*?)-->", re.S)
+
+# Rows fbref repeats inside <tbody> as column headers or separators
+HEADER_ROW_CLASSES = {"thead", "over_header", "spacer"}
+
+_cache: "WeakKeyDictionary[TextResponse, PageTables]" = WeakKeyDictionary()
+
+
+class PageTables(Mapping[str, Selector]):
+    """
+    Every table on a fbref page keyed by its id, including the hidden ones.
+
+    Comments holding a table are unwrapped in place and the page is parsed
+    once more, so a squad or season page gives the standard, shooting,
+    passing, etc. tables from a single fetch, in the order they appear on
+    the page. Use ``page_tables`` to get the instance for a response instead
+    of building a new one.
+    """
+
+    def __init__(self, response: TextResponse):
+        self.tables: dict[str, Selector] = {}
+        text = response.text
+        unwrapped = COMMENT_RE.sub(_unwrap_table, text)
+        document = response if unwrapped == text else Selector(text=unwrapped)
+        for table in document.xpath("//table[@id]"):
+            self.tables.setdefault(table.attrib["id"], table)
+
+    def __getitem__(self, table_id: str) -> Selector:
+        return self.tables[table_id]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.tables)
+
+    def __len__(self) -> int:
+        return len(self.tables)
+
+    def find(self, fragment: str) -> list[Selector]:
+        """Tables whose id contains ``fragment``, in page order."""
+        return [table for table_id, table in self.tables.items() if fragment in table_id]
+
+    def first(self, fragment: str) -> Selector | None:
+        tables = self.find(fragment)
+        return tables[0] if tables else None
+
+
+def _unwrap_table(match: re.Match) -> str:
+    comment = match.group(1)
+    return comment if "<table" in comment else match.group(0)
+
+
+def page_tables(response: TextResponse) -> PageTables:
+    """Return the tables of a response, unwrapping the hidden ones on first use."""
+    tables = _cache.get(response)
+    if tables is None:
+        tables = _cache[response] = PageTables(response)
+    return tables
+
+
+@dataclass(slots=True)
+class TableRow:
+    """One table row: the text, link and link text of every cell, keyed by ``data-stat``."""
+
+    values: dict[str, str] = field(default_factory=dict)
+    links: dict[str, str] = field(default_factory=dict)
+    labels: dict[str, str] = field(default_factory=dict)
+
+    def get(self, stat: str, default: str | None = None) -> str | None:
+        return self.values.get(stat) or default
+
+
+def extract_rows(table: Selector) -> list[TableRow]:
+    """Read every body row of a fbref table in one walk over the lxml tree.
+
+    Each cell is visited once, instead of running an XPath query per stat
+    and row. Repeated header and spacer rows are skipped.
+    """
+    rows = []
+    for tr in table.root.iterfind(".//tbody/tr"):
+        if HEADER_ROW_CLASSES.intersection((tr.get("class") or "").split()):
+            continue
+        row = TableRow()
+        for cell in tr:
+            stat = cell.get("data-stat")
+            if stat is None:
+                continue
+            row.values[stat] = "".join(cell.itertext()).strip()
+            link = cell.find(".//a")
+            if link is not None:
+                if link.get("href"):
+                    row.links[stat] = link.get("href")
+                row.labels[stat] = "".join(link.itertext()).strip()
+        rows.append(row)
+    return rows
@@ -5,16 +5,16 @@ class UrlBuilder:
     """
 
     def __init__(self, base_url, type_of_url):
-        self.base_url = base_url
+        self._base_url = base_url
         self.type_of_url = type_of_url
 
     @property
     def base_url(self) -> str:
-        return self.base_url
+        return self._base_url
 
     @base_url.setter
     def base_url(self, value: str) -> None:
-        self.base_url = value
+        self._base_url = value
 
     @property
     def url_type(self):
@@ -23,4 +23,4 @@ class UrlBuilder:
 
     @url_type.setter
     def url_type(self, value: tuple[str,str]) -> None:
-        self.url_type = value
\ No newline at end of file
+        self.type_of_url = value
\ No newline at end of file
@@ -1,5 +1,7 @@
 import re
+from dataclasses import dataclass
 from enum import Enum
+from functools import lru_cache
 
 
 class League(Enum):
@@ -29,6 +31,20 @@ def get_league_years_url(league_name: str, league_id: str, season: str) -> str:
     return f"https://fbref.com/en/comps/{league_id}/{season}/{season}-{league_name}-Stats"
 
 
+def get_big5_stats_url(season: str, page: str = "stats", scope: str = "players") -> str:
+    """
+    Big 5 leagues stats page of one season, e.g. the shooting stats of every
+    player (``page="shooting"``) or club (``scope="squads"``).
+
+    Raises:
+        ValueError: If Season format not YYYY-YYYY
+    """
+    if not "-" in season or not len(season) == 9:
+        raise ValueError("Invalid season. Must be in format YYYY-YYYY")
+
+    return f"https://fbref.com/en/comps/Big5/{season}/{page}/{scope}/{season}-Big-5-European-Leagues-Stats"
+
+
 def league_urls():
     urls = {}
     for league in League:
@@ -38,37 +54,119 @@ def league_urls():
     return urls
 
 
+class PageType(Enum):
+    COMPETITIONS = "competitions"
+    COMPETITION = "competition"
+    COMPETITION_SEASON = "competition_season"
+    HISTORY = "history"
+    SQUAD = "squad"
+    PLAYER = "player"
+    UNKNOWN = "unknown"
+
+
+@dataclass(frozen=True, slots=True)
+class FbrefUrl:
+    """What a fbref URL points at, as returned by ``route``."""
+
+    page_type: PageType
+    comp_id: str | None = None
+    season: str | None = None
+    squad_id: str | None = None
+    player_id: str | None = None
+    slug: str | None = None
+
+    @property
+    def name(self) -> str | None:
+        """The slug as a name, e.g. "Manchester-City" -> "Manchester City"."""
+        return self.slug.replace("-", " ") if self.slug else None
+
+    @property
+    def season_end(self) -> int | None:
+        """Last year of the season, 2025 for "2024-2025" and for "2025"."""
+        return int(self.season[-4:]) if self.season else None
+
+
+SEASON = r"\d{4}(?:-\d{4})?"
+SEGMENT = r"[^/?#]+"
+
+URL_RE = re.compile(rf"""
+    ^(?:https?://(?:www\.)?fbref\.com)?/en/
+    (?:
+        comps/(?P<history_comp>\w+)/history/(?P<history_slug>{SEGMENT}?)-Seasons
+      | comps/(?P<season_comp>\w+)/(?P<comp_season>{SEASON})/(?:{SEGMENT}/)*
+            (?:{SEASON}-)?(?P<season_slug>{SEGMENT}?)(?:-Stats|-Scores-and-Fixtures)
+      | comps/(?P<comp>\w+)/(?:{SEGMENT}/)*(?P<comp_slug>{SEGMENT}?)-Stats
+      | (?P<comps>comps/?)$
+      | squads/(?P<squad>[0-9a-f]{{8}})/(?:(?P<squad_season>{SEASON})/)?(?:{SEGMENT}/)*
+            (?P<squad_slug>{SEGMENT}?)-Stats
+      | players/(?P<player>[0-9a-f]{{8}})/(?:matchlogs/(?P<player_season>{SEASON})/)?(?:{SEGMENT}/)*
+            (?P<player_slug>{SEGMENT}?)(?:-Match-Logs|-Stats[^/?#]*)?(?=[?#]|$)
+    )
+    (?:[-/?#]|$)
+""", re.X)
+
+
+@lru_cache(maxsize=65536)
+def route(url: str) -> FbrefUrl:
+    """Classify a fbref URL, absolute or relative, with one regular expression match."""
+    match = URL_RE.match(url)
+    if match is None:
+        return FbrefUrl(PageType.UNKNOWN)
+    groups = match.groupdict()
+    if groups["history_comp"]:
+        return FbrefUrl(PageType.HISTORY, comp_id=groups["history_comp"], slug=groups["history_slug"])
+    if groups["season_comp"]:
+        return FbrefUrl(PageType.COMPETITION_SEASON, comp_id=groups["season_comp"],
+                        season=groups["comp_season"], slug=groups["season_slug"])
+    if groups["comp"]:
+        return FbrefUrl(PageType.COMPETITION, comp_id=groups["comp"], slug=groups["comp_slug"])
+    if groups["comps"]:
+        return FbrefUrl(PageType.COMPETITIONS)
+    if groups["squad"]:
+        return FbrefUrl(PageType.SQUAD, season=groups["squad_season"], squad_id=groups["squad"],
+                        slug=groups["squad_slug"])
+    return FbrefUrl(PageType.PLAYER, season=groups["player_season"], player_id=groups["player"],
+                    slug=groups["player_slug"])
+
+
+LEAGUE_NAMES = {league.id: league.full_name.replace("-", " ") for league in League}
+
+
+def league_name(url: str) -> str:
+    """Name of the competition a competition or history URL belongs to."""
+    page = route(url)
+    if page.comp_id is None:
+        return "Unknown"
+    return LEAGUE_NAMES.get(page.comp_id) or page.name or "Unknown"
+
+
 def extract_competition_id(url: str) -> str:
     """Extract competition ID from fbref competition URL."""
-    match = re.search(r'/comps/(\d+)/', url)
-    return match.group(1) if match else url.split('/')[-1]
+    return route(url).comp_id or url.split('/')[-1]
 
 
 def extract_club_id(url: str) -> str:
     """Extract club ID from fbref squad URL."""
-    match = re.search(r'/squads/([a-fA-F0-9-]+)/', url)
-    return match.group(1) if match else url.split('/')[-1]
+    return route(url).squad_id or url.split('/')[-1]
 
 
 def extract_player_id(url: str) -> str:
     """Extract player ID from fbref player URL."""
-    match = re.search(r'/players/([a-fA-F0-9-]+)/', url)
-    return match.group(1) if match else url.split('/')[-1]
+    return route(url).player_id or url.split('/')[-1]
 
 
 def extract_season_id(url: str) -> str:
     """Extract season ID from fbref season URL."""
-    # Look for year pattern like 2024-2025
-    match = re.search(r'/(\d{4}-\d{4})/', url)
-    if match:
-        return match.group(1)
+    season = route(url).season
+    if season:
+        return season
     # Fallback to general ID extraction
     match = re.search(r'/([a-fA-F0-9-]+)/', url)
     return match.group(1) if match else url.split('/')[-1]
 
 
 def extract_club_name(url: str) -> str:
-    return url.split("/")[-1].strip("Stats").replace("-", " ").strip()
+    return route(url).name or url.split("/")[-1].removesuffix("-Stats").replace("-", " ").strip()
 
 def get_squad_id(squad_id: str) -> str:
     return squad_id
@@ -0,0 +1,12 @@
+import sys
+from pathlib import Path
+
+from scrapy.utils.reactor import install_reactor
+
+# The Scrapy project directory holds the fbref_scraper package; the directory
+# above it is a package of the same name, so put the project first
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+# The project runs on the asyncio reactor (TWISTED_REACTOR); install it before
+# a module under test imports twisted.internet.reactor and gets the default one
+install_reactor("twisted.internet.asyncioreactor.AsyncioSelectorReactor")
@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+from scrapy import Request
+from scrapy.http import HtmlResponse
+
+from fbref_scraper.items import ClubItem, ColumnBatchItem
+from fbref_scraper.spiders.big5_spider import Big5Spider, parse_big5_table
+from fbref_scraper.utils.schema import FAMILIES
+from fbref_scraper.utils.urls import get_big5_stats_url
+
+SEASON = "2023-2024"
+
+
+def team(club_id, name):
+    return f'<td data-stat="team"><a href="/en/squads/{club_id}/{name}-Stats">{name}</a></td>'
+
+
+def comp(level, league):
+    return f'<td data-stat="comp_level"><span>{level}</span> <a href="/en/comps/9/">{league}</a></td>'
+
+
+def player_row(player_id, name, goals):
+    return (f'<tr><td data-stat="player"><a href="/en/players/{player_id}/{name}">{name}</a></td>'
+            + team("18bb7c10", "Arsenal") + comp("eng", "Premier League")
+            + f'<td data-stat="goals">{goals}</td><td data-stat="shots">{goals * 4}</td></tr>')
+
+
+SQUAD_PAGE = ("<html><table id='stats_teams_standard_for'><tbody>"
+              "<tr>" + team("18bb7c10", "Arsenal") + comp("eng", "Premier League")
+              + '<td data-stat="goals">88</td></tr>'
+              "<tr>" + team("206d90db", "Barcelona") + comp("es", "La Liga")
+              + '<td data-stat="goals">79</td></tr>'
+              "</tbody></table></html>").encode()
+
+# Both tables sit on the page; the family decides which one is read
+PLAYER_PAGE = ("<html><table id='stats_standard'><tbody>" + player_row("bc7dc64d", "Saka", 16)
+               + "</tbody></table><!-- <table id='stats_shooting'><tbody>"
+               + player_row("bc7dc64d", "Saka", 9) + player_row("e46012d4", "Havertz", 13)
+               + "</tbody></table> --></html>").encode()
+
+
+def parse(family, body, page="stats", scope="players"):
+    url = get_big5_stats_url(SEASON, page, scope)
+    request = Request(url, meta={"season": SEASON, "family": family})
+    return list(parse_big5_table(HtmlResponse(url, body=body, request=request)))
+
+
+def test_family_picks_its_own_table():
+    [item] = parse("big5_shooting", PLAYER_PAGE, page="shooting")
+    batch = item["batch"]
+    assert isinstance(item, ColumnBatchItem)
+    assert batch.item_type == FAMILIES["big5_shooting"].item_type
+    assert batch.column("player_id") == ["bc7dc64d", "e46012d4"]
+    assert batch.column("goals") == [9, 13]
+    assert batch.column("club_id") == ["18bb7c10", "18bb7c10"]
+    assert batch.column("season") == [SEASON, SEASON]
+
+    [standard] = parse("big5_standard", PLAYER_PAGE)
+    assert standard["batch"].column("goals") == [16]
+
+
+def test_squad_page_also_yields_clubs():
+    batch, *clubs = parse("big5_squad_standard", SQUAD_PAGE, scope="squads")
+    assert batch["batch"].column("league") == ["Premier League", "La Liga"]
+    assert all(isinstance(club, ClubItem) for club in clubs)
+    assert [dict(club) for club in clubs] == [
+        {"club_id": "18bb7c10", "club_name": "Arsenal"},
+        {"club_id": "206d90db", "club_name": "Barcelona"},
+    ]
+    # Player pages never fan out into clubs
+    assert not any(isinstance(item, ClubItem) for item in parse("big5_shooting", PLAYER_PAGE))
+
+
+def test_page_without_the_family_table():
+    assert parse("big5_passing", PLAYER_PAGE, page="passing") == []
+
+
+def test_one_request_per_family_and_season():
+    async def requests(spider):
+        return [request async for request in spider.start()]
+
+    spider = Big5Spider(seasons="2022-2023:2023-2024", families="shooting,keepers")
+    metas = [(request.meta["season"], request.meta["family"])
+             for request in asyncio.run(requests(spider))]
+    assert metas == [
+        ("2022-2023", "big5_squad_standard"), ("2023-2024", "big5_squad_standard"),
+        ("2022-2023", "big5_shooting"), ("2022-2023", "big5_keepers"),
+        ("2023-2024", "big5_shooting"), ("2023-2024", "big5_keepers"),
+    ]
+
+
+def test_unknown_families_are_rejected():
+    with pytest.raises(ValueError, match="Unknown Big 5 stat families: shots, xg"):
+        Big5Spider(families="standard,xg,shots")
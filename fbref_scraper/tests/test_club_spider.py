@@ -0,0 +1,18 @@
+from scrapy.http import HtmlResponse
+
+from fbref_scraper.spiders.club_spider import parse_clubs
+
+PAGE = b"""<html><table id="results2024-202591_overall"><tbody>
+<tr><td class="left" data-stat="team"><a href="/en/squads/18bb7c10/Arsenal-Stats">Arsenal</a></td></tr>
+<tr><td class="left" data-stat="team"><a href="/en/country/ENG/England-Football">England</a></td></tr>
+<tr><td class="left" data-stat="team"><a href="/en/squads/b8fd03ef/Manchester-City-Stats">Manchester City</a></td></tr>
+</tbody></table></html>"""
+
+
+def test_parse_clubs_skips_links_that_are_not_squads(capsys):
+    response = HtmlResponse(
+        "https://fbref.com/en/comps/9/2024-2025/2024-2025-Premier-League-Stats", body=PAGE
+    )
+    clubs = [(item["club_id"], item["club_name"]) for item in parse_clubs(response)]
+    assert clubs == [("18bb7c10", "Arsenal"), ("b8fd03ef", "Manchester City")]
+    assert capsys.readouterr().out == ""
@@ -0,0 +1,61 @@
+import math
+
+from scrapy.http import HtmlResponse
+
+from fbref_scraper.utils.columns import FLOAT, INT, Column, extract_columns
+from fbref_scraper.utils.schema import FAMILIES, TOTAL_SEASONS
+from fbref_scraper.utils.tables import extract_rows, page_tables
+
+PLAYER_STATS = FAMILIES["player_stats"]
+
+
+def season_row(season, goals, team="Arsenal"):
+    return (f'<tr><th data-stat="season">{season}</th>'
+            f'<td data-stat="team">{team}</td>'
+            f'<td data-stat="comp_level"><span>eng</span> <a href="/en/comps/9/">Premier League</a></td>'
+            f'<td data-stat="games">38</td><td data-stat="goals">{goals}</td>'
+            f'<td data-stat="minutes">2,401</td></tr>')
+
+
+PAGE = ("<html><table id='stats_standard_dom_lg'><tbody>"
+        + season_row("2022-2023", 14)
+        + season_row("2023-2024", 16)
+        + '<tr class="spacer"><td data-stat="season"></td></tr>'
+        + season_row("Career", 30, team="")
+        + season_row("Total", 30, team="")
+        + season_row("", 1)
+        + "</tbody></table></html>").encode()
+
+
+def table():
+    response = HtmlResponse("https://fbref.com/en/players/bc7dc64d/Bukayo-Saka", body=PAGE)
+    return page_tables(response)["stats_standard_dom_lg"]
+
+
+def test_columnar_and_row_output_agree():
+    batch = extract_columns(table(), PLAYER_STATS.columns(), PLAYER_STATS.item_type,
+                            {"player_id": "bc7dc64d", "url": "https://fbref.com/x"})
+    coerce = PLAYER_STATS.coercer()
+    rows = [coerce(row) for row in extract_rows(table())]
+    rows = [row for row in rows if row["season"] not in TOTAL_SEASONS and row["season"]]
+
+    assert batch.column("season") == [row["season"] for row in rows] == ["2022-2023", "2023-2024"]
+    assert batch.column("goals") == [row["goals"] for row in rows] == [14, 16]
+    assert batch.column("minutes_played") == [2401, 2401]
+    assert batch.column("league") == ["Premier League", "Premier League"]
+    assert batch.column("player_id") == ["bc7dc64d", "bc7dc64d"]
+
+
+def test_column_types_and_missing_values():
+    columns = (Column("season", ("season",), required=True),
+               Column("goals", ("goals",), INT),
+               Column("xg", ("xg",), FLOAT),
+               Column("matches", ("matches", "games"), INT))
+    batch = extract_columns(table(), columns, "test")
+    assert len(batch) == 4
+    assert batch.column("goals")[:2] == [14, 16]
+    assert batch.columns["xg"].typecode == "d" and math.isnan(batch.columns["xg"][0])
+    assert batch.column("xg")[0] is None
+    # Falls back to the second stat when the first is missing
+    assert batch.column("matches")[0] == 38
+    assert list(batch.rows(("season", "goals")))[0] == ("2022-2023", 14)
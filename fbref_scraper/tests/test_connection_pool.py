@@ -0,0 +1,48 @@
+import time
+
+import pytest
+from psycopg2.pool import PoolError
+from twisted.python import threadable
+
+from fbref_scraper.utils.connection_pool import ConnectionPool
+
+# Nothing listens on port 1, so connecting fails straight away
+UNREACHABLE = {"host": "127.0.0.1", "port": 1, "dbname": "fbref", "connect_timeout": 1}
+
+
+@pytest.fixture
+def reactor_thread():
+    threadable.registerAsIOThread()
+    yield
+    threadable.ioThread = None
+
+
+def test_reactor_thread_does_not_wait_for_a_free_connection(reactor_thread):
+    pool = ConnectionPool(UNREACHABLE, min_size=0, max_size=1)
+    pool.slots.acquire()
+    started = time.monotonic()
+    with pytest.raises(PoolError):
+        with pool.connection(timeout=30):
+            pass
+    assert time.monotonic() - started < 1
+
+
+def test_reactor_thread_does_not_back_off_on_unreachable_database(reactor_thread):
+    pool = ConnectionPool(UNREACHABLE, min_size=0, max_size=1, connect_retries=5)
+    started = time.monotonic()
+    with pytest.raises(PoolError, match="unreachable"):
+        with pool.connection():
+            pass
+    assert time.monotonic() - started < 1
+    # The slot is given back
+    assert pool.slots.acquire(blocking=False)
+
+
+def test_other_threads_wait_for_a_free_connection():
+    pool = ConnectionPool(UNREACHABLE, min_size=0, max_size=1)
+    pool.slots.acquire()
+    started = time.monotonic()
+    with pytest.raises(PoolError, match="after 0.2 seconds"):
+        with pool.connection(timeout=0.2):
+            pass
+    assert time.monotonic() - started >= 0.2
@@ -0,0 +1,344 @@
+import logging
+import threading
+from contextlib import contextmanager
+
+import psycopg2
+import pytest
+from psycopg2.pool import PoolError
+from scrapy.utils.test import get_crawler
+from twisted.internet import defer
+from twisted.python.failure import Failure
+
+from fbref_scraper.items import ClubItem
+from fbref_scraper.pipelines import database
+from fbref_scraper.pipelines.database import WRITERS, DatabasePipeline, TableWriter
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    rowcount = 0
+
+    def execute(self, sql, params=None):
+        self.conn.statements.append(sql)
+
+    def copy_expert(self, sql, file):
+        self.conn.statements.append(sql)
+        self.conn.copied.append(file.read())
+        # Every copied row counts as changed by the merge that follows
+        self.rowcount = self.conn.copied[-1].count("\n")
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    closed = False
+
+    def __init__(self):
+        self.statements = []
+        self.copied = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+class FakeSpider:
+    logger = logging.getLogger("test")
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    pipeline = DatabasePipeline(settings={}, skip_unchanged=False)
+    country_ids = {}
+
+    def resolve(conn, name, values):
+        # football.countries.country_name is a VARCHAR(30)
+        if any(value and len(value) > 30 for value in values):
+            raise psycopg2.DataError("value too long for type character varying(30)")
+        return {value: country_ids.setdefault(value, len(country_ids) + 1) for value in values}
+
+    pipeline.learned = []
+    monkeypatch.setattr(pipeline.dimensions, "resolve", resolve)
+    monkeypatch.setattr(pipeline.dimensions, "learn",
+                        lambda conn, name, values: pipeline.learned.append((name, values)))
+    pipeline.executed = []
+    monkeypatch.setattr(database, "execute_values",
+                        lambda cur, sql, rows, **kwargs: pipeline.executed.extend(rows))
+    return pipeline
+
+
+def test_bad_dimension_member_only_drops_its_rows(pipeline):
+    rows = [("Premier League", "England"), ("Bad League", "x" * 40), ("La Liga", "Spain")]
+    conn = FakeConnection()
+    pipeline.merge_writes = False
+
+    failed, unchanged, _ = pipeline._write_batch(conn, WRITERS["LeagueItem"], rows, FakeSpider())
+
+    assert failed == 1
+    assert {row[0] for row in pipeline.executed} == {"Premier League", "La Liga"}
+    assert all(isinstance(row[1], int) for row in pipeline.executed)
+    assert conn.rollbacks >= 1
+    assert pipeline.learned == [("leagues", {"Premier League", "La Liga"})]
+
+
+def test_failed_fallback_commit_drops_rows_instead_of_raising(pipeline, monkeypatch):
+    conn = FakeConnection()
+    pipeline.merge_writes = False
+
+    def fail_commit():
+        raise psycopg2.IntegrityError("commit failed")
+
+    monkeypatch.setattr(conn, "commit", fail_commit)
+    rows = [("Premier League", "England")]
+    failed, _, _ = pipeline._write_batch(conn, WRITERS["LeagueItem"], rows, FakeSpider())
+    assert failed == 1
+    assert pipeline.learned == []
+
+
+def test_stat_tables_are_created_before_their_first_batch(pipeline):
+    writer = next(writer for writer in WRITERS.values() if writer.ddl)
+    conn = FakeConnection()
+    pipeline._create_table(conn, writer)
+    pipeline._create_table(conn, writer)
+    pipeline._create_table(conn, WRITERS["LeagueItem"])
+    assert conn.statements == [writer.ddl]
+
+
+def test_league_writer_updates_country():
+    writer = WRITERS["LeagueItem"]
+    assert writer.dimension == "leagues"
+    assert writer.on_conflict.startswith("ON CONFLICT (league_name) DO UPDATE SET country_id")
+
+
+def test_club_writer_updates_renamed_clubs():
+    writer = WRITERS["ClubItem"]
+    assert writer.on_conflict.startswith("ON CONFLICT (club_id) DO UPDATE SET club_name")
+    assert writer.key(("822bd0ba", "Liverpool")) == ("822bd0ba",)
+
+
+def test_only_writers_that_apply_changes_are_fingerprinted():
+    assert WRITERS["ClubItem"].fingerprinted and WRITERS["CountryItem"].fingerprinted
+    ignored = TableWriter(table="t", fields=("a", "b"), columns=("a", "b"), natural_key=("a",))
+    assert not ignored.fingerprinted
+
+
+def test_on_conflict_skips_unchanged_rows():
+    writer = TableWriter(table="t", fields=("a", "b", "c"), columns=("id", "b", "c"),
+                         conflict=("id",))
+    assert writer.on_conflict == (
+        "ON CONFLICT (id) DO UPDATE SET b = EXCLUDED.b, c = EXCLUDED.c "
+        "WHERE (target.b, target.c) IS DISTINCT FROM (EXCLUDED.b, EXCLUDED.c)"
+    )
+    assert TableWriter(table="t", fields=("a",), columns=("a",)).on_conflict == "ON CONFLICT DO NOTHING"
+
+
+def test_dedupe_keeps_last_row_per_key():
+    writer = TableWriter(table="t", fields=("a", "b"), columns=("id", "b"), conflict=("id",))
+    assert writer.dedupe([(1, "x"), (2, "y"), (1, "z")]) == [(1, "z"), (2, "y")]
+    keyless = TableWriter(table="t", fields=("a",), columns=("a",))
+    assert keyless.dedupe([(1,), (1,)]) == [(1,), (1,)]
+
+
+def test_copy_value_escapes_the_text_format():
+    assert database._copy_value(None) == "\\N"
+    assert database._copy_value(7) == "7"
+    assert database._copy_value("a\\b\tc\nd\re") == "a\\\\b\\tc\\nd\\re"
+    # A literal backslash-N stays text instead of turning into NULL
+    assert database._copy_value("\\N") == "\\\\N"
+
+
+def test_merge_copies_into_staging_and_upserts_from_it():
+    conn = FakeConnection()
+    writer = WRITERS["ClubItem"]
+    changed = writer.merge(conn.cursor(), [("822bd0ba", "Liverpool"), ("8ef52968", None)])
+
+    create, copy, insert = conn.statements
+    assert create == (
+        "CREATE TEMP TABLE IF NOT EXISTS staging_football_clubs ON COMMIT DELETE ROWS "
+        "AS SELECT club_id, club_name FROM football.clubs WITH NO DATA"
+    )
+    assert copy == "COPY staging_football_clubs (club_id, club_name) FROM STDIN"
+    assert conn.copied == ["822bd0ba\tLiverpool\n8ef52968\t\\N\n"]
+    assert insert == (
+        "INSERT INTO football.clubs AS target (club_id, club_name) "
+        "SELECT club_id, club_name FROM staging_football_clubs " + writer.on_conflict
+    )
+    assert changed == 2
+
+
+class FakePool:
+    released = False
+
+    @contextmanager
+    def connection(self):
+        yield FakeConnection()
+
+    def release(self):
+        self.released = True
+
+
+@pytest.fixture
+def buffered(monkeypatch):
+    """A sync pipeline whose batches are recorded instead of written."""
+    pipeline = DatabasePipeline(settings={}, batch_size=3, flush_interval=5.0,
+                                skip_unchanged=False)
+    pipeline.pool = FakePool()
+    pipeline.batches = []
+    pipeline.failures = []
+
+    def write(writer, rows, spider):
+        if pipeline.failures:
+            raise pipeline.failures.pop(0)
+        pipeline.batches.append(list(rows))
+        return 0, 0, 0.0
+
+    monkeypatch.setattr(pipeline, "_write", write)
+    return pipeline
+
+
+def club(i):
+    return ClubItem(club_id=f"{i:08x}", club_name=f"Club {i}")
+
+
+def test_full_buffer_is_flushed(buffered):
+    for i in range(4):
+        buffered.process_item(club(i), FakeSpider())
+    assert [len(batch) for batch in buffered.batches] == [3]
+    assert buffered.buffers["ClubItem"] == [("00000003", "Club 3")]
+    assert buffered.pending_rows == 1
+
+
+def test_old_buffer_is_flushed_by_the_timer(buffered, monkeypatch):
+    buffered.process_item(club(1), FakeSpider())
+    buffered._flush_expired(FakeSpider())
+    assert buffered.batches == []
+
+    buffered.last_flush["ClubItem"] -= 5.0
+    buffered._flush_expired(FakeSpider())
+    assert buffered.batches == [[("00000001", "Club 1")]]
+
+
+def test_close_flushes_what_is_left(buffered):
+    pool = buffered.pool
+    buffered.process_item(club(1), FakeSpider())
+    assert buffered.close_spider(FakeSpider()) is None
+    assert buffered.batches == [[("00000001", "Club 1")]]
+    assert pool.released and buffered.pool is None
+
+
+def test_batch_without_a_connection_is_kept_and_retried(buffered):
+    buffered.failures.append(PoolError("No database connection free"))
+    for i in range(3):
+        buffered.process_item(club(i), FakeSpider())
+    assert buffered.batches == []
+    assert len(buffered.buffers["ClubItem"]) == 3 and buffered.pending_rows == 3
+
+    # Not retried on every new row, only after the flush interval
+    buffered.process_item(club(3), FakeSpider())
+    assert buffered.batches == []
+    buffered.retry_at["ClubItem"] = 0
+    buffered.process_item(club(4), FakeSpider())
+    assert [row[0] for row in buffered.batches[0]] == [f"{i:08x}" for i in range(5)]
+    assert buffered.pending_rows == 0
+
+
+def test_failed_batch_is_only_dropped_once_the_spider_closes(buffered):
+    buffered.stats = get_crawler().stats
+    rows = [("00000001", "Club 1")]
+    buffered.pending_rows = 1
+    failure = Failure(psycopg2.OperationalError("server closed the connection"))
+
+    buffered._batch_failed(failure, rows, "ClubItem", FakeSpider())
+    assert buffered.buffers["ClubItem"] == rows and buffered.pending_rows == 1
+
+    buffered.buffers.clear()
+    buffered.closing = True
+    buffered._batch_failed(failure, rows, "ClubItem", FakeSpider())
+    assert "ClubItem" not in buffered.buffers and buffered.pending_rows == 0
+    assert buffered.stats.get_value("database/rows_dropped") == 1
+    assert buffered.stats.get_value("database/rows_failed") is None
+
+
+def test_fingerprints_are_loaded_for_written_tables_only(monkeypatch):
+    pipeline = DatabasePipeline(settings={}, batch_size=10)
+    pipeline.pool = FakePool()
+    loads = []
+
+    def load(conn, table):
+        loads.append(table)
+        pipeline.fingerprints.loaded.add(table)
+        return 0
+
+    monkeypatch.setattr(pipeline.fingerprints, "load", load)
+    for i in range(3):
+        pipeline.process_item(club(i), FakeSpider())
+    assert loads == ["football.clubs"]
+
+
+class FakeThreadPool:
+    stopped = False
+
+    def stop(self):
+        self.stopped = True
+
+
+@pytest.fixture
+def threaded(monkeypatch):
+    """An async pipeline whose writes wait until the test runs them on a thread."""
+    pipeline = DatabasePipeline(settings={}, batch_size=2, async_writes=True,
+                                queue_size=4, skip_unchanged=False, stats=get_crawler().stats)
+    pipeline.pool = FakePool()
+    pipeline.threadpool = FakeThreadPool()
+    pipeline.calls = []
+
+    def defer_to_thread_pool(reactor, threadpool, f, *args):
+        d = defer.Deferred()
+        pipeline.calls.append((d, f, args))
+        return d
+
+    monkeypatch.setattr(database.threads, "deferToThreadPool", defer_to_thread_pool)
+    return pipeline
+
+
+def run_next_write(pipeline):
+    d, f, args = pipeline.calls.pop(0)
+    result = []
+    writer = threading.Thread(target=lambda: result.append(f(*args)))
+    writer.start()
+    writer.join()
+    d.callback(result[0])
+
+
+def test_writer_threads_hold_items_back_once_the_queue_is_full(threaded):
+    results = [threaded.process_item(club(i), FakeSpider()) for i in range(4)]
+    assert len(threaded.calls) == 2 and threaded.pending_rows == 4
+    assert [d.called for d in results] == [True, True, True, False]
+
+    run_next_write(threaded)
+    assert results[3].called and threaded.pending_rows == 2
+    assert threaded.stats.get_value("database/backpressure_waits") == 1
+    assert threaded.stats.get_value("database/rows_written") == 2
+
+
+def test_close_waits_for_writes_in_flight(threaded):
+    for i in range(3):
+        threaded.process_item(club(i), FakeSpider())
+    pool, threadpool = threaded.pool, threaded.threadpool
+
+    closed = threaded.close_spider(FakeSpider())
+    assert len(threaded.calls) == 2 and not closed.called
+    run_next_write(threaded)
+    run_next_write(threaded)
+    assert closed.called and not threaded.in_flight
+    assert pool.released and threadpool.stopped
+    assert threaded.stats.get_value("database/rows_written") == 3
@@ -0,0 +1,131 @@
+from types import SimpleNamespace
+
+import pytest
+from scrapy.http import HtmlResponse, Request
+from scrapy.signalmanager import SignalManager
+
+from fbref_scraper.dupefilters import PersistentDupeFilter, SeenPagesMiddleware, page_parsed
+from fbref_scraper.utils.bloom import BloomFilter
+
+TTLS = {"finished_season": 0, "squad": 6 * 3600, "current_season": 6 * 3600,
+        "history": 7 * 86400, "default": 86400}
+PLAYER = "https://fbref.com/en/players/e342ad68/Mohamed-Salah"
+SQUAD = "https://fbref.com/en/squads/822bd0ba/2020-2021/Liverpool-Stats"
+LEAGUE = "https://fbref.com/en/comps/9/2020-2021/2020-2021-Premier-League-Stats"
+
+
+def test_bloom_filter_persists_keys(tmp_path):
+    path = tmp_path / "seen.bloom"
+    bloom = BloomFilter(path, capacity=1000, error_rate=0.01)
+    assert bloom.add(b"a")
+    assert not bloom.add(b"a")
+    assert b"a" in bloom and b"b" not in bloom
+    bloom.close()
+
+    # Reopening keeps the keys and the size the file was made with
+    reopened = BloomFilter(path, capacity=10)
+    assert b"a" in reopened and reopened.bits == bloom.bits
+    reopened.close()
+
+
+def test_bloom_filter_false_positive_rate(tmp_path):
+    bloom = BloomFilter(tmp_path / "seen.bloom", capacity=5000, error_rate=0.01)
+    for i in range(5000):
+        bloom.add(f"in-{i}".encode())
+    false_positives = sum(f"out-{i}".encode() in bloom for i in range(10000))
+    assert false_positives < 200
+    bloom.close()
+
+
+def test_bloom_filter_rejects_other_files(tmp_path):
+    path = tmp_path / "other"
+    path.write_bytes(b"x" * 64)
+    with pytest.raises(ValueError):
+        BloomFilter(path)
+
+
+@pytest.fixture
+def dupefilter(tmp_path):
+    def make(**kwargs):
+        seen = BloomFilter(tmp_path / "seen.bloom", capacity=1000)
+        return PersistentDupeFilter(seen=seen, ttls=TTLS, spider_name="player_spider", **kwargs)
+    return make
+
+
+def parse(dupefilter, url, callback=None, status=200):
+    """Run a fake callback through SeenPagesMiddleware, as the engine would."""
+    signals = SignalManager()
+    signals.connect(dupefilter.page_parsed, signal=page_parsed)
+    middleware = SeenPagesMiddleware(SimpleNamespace(signals=signals))
+    response = HtmlResponse(url, status=status, body=b"<html></html>", request=Request(url))
+    return list(middleware.process_spider_output(response, callback or iter([{}]), None))
+
+
+def test_leaf_pages_parsed_earlier_are_skipped(dupefilter):
+    first = dupefilter()
+    assert not first.request_seen(Request(PLAYER))
+    parse(first, PLAYER)
+    parse(first, SQUAD)
+    first.close("finished")
+
+    second = dupefilter()
+    assert second.request_seen(Request(PLAYER))
+    assert second.request_seen(Request(SQUAD))
+    second.close("finished")
+
+
+def test_hub_and_start_requests_are_never_skipped(dupefilter):
+    first = dupefilter()
+    parse(first, LEAGUE)
+    parse(first, PLAYER)
+    first.close("finished")
+
+    second = dupefilter()
+    assert second.key(LEAGUE) is None
+    assert not second.request_seen(Request(LEAGUE))
+    assert not second.request_seen(Request(PLAYER, meta={"is_start_request": True}))
+    second.close("finished")
+
+
+def test_pages_are_remembered_only_after_the_callback_succeeded(dupefilter):
+    def failing():
+        yield {}
+        raise ValueError("bad page")
+
+    first = dupefilter()
+    with pytest.raises(ValueError):
+        parse(first, PLAYER, failing())
+    parse(first, SQUAD, status=500)
+    # Fetching alone is not enough
+    first.request_seen(Request(PLAYER))
+    first.close("finished")
+
+    second = dupefilter()
+    assert not second.request_seen(Request(PLAYER))
+    assert not second.request_seen(Request(SQUAD))
+    second.close("finished")
+
+
+def test_ignore_fetches_everything_but_still_records(dupefilter):
+    first = dupefilter()
+    parse(first, PLAYER)
+    first.close("finished")
+
+    ignoring = dupefilter(ignore=True)
+    assert not ignoring.request_seen(Request(PLAYER))
+    parse(ignoring, SQUAD)
+    ignoring.close("finished")
+
+    third = dupefilter()
+    assert third.request_seen(Request(PLAYER)) and third.request_seen(Request(SQUAD))
+    third.close("finished")
+
+
+def test_keys_expire_with_the_ttl(dupefilter):
+    filter_ = dupefilter()
+    current_squad = "https://fbref.com/en/squads/822bd0ba/Liverpool-Stats"
+    assert filter_.key(current_squad, now=0) == filter_.key(current_squad, now=6 * 3600 - 1)
+    assert filter_.key(current_squad, now=0) != filter_.key(current_squad, now=6 * 3600)
+    # Finished seasons never expire
+    assert filter_.key(SQUAD, now=0) == filter_.key(SQUAD, now=10 ** 9)
+    filter_.close("finished")
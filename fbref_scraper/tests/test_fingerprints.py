@@ -0,0 +1,76 @@
+import threading
+
+from fbref_scraper.utils.fingerprints import FingerprintIndex, TableHashes
+
+
+class StoredRows:
+    """Connection whose named cursor returns stored (key_hash, fingerprint) rows."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    def cursor(self, name=None):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params):
+        self.queries.append(params)
+
+    def __iter__(self):
+        return iter(sorted(self.rows))
+
+    def commit(self):
+        pass
+
+
+def test_unchanged_only_after_remember():
+    index = FingerprintIndex()
+    key, row = ("p1",), ("p1", "Bukayo", "Saka")
+    assert not index.is_unchanged("players", key, row)
+
+    key_hash, fingerprint = index.fingerprint(key, row)
+    index.remember("players", {key_hash: fingerprint})
+    assert index.is_unchanged("players", key, row)
+    assert not index.is_unchanged("players", key, ("p1", "Bukayo", "Saka Jr"))
+    assert not index.is_unchanged("clubs", key, row)
+
+
+def test_remember_from_threads_while_reading():
+    index = FingerprintIndex()
+    rows = [((f"p{i}",), (f"p{i}", i)) for i in range(2000)]
+
+    def write(part):
+        for key, row in part:
+            index.remember("players", dict([index.fingerprint(key, row)]))
+
+    threads = [threading.Thread(target=write, args=(rows[i::4],)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    while any(thread.is_alive() for thread in threads):
+        index.is_unchanged("players", *rows[0])
+    for thread in threads:
+        thread.join()
+    assert all(index.is_unchanged("players", key, row) for key, row in rows)
+
+
+def test_load_reads_one_table_into_sorted_arrays():
+    index = FingerprintIndex()
+    stored = dict(index.fingerprint((f"p{i}",), (f"p{i}", i)) for i in range(500))
+    conn = StoredRows(list(stored.items()))
+    # A row written while the table was loading wins over the stored one
+    newer = dict([index.fingerprint(("p3",), ("p3", "changed"))])
+    index.remember("players", newer)
+
+    assert index.load(conn, "players") == 500
+    assert conn.queries == [("players",)]
+    assert "players" in index.loaded and "clubs" not in index.loaded
+    assert isinstance(index.hashes["players"], TableHashes)
+    assert all(index.is_unchanged("players", (f"p{i}",), (f"p{i}", i)) for i in range(500) if i != 3)
+    assert index.is_unchanged("players", ("p3",), ("p3", "changed"))
+    assert not index.is_unchanged("players", ("p500",), ("p500", 500))
@@ -0,0 +1,50 @@
+import logging
+
+import pytest
+from scrapy.exceptions import DropItem
+
+from fbref_scraper.items import ClubItem, ClubRecord, PlayerItem, PlayerStatsItem
+from fbref_scraper.pipelines.fused import FusedPipeline, ItemPlan, _declared_fields
+from fbref_scraper.pipelines.validation import ValidationPipeline
+
+
+class FakeSpider:
+    name = "test"
+    logger = logging.getLogger("test")
+
+
+@pytest.fixture
+def pipeline():
+    # No database pool: items are cleaned and validated, then passed on
+    return FusedPipeline(settings={}, skip_unchanged=False)
+
+
+@pytest.mark.parametrize("item_class", [ClubItem, ClubRecord])
+def test_clubs_pass_validation(pipeline, item_class):
+    item = item_class(club_id="18bb7c10", club_name="  Arsenal ")
+    assert pipeline.process_item(item, FakeSpider()) is item
+    assert ValidationPipeline().process_item(item, FakeSpider()) is item
+
+
+def test_club_without_name_is_dropped(pipeline):
+    with pytest.raises(DropItem, match="club_name"):
+        pipeline.process_item(ClubItem(club_id="18bb7c10"), FakeSpider())
+
+
+def test_player_is_cleaned(pipeline):
+    item = PlayerItem(player_id="https://fbref.com/en/players/bc7dc64d/Bukayo-Saka",
+                      url=" https://fbref.com/en/players/bc7dc64d/Bukayo-Saka ",
+                      first_name="Bukayo \n Ayoyinka")
+    pipeline.process_item(item, FakeSpider())
+    assert item["player_id"] == "bc7dc64d"
+    assert item["url"] == "https://fbref.com/en/players/bc7dc64d/Bukayo-Saka"
+    assert item["first_name"] == "Bukayo Ayoyinka"
+
+
+@pytest.mark.parametrize("item_class", [ClubItem, PlayerItem, PlayerStatsItem])
+def test_plans_only_touch_declared_fields(item_class):
+    plan = ItemPlan.build(item_class)
+    declared = _declared_fields(item_class)
+    touched = {*plan.text_fields, *plan.numeric_fields, *plan.required,
+               *(name for name, _ in plan.converters), *(name for name, _ in plan.id_fields)}
+    assert touched <= declared
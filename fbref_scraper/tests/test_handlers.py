@@ -0,0 +1,99 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from scrapy import Request
+from scrapy.core.downloader.handlers import DownloadHandlers
+from scrapy.exceptions import DownloadCancelledError, NotConfigured
+from scrapy.settings import Settings
+from scrapy.utils.test import get_crawler
+
+from fbref_scraper import handlers
+from fbref_scraper.handlers import CurlCffiDownloadHandler
+
+BODY = b"<html>" + b"x" * 2000 + b"</html>"
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        if self.path != "/unknown-length":
+            self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PageHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+def download(request, **kwargs):
+    handler = CurlCffiDownloadHandler("chrome", retry_times=0, **kwargs)
+
+    async def run():
+        try:
+            return await handler._download(request)
+        finally:
+            await handler._close()
+
+    return asyncio.run(run())
+
+
+def test_sets_download_latency(server):
+    request = Request(f"{server}/page")
+    response = download(request)
+    assert response.body == BODY
+    assert 0 < request.meta["download_latency"] < 5
+
+
+@pytest.mark.parametrize("path", ["/page", "/unknown-length"])
+def test_cancels_downloads_larger_than_maxsize(server, path):
+    with pytest.raises(DownloadCancelledError):
+        download(Request(f"{server}{path}"), maxsize=1000)
+
+
+def test_meta_maxsize_overrides_setting(server):
+    request = Request(f"{server}/page", meta={"download_maxsize": 0})
+    assert download(request, maxsize=1000).body == BODY
+
+
+def test_warns_about_large_responses(server, caplog):
+    download(Request(f"{server}/unknown-length"), warnsize=1000)
+    assert "download warn size (1000)" in caplog.text
+
+
+def project_crawler(**settings):
+    project = Settings()
+    project.setmodule("fbref_scraper.settings")
+    project.update(settings)
+    return get_crawler(settings_dict=project.copy_to_dict())
+
+
+def test_project_downloads_through_curl_on_the_asyncio_reactor():
+    crawler = project_crawler(CURL_RETRY_TIMES=5, CURL_MAX_CONNECTIONS_PER_HOST=2)
+    assert crawler.settings["TWISTED_REACTOR"] == (
+        "twisted.internet.asyncioreactor.AsyncioSelectorReactor"
+    )
+    handlers = DownloadHandlers(crawler)
+    for scheme in ("http", "https"):
+        handler = handlers._get_handler(scheme)
+        assert isinstance(handler, CurlCffiDownloadHandler)
+    assert handler.retry_times == 5 and handler.max_connections == 2
+    assert handler.user_agent == crawler.settings["USER_AGENT"].encode()
+
+
+def test_handler_needs_the_asyncio_reactor(monkeypatch):
+    crawler = project_crawler()
+    monkeypatch.setattr(handlers, "is_asyncio_reactor_installed", lambda: False)
+    with pytest.raises(NotConfigured, match="asyncio Twisted reactor"):
+        CurlCffiDownloadHandler.from_crawler(crawler)
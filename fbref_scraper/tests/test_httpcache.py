@@ -0,0 +1,119 @@
+import os
+
+import pytest
+from scrapy import Request, Spider
+from scrapy.http import HtmlResponse
+from scrapy.utils.test import get_crawler
+
+from fbref_scraper.httpcache import FbrefCacheStorage
+
+DAY = 86400
+SQUAD = "https://fbref.com/en/squads/822bd0ba/Liverpool-Stats"
+OLD_SEASON = "https://fbref.com/en/squads/822bd0ba/2010-2011/Liverpool-Stats"
+HISTORY = "https://fbref.com/en/comps/9/history/Premier-League-Seasons"
+PLAYER = "https://fbref.com/en/players/bc7dc64d/Bukayo-Saka"
+
+
+def open_storage(tmp_path, **settings):
+    crawler = get_crawler(Spider, {
+        "HTTPCACHE_DIR": str(tmp_path / "httpcache"),
+        "HTTPCACHE_EXPIRATION_SECS": DAY,
+        "HTTPCACHE_TTLS": {"finished_season": 0, "history": 7 * DAY, "squad": 3600},
+        "HTTPCACHE_MAX_SIZE": 0,
+        **settings,
+    })
+    spider = Spider.from_crawler(crawler, "test")
+    storage = FbrefCacheStorage(crawler.settings)
+    storage.open_spider(spider)
+    return storage, spider
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage, spider = open_storage(tmp_path)
+    yield storage, spider
+    storage.close_spider(spider)
+
+
+def store(storage, spider, url, body):
+    request = Request(url)
+    storage.store_response(spider, request, HtmlResponse(url, body=body, request=request))
+
+
+def retrieve(storage, spider, url):
+    return storage.retrieve_response(spider, Request(url))
+
+
+def age(storage, seconds):
+    storage.db.execute("UPDATE responses SET stored_at = stored_at - ?", (seconds,))
+
+
+def body_count(storage):
+    return storage.db.execute("SELECT COUNT(*) FROM bodies").fetchone()[0]
+
+
+def test_entries_expire_per_page_class(storage):
+    storage, spider = storage
+    for url in (SQUAD, OLD_SEASON, HISTORY, PLAYER):
+        store(storage, spider, url, url.encode())
+    assert retrieve(storage, spider, SQUAD).body == SQUAD.encode()
+
+    age(storage, 2 * 3600)
+    assert retrieve(storage, spider, SQUAD) is None
+    assert retrieve(storage, spider, PLAYER) is not None
+
+    age(storage, 2 * DAY)
+    assert retrieve(storage, spider, PLAYER) is None
+    assert retrieve(storage, spider, HISTORY) is not None
+
+    # Finished seasons never expire
+    age(storage, 1000 * DAY)
+    assert retrieve(storage, spider, HISTORY) is None
+    assert retrieve(storage, spider, OLD_SEASON).body == OLD_SEASON.encode()
+
+
+def test_identical_bodies_are_stored_once(storage):
+    storage, spider = storage
+    store(storage, spider, SQUAD, b"<html>same</html>")
+    store(storage, spider, PLAYER, b"<html>same</html>")
+    assert body_count(storage) == 1
+    assert retrieve(storage, spider, SQUAD).body == retrieve(storage, spider, PLAYER).body
+
+
+def test_replaced_bodies_are_dropped_once_unused(storage):
+    storage, spider = storage
+    store(storage, spider, SQUAD, b"<html>old</html>")
+    store(storage, spider, PLAYER, b"<html>old</html>")
+
+    store(storage, spider, SQUAD, b"<html>new</html>")
+    assert body_count(storage) == 2
+    store(storage, spider, PLAYER, b"<html>new</html>")
+    assert body_count(storage) == 1
+    assert retrieve(storage, spider, PLAYER).body == b"<html>new</html>"
+
+
+def test_least_recently_used_entries_are_evicted_to_90_percent(tmp_path):
+    storage, spider = open_storage(tmp_path, HTTPCACHE_MAX_SIZE=11_000)
+    urls = [f"{PLAYER}-{i}" for i in range(4)]
+    # Random bodies do not compress, so each takes a bit over 3000 bytes
+    for url in urls[:3]:
+        store(storage, spider, url, os.urandom(3000))
+    retrieve(storage, spider, urls[0])
+    assert storage.total_size() < 11_000
+
+    store(storage, spider, urls[3], os.urandom(3000))
+    assert storage.total_size() <= 9900
+    assert retrieve(storage, spider, urls[1]) is None
+    assert all(retrieve(storage, spider, url) for url in (urls[0], urls[2], urls[3]))
+    storage.close_spider(spider)
+
+
+def test_size_is_shared_between_processes(tmp_path):
+    first, spider = open_storage(tmp_path, HTTPCACHE_MAX_SIZE=10_000)
+    second, _ = open_storage(tmp_path, HTTPCACHE_MAX_SIZE=10_000)
+    store(first, spider, SQUAD, os.urandom(6000))
+    store(second, spider, PLAYER, os.urandom(6000))
+    assert second.total_size() <= 9000
+    assert retrieve(first, spider, SQUAD) is None
+    first.close_spider(spider)
+    second.close_spider(spider)
@@ -0,0 +1,82 @@
+from scrapy.http import HtmlResponse, Request
+from scrapy.settings import Settings
+
+from fbref_scraper.items import ColumnBatchItem
+from fbref_scraper.orchestrator import UrlQueue
+from fbref_scraper.spiders.statistics_spider import StatisticsSpider
+from fbref_scraper.throttle import AdaptiveRateMiddleware
+
+from test_columns import PAGE, season_row
+
+
+def test_url_queue_hands_out_each_url_once():
+    queue = UrlQueue("squad_spider")
+    notified = []
+    queue.listen(lambda: notified.append(len(queue)))
+
+    assert queue.put("https://fbref.com/a", {"season": "2024-2025"})
+    assert not queue.put("https://fbref.com/a")
+    assert queue.put("https://fbref.com/b")
+    assert notified == [1, 2]
+    assert queue.take() == [("https://fbref.com/a", {"season": "2024-2025"}),
+                            ("https://fbref.com/b", {})]
+    assert queue.take() == []
+    # Taken URLs still count as seen
+    assert not queue.put("https://fbref.com/a")
+
+    assert not queue.done
+    queue.close()
+    assert queue.done
+    assert not queue.put("https://fbref.com/c")
+    assert notified == [1, 2, 0]
+
+
+def middleware(group):
+    return AdaptiveRateMiddleware(start_delay=6.0, min_delay=2.0, max_delay=120.0,
+                                  probe_after=20, target_latency=3.0,
+                                  domains=AdaptiveRateMiddleware.shared_domains(group))
+
+
+def test_stages_of_a_run_share_rate_control():
+    league, squad = middleware("run-1"), middleware("run-1")
+    other_run = middleware("run-2")
+    request = Request("https://fbref.com/en/comps/9/Premier-League-Stats")
+    response = HtmlResponse(request.url, status=429, body=b"")
+
+    league.process_response(request, response, None)
+    assert squad._state(request) is league._state(request)
+    assert squad._state(request).bucket.paused_until > 0
+    assert other_run._state(request).bucket.paused_until == 0
+    AdaptiveRateMiddleware.release_group("run-1")
+    AdaptiveRateMiddleware.release_group("run-2")
+
+
+def test_standalone_crawlers_keep_their_own_state():
+    request = Request("https://fbref.com/en/comps/9/Premier-League-Stats")
+    assert middleware(None)._state(request) is not middleware(None)._state(request)
+
+
+def statistics(columnar, body=PAGE):
+    spider = StatisticsSpider()
+    spider.settings = Settings({"COLUMNAR_ITEMS": columnar})
+    response = HtmlResponse("https://fbref.com/en/players/bc7dc64d/Bukayo-Saka", body=body)
+    return list(spider.parse(response))
+
+
+def test_statistics_columnar_and_row_output_agree():
+    rows = statistics(columnar=False)
+    [batch] = statistics(columnar=True)
+    assert isinstance(batch, ColumnBatchItem)
+    assert batch["batch"].column("season") == [row["season"] for row in rows]
+    assert [row["season"] for row in rows] == ["2022-2023", "2023-2024"]
+
+
+def test_statistics_read_only_the_league_table():
+    # Hidden tables share the season and club of the league rows
+    hidden = ("<!-- <table id='stats_shooting_dom_lg'><tbody>" + season_row("2023-2024", 0)
+              + "</tbody></table> --><!-- <table id='stats_standard_dom_cup'><tbody>"
+              + season_row("2023-2024", 3) + "</tbody></table> -->").encode()
+    body = PAGE.replace(b"</html>", hidden + b"</html>")
+    for columnar in (False, True):
+        assert statistics(columnar, body) == statistics(columnar)
+    assert [row["goals"] for row in statistics(False, body)] == [14, 16]
@@ -0,0 +1,66 @@
+from datetime import date
+
+import pytest
+
+from fbref_scraper.spiders.league_spider import LeagueSpider
+from fbref_scraper.utils.planner import UrlPlanner, parse_seasons
+
+TODAY = date(2025, 3, 1)
+
+
+def test_parse_seasons_expands_ranges_and_lists():
+    assert parse_seasons("2024-2025") == ["2024-2025"]
+    assert parse_seasons("2021-2022:2023-2024, 2010") == [
+        "2021-2022", "2022-2023", "2023-2024", "2010-2011"
+    ]
+
+
+@pytest.mark.parametrize("spec", ["2024-2025:2022-2023", "2024-2026", "24-25"])
+def test_parse_seasons_rejects_bad_specs(spec):
+    with pytest.raises(ValueError):
+        parse_seasons(spec)
+
+
+def test_seasons_skip_years_the_competition_was_not_played():
+    seasons = UrlPlanner(today=TODAY).seasons("9", "1937-1938", "1947-1948")
+    assert seasons == ["1937-1938", "1938-1939", "1946-1947", "1947-1948"]
+
+
+def test_seasons_stop_at_the_season_in_progress():
+    assert UrlPlanner(today=TODAY).seasons("20", "2023-2024") == ["2023-2024", "2024-2025"]
+
+
+def test_season_urls_are_newest_first():
+    urls = list(UrlPlanner(today=TODAY).season_urls(["12"], "2022-2023", "2023-2024"))
+    assert [(u.comp_id, u.season) for u in urls] == [("12", "2023-2024"), ("12", "2022-2023")]
+    assert urls[0].url.endswith("/en/comps/12/2023-2024/2023-2024-La-Liga-Stats")
+
+
+def test_unknown_competition_is_a_value_error():
+    planner = UrlPlanner(today=TODAY)
+    with pytest.raises(ValueError, match="Unknown competition '99'"):
+        planner.seasons("99")
+    with pytest.raises(ValueError, match="Unknown competition"):
+        list(planner.season_urls(["9", "99"]))
+    assert not planner.is_valid("99", "2024-2025")
+    assert planner.is_valid("9", "2024-2025") and not planner.is_valid("9", "1940-1941")
+
+
+def test_league_spider_filters_competitions_without_seasons():
+    spider = LeagueSpider(competitions="9,12")
+    assert len(spider.start_urls) == 2
+    assert all("/comps/9/" in url or "/comps/12/" in url for url in spider.start_urls)
+
+
+def test_league_spider_plans_seasons_of_the_given_competitions():
+    spider = LeagueSpider(seasons="2022-2023:2023-2024", competitions="13")
+    assert [url.split("/")[-2] for url in spider.start_urls] == ["2022-2023", "2023-2024"]
+    assert all("/comps/13/" in url for url in spider.start_urls)
+
+
+@pytest.mark.parametrize("kwargs", [{"competitions": "99"},
+                                    {"seasons": "2024-2025", "competitions": "9,99"},
+                                    {"seasons": "2024-2025:2022-2023"}])
+def test_league_spider_rejects_bad_arguments(kwargs):
+    with pytest.raises(ValueError):
+        LeagueSpider(**kwargs)
@@ -0,0 +1,51 @@
+from fbref_scraper.items import PlayerItem
+from fbref_scraper.utils.players import PlayerRegistry
+
+SALAH = "https://fbref.com/en/players/e342ad68/Mohamed-Salah"
+LIVERPOOL = {"club": "Liverpool", "club_id": "822bd0ba", "season": "2024-2025", "league": None}
+ROMA = {"club": "Roma", "club_id": "cf74a709", "season": "2016-2017", "league": "Serie A"}
+
+
+def player(**fields):
+    return PlayerItem(player_id="e342ad68", url=SALAH, player_name="Mohamed Salah", **fields)
+
+
+def test_each_player_page_is_fetched_once():
+    registry = PlayerRegistry()
+    assert registry.add(SALAH, LIVERPOOL)
+    assert not registry.add(SALAH, ROMA)
+    assert not registry.add(SALAH + "?x", LIVERPOOL)
+    assert len(registry) == 1 and "e342ad68" in registry
+    assert registry.merged == 2
+    # None values are dropped from the context
+    assert registry.players["e342ad68"].context == {
+        "club": "Liverpool", "club_id": "822bd0ba", "season": "2024-2025"
+    }
+
+
+def test_resolve_gives_one_item_however_many_clubs():
+    registry = PlayerRegistry()
+    registry.add(SALAH, LIVERPOOL)
+    registry.add(SALAH, ROMA)
+
+    item = registry.resolve("e342ad68", player())
+    assert item["club"] == "Liverpool"
+    assert "season" not in item
+    # Sightings after the page was parsed are only counted
+    assert not registry.add(SALAH, {"club": "Chelsea", "season": "2014-2015"})
+    assert registry.merged == 2
+    assert registry.players["e342ad68"].context["club"] == "Liverpool"
+
+
+def test_resolve_keeps_fields_set_by_the_page():
+    registry = PlayerRegistry()
+    registry.add(SALAH, ROMA)
+    assert registry.resolve("e342ad68", player(club="Liverpool"))["club"] == "Liverpool"
+
+
+def test_resolve_of_a_player_never_added():
+    registry = PlayerRegistry()
+    item = registry.resolve("e342ad68", player())
+    assert "club" not in item
+    assert registry.players["e342ad68"].url == SALAH
+    assert registry.players["e342ad68"].context == {}
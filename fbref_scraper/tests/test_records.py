@@ -0,0 +1,61 @@
+from dataclasses import fields
+
+import pytest
+from itemadapter import ItemAdapter
+from scrapy.http import HtmlResponse
+from scrapy.settings import Settings
+
+from fbref_scraper import items
+from fbref_scraper.items import RECORDS, PlayerStatsItem, PlayerStatsRecord, item_class_name
+from fbref_scraper.pipelines.database import WRITERS
+from fbref_scraper.spiders.statistics_spider import StatisticsSpider
+
+from test_columns import PAGE
+
+
+def fresh(value: str) -> str:
+    """An equal string that is not the same object."""
+    return "".join(list(value))
+
+
+@pytest.mark.parametrize("item_type", sorted(RECORDS))
+def test_records_mirror_their_items(item_type):
+    record = RECORDS[item_type]
+    assert item_class_name(record()) == item_type
+    assert not hasattr(record(), "__dict__")
+    assert {f.name for f in fields(record)} == set(getattr(items, item_type).fields)
+
+
+def test_repeated_values_are_interned():
+    first = PlayerStatsRecord(player_id=fresh("bc7dc64d"), season=fresh("2023-2024"),
+                              club=fresh("Arsenal"), league=fresh("Premier League"))
+    second = PlayerStatsRecord(player_id=fresh("bc7dc64d"), season=fresh("2023-2024"),
+                               club=fresh("Arsenal"), league=fresh("Premier League"))
+    assert first.season is second.season
+    assert first.club is second.club and first.league is second.league
+    # Ids differ on nearly every row and are left alone
+    assert first.player_id is not second.player_id
+
+
+def test_records_and_items_give_the_same_row():
+    values = dict(player_id="bc7dc64d", season="2023-2024", club="Arsenal", goals=14,
+                  url="https://fbref.com/en/players/bc7dc64d/Bukayo-Saka")
+    writer = WRITERS["PlayerStatsItem"]
+    assert writer.record_row(PlayerStatsRecord(**values)) == writer.row(
+        ItemAdapter(PlayerStatsItem(**values))
+    )
+    assert item_class_name(PlayerStatsItem(**values)) == "PlayerStatsItem"
+
+
+def test_statistics_spider_yields_records_with_compact_items():
+    def parse(compact):
+        spider = StatisticsSpider()
+        spider.settings = Settings({"COMPACT_ITEMS": compact})
+        response = HtmlResponse("https://fbref.com/en/players/bc7dc64d/Bukayo-Saka", body=PAGE)
+        return list(spider.parse(response))
+
+    records, items = parse(True), parse(False)
+    assert all(isinstance(record, PlayerStatsRecord) for record in records)
+    assert [ItemAdapter(record).asdict() for record in records] == [
+        {name: item.get(name) for name in PlayerStatsItem.fields} for item in items
+    ]
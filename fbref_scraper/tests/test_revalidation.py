@@ -0,0 +1,74 @@
+import pytest
+from scrapy import Request, Spider
+from scrapy.http import HtmlResponse
+from scrapy.utils.test import get_crawler
+
+from fbref_scraper.httpcache import FbrefCacheStorage
+from fbref_scraper.middlewares import FbrefScraperDownloaderMiddleware
+
+URL = "https://fbref.com/en/comps/9/Premier-League-Stats"
+
+
+@pytest.fixture
+def middleware(tmp_path):
+    crawler = get_crawler(Spider, {"HTTPCACHE_DIR": str(tmp_path / "httpcache"),
+                                   "HTTPCACHE_EXPIRATION_SECS": 1})
+    spider = Spider.from_crawler(crawler, "test")
+    middleware = FbrefScraperDownloaderMiddleware(str(tmp_path / "revalidation"),
+                                                  FbrefCacheStorage(crawler.settings))
+    middleware.spider_opened(spider)
+    yield middleware, spider
+    middleware.spider_closed(spider)
+
+
+def page(flags=None, status=200, etag='"v1"'):
+    return HtmlResponse(URL, status=status, body=b"<html>table</html>" if status == 200 else b"",
+                        headers={"ETag": etag}, flags=flags or [])
+
+
+def stored(middleware):
+    return middleware.db.execute("SELECT COUNT(*) FROM validators").fetchone()[0]
+
+
+def revalidate(middleware, spider, response):
+    request = Request(URL)
+    middleware.process_request(request, spider)
+    assert request.headers[b"If-None-Match"] == b'"v1"'
+    return middleware.process_response(request, response, spider)
+
+
+def test_cache_hits_are_not_stored(middleware):
+    middleware, spider = middleware
+    request = Request(URL)
+    response = page(flags=["cached"])
+    assert middleware.process_response(request, response, spider) is response
+    assert stored(middleware) == 0
+
+
+def test_not_modified_answered_from_the_http_cache(middleware):
+    middleware, spider = middleware
+    request = Request(URL)
+    middleware.process_response(request, page(), spider)
+    middleware.storage.store_response(spider, request, page())
+    # Expired entries still answer a 304
+    middleware.storage.db.execute("UPDATE responses SET stored_at = stored_at - 3600")
+    assert middleware.storage.retrieve_response(spider, request) is None
+
+    response = revalidate(middleware, spider, page(status=304, etag='"v2"'))
+    assert response.status == 200
+    assert response.body == b"<html>table</html>"
+    assert response.headers[b"ETag"] == b'"v2"'
+    assert "not_modified" in response.flags
+    assert middleware.db.execute("SELECT etag FROM validators").fetchone()[0] == b'"v2"'
+
+
+def test_not_modified_refetched_once_the_cache_dropped_the_page(middleware):
+    middleware, spider = middleware
+    middleware.process_response(Request(URL), page(), spider)
+
+    retry = revalidate(middleware, spider, page(status=304))
+    assert isinstance(retry, Request)
+    assert retry.dont_filter and retry.meta["dont_revalidate"]
+    assert b"If-None-Match" not in retry.headers
+    middleware.process_request(retry, spider)
+    assert b"If-None-Match" not in retry.headers
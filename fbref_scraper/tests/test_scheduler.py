@@ -0,0 +1,117 @@
+import math
+
+import pytest
+from scrapy import Request, Spider, signals
+from scrapy.http import HtmlResponse
+from scrapy.utils.test import get_crawler
+
+from fbref_scraper.scheduler import PageHistory, RequestBudget, StalenessScheduler
+
+DAY = 86400
+SQUAD = "https://fbref.com/en/squads/822bd0ba/Liverpool-Stats"
+OLD_SEASON = "https://fbref.com/en/squads/822bd0ba/2010-2011/Liverpool-Stats"
+INTERVALS = {"finished_season": 0, "squad": 7 * DAY, "default": 14 * DAY}
+
+
+@pytest.fixture
+def history(tmp_path):
+    history = PageHistory(tmp_path / "history.sqlite")
+    yield history
+    history.close()
+
+
+def test_history_records_changes(history):
+    assert not history.record(SQUAD, b"a", now=100)
+    assert history.get(SQUAD) == (100, 100)
+    assert not history.record(SQUAD, b"a", now=200)
+    assert not history.record(SQUAD, None, now=300)
+    assert history.get(SQUAD) == (300, 100)
+    assert history.record(SQUAD, b"b", now=400)
+    assert history.get(SQUAD) == (400, 400)
+
+
+def test_score(history):
+    scheduler = StalenessScheduler.__new__(StalenessScheduler)
+    scheduler.history, scheduler.intervals = history, INTERVALS
+
+    assert scheduler.score(SQUAD) == 1.0
+    history.record(SQUAD, b"a", now=0)
+    assert scheduler.score(SQUAD, now=0) == 0.0
+    assert scheduler.score(SQUAD, now=7 * DAY) == pytest.approx(1 - math.exp(-1))
+    assert scheduler.score(SQUAD, now=1) < scheduler.score(SQUAD, now=DAY) < 1
+
+    # Unchanged for longer than the interval: taken to change that rarely
+    history.record(SQUAD, b"a", now=70 * DAY)
+    assert scheduler.score(SQUAD, now=77 * DAY) == pytest.approx(1 - math.exp(-0.1))
+
+    # Finished seasons never change once fetched
+    history.record(OLD_SEASON, b"a", now=0)
+    assert scheduler.score(OLD_SEASON, now=1000 * DAY) == 0.0
+
+
+def test_request_budget():
+    budget = RequestBudget(2)
+    assert not budget.exhausted
+    budget.spend()
+    budget.spend()
+    assert budget.exhausted
+    budget.refund()
+    assert not budget.exhausted and budget.spent == 1
+
+    unlimited = RequestBudget()
+    for _ in range(10):
+        unlimited.spend()
+    assert not unlimited.exhausted
+
+
+def open_scheduler(tmp_path, budget=None, **settings):
+    crawler = get_crawler(Spider, {
+        "STALENESS_HISTORY_FILE": str(tmp_path / "history.sqlite"),
+        "SCHEDULER_PRIORITY_QUEUE": "scrapy.pqueues.ScrapyPriorityQueue",
+        **settings,
+    })
+    crawler.spider = Spider.from_crawler(crawler, "test")
+    crawler.spider.request_budget = budget
+    scheduler = StalenessScheduler.from_crawler(crawler)
+    scheduler.open(crawler.spider)
+    return crawler, scheduler
+
+
+def fetch(crawler, scheduler, cached=False):
+    request = scheduler.next_request()
+    if request is not None and cached:
+        response = HtmlResponse(request.url, body=b"", request=request, flags=["cached"])
+        crawler.signals.send_catch_log(signals.response_received, response=response,
+                                       request=request, spider=crawler.spider)
+    return request
+
+
+def test_budget_counts_only_network_requests(tmp_path):
+    crawler, scheduler = open_scheduler(tmp_path, SCHEDULER_REQUEST_BUDGET=2)
+    for i in range(5):
+        scheduler.enqueue_request(Request(f"https://fbref.com/en/players/{i:08x}/P"))
+
+    assert fetch(crawler, scheduler, cached=True) is not None
+    assert fetch(crawler, scheduler) is not None
+    assert fetch(crawler, scheduler, cached=True) is not None
+    assert fetch(crawler, scheduler) is not None
+    assert fetch(crawler, scheduler) is None
+    assert not scheduler.has_pending_requests()
+    scheduler.close("finished")
+    assert crawler.stats.get_value("staleness/left_unscheduled") == 1
+
+
+def test_budget_is_shared_by_the_stages_of_a_run(tmp_path):
+    budget = RequestBudget(3)
+    first_crawler, first = open_scheduler(tmp_path / "a", budget)
+    second_crawler, second = open_scheduler(tmp_path / "b", budget)
+    for scheduler in (first, second):
+        for i in range(3):
+            scheduler.enqueue_request(Request(f"https://fbref.com/en/players/{i:08x}/P"))
+
+    assert fetch(first_crawler, first) and fetch(first_crawler, first)
+    assert fetch(second_crawler, second)
+    assert budget.spent == 3
+    assert fetch(first_crawler, first) is None and fetch(second_crawler, second) is None
+    first.close("finished")
+    second.close("finished")
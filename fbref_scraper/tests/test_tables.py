@@ -0,0 +1,81 @@
+from scrapy.http import HtmlResponse
+from scrapy.settings import Settings
+
+from fbref_scraper.items import PlayerStatsItem
+from fbref_scraper.spiders.statistics_spider import StatisticsSpider
+from fbref_scraper.utils.tables import extract_rows, page_tables
+
+from test_columns import season_row
+
+PAGE = b"""
+<html><body>
+<table id="stats_standard_9"><tbody>
+  <tr><th data-stat="player"><a href="/en/players/abcd1234/Bukayo-Saka">Bukayo Saka</a></th>
+      <td data-stat="goals"> 16 </td></tr>
+  <tr class="thead"><th data-stat="player">Player</th></tr>
+  <tr><th data-stat="player">Squad Total</th><td data-stat="goals">68</td></tr>
+</tbody></table>
+<div><!--
+<table id="stats_shooting_9"><tbody><tr><td data-stat="shots">90</td></tr></tbody></table>
+--></div>
+<table id="stats_keeper_9"><tbody></tbody></table>
+<!-- <p>not a table</p> -->
+<div><!--
+<table id="stats_passing_9"><tbody></tbody></table>
+--></div>
+</body></html>
+"""
+
+
+def response(body=PAGE):
+    return HtmlResponse("https://fbref.com/en/squads/18bb7c10/Arsenal-Stats", body=body)
+
+
+def test_hidden_tables_are_found_in_page_order():
+    tables = page_tables(response())
+    assert list(tables) == ["stats_standard_9", "stats_shooting_9",
+                            "stats_keeper_9", "stats_passing_9"]
+    assert [table.attrib["id"] for table in tables.find("_9")] == list(tables)
+    assert tables.first("shooting").attrib["id"] == "stats_shooting_9"
+    assert tables.first("defense") is None
+
+
+def test_page_tables_is_cached_per_response():
+    page = response()
+    assert page_tables(page) is page_tables(page)
+
+
+def test_page_without_hidden_tables():
+    page = response(b"<html><table id='a'><tbody></tbody></table></html>")
+    assert list(page_tables(page)) == ["a"]
+
+
+def test_extract_rows_reads_text_links_and_skips_header_rows():
+    rows = extract_rows(page_tables(response())["stats_standard_9"])
+    assert len(rows) == 2
+    assert rows[0].get("goals") == "16"
+    assert rows[0].links["player"] == "/en/players/abcd1234/Bukayo-Saka"
+    assert rows[0].labels["player"] == "Bukayo Saka"
+    assert rows[1].get("player") == "Squad Total"
+    assert rows[1].get("assists", "0") == "0"
+
+
+def test_statistics_spider_reads_the_league_table_row_by_row():
+    # The league table sits in a comment, after a cup table with the same columns
+    body = ("<html><table id='stats_standard_intl_cup'><tbody>" + season_row("2023-2024", 3)
+            + "</tbody></table><div><!-- <table id='stats_standard_dom_lg'><tbody>"
+            + season_row("2022-2023", 14) + season_row("2023-2024", 16)
+            + season_row("Career", 30, team="") + season_row("", 1)
+            + "</tbody></table> --></div></html>").encode()
+    spider = StatisticsSpider()
+    spider.settings = Settings({"COLUMNAR_ITEMS": False, "COMPACT_ITEMS": False})
+    url = "https://fbref.com/en/players/bc7dc64d/Bukayo-Saka"
+    items = list(spider.parse(HtmlResponse(url, body=body)))
+
+    assert all(isinstance(item, PlayerStatsItem) for item in items)
+    assert [(item["season"], item["goals"], item["club"]) for item in items] == [
+        ("2022-2023", 14, "Arsenal"), ("2023-2024", 16, "Arsenal"),
+    ]
+    assert {(item["player_id"], item["url"], item["league"]) for item in items} == {
+        ("bc7dc64d", url, "Premier League"),
+    }
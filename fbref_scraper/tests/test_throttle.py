@@ -0,0 +1,94 @@
+import pytest
+from scrapy.http import HtmlResponse, Request
+
+from fbref_scraper.throttle import AdaptiveRateMiddleware, HostRateBudget, hash_domain
+
+URL = "https://fbref.com/en/comps/9/Premier-League-Stats"
+
+
+@pytest.fixture
+def middleware():
+    return AdaptiveRateMiddleware(start_delay=6.0, min_delay=2.0, max_delay=120.0,
+                                  probe_after=2, target_latency=3.0)
+
+
+def fetch(middleware, latency=None, flags=None, status=200):
+    request = Request(URL)
+    if latency is not None:
+        request.meta["download_latency"] = latency
+    response = HtmlResponse(URL, status=status, body=b"<html></html>", flags=flags or [])
+    return middleware.process_response(request, response, None)
+
+
+def rate(middleware):
+    return middleware._state(Request(URL)).bucket.rate
+
+
+def test_fast_responses_raise_the_rate(middleware):
+    start = rate(middleware)
+    fetch(middleware, latency=0.5)
+    fetch(middleware, latency=0.5)
+    assert rate(middleware) > start
+
+
+def test_cache_hits_and_untimed_responses_do_not_count(middleware):
+    start = rate(middleware)
+    for _ in range(5):
+        fetch(middleware, flags=["cached"])
+        fetch(middleware)
+    assert rate(middleware) == start
+    assert middleware._state(Request(URL)).successes == 0
+
+
+def test_responses_slower_than_target_ease_off(middleware):
+    start = rate(middleware)
+    fetch(middleware, latency=3.5)
+    assert rate(middleware) == pytest.approx(start * 0.9)
+
+
+def test_429_halves_the_rate_even_without_timing(middleware):
+    start = rate(middleware)
+    fetch(middleware, status=429)
+    assert rate(middleware) == pytest.approx(start * 0.5)
+
+
+def colliding_domains(count: int) -> list[str]:
+    """Domains whose hashes point at the same host budget slot."""
+    wanted = hash_domain("fbref.com") % HostRateBudget.SLOTS
+    domains = ["fbref.com"]
+    number = 0
+    while len(domains) < count:
+        number += 1
+        domain = f"mirror{number}.fbref.com"
+        if hash_domain(domain) % HostRateBudget.SLOTS == wanted:
+            domains.append(domain)
+    return domains
+
+
+def test_host_budget_spaces_requests_per_domain(tmp_path):
+    budget = HostRateBudget(tmp_path / "budget", rate=1.0)
+    assert budget.reserve("fbref.com") == pytest.approx(0, abs=0.05)
+    assert budget.reserve("fbref.com") == pytest.approx(1, abs=0.05)
+    assert budget.reserve("fbref.com") == pytest.approx(2, abs=0.05)
+    budget.close()
+
+
+def test_host_budget_domains_sharing_a_slot_keep_their_own_time(tmp_path):
+    budget = HostRateBudget(tmp_path / "budget", rate=1.0)
+    first, second = colliding_domains(2)
+    budget.reserve(first)
+    budget.reserve(second)
+    assert budget.reserve(first) == pytest.approx(1, abs=0.05)
+    assert budget.reserve(second) == pytest.approx(1, abs=0.05)
+    budget.close()
+
+
+def test_host_budget_is_shared_through_the_file(tmp_path):
+    one = HostRateBudget(tmp_path / "budget", rate=1.0)
+    other = HostRateBudget(tmp_path / "budget", rate=1.0)
+    one.reserve("fbref.com")
+    assert other.reserve("fbref.com") == pytest.approx(1, abs=0.05)
+    one.close()
+    other.close()
+    # Closing twice is harmless
+    one.close()
@@ -0,0 +1,57 @@
+import pytest
+
+from fbref_scraper.utils.urls import (
+    FbrefUrl, PageType, extract_club_id, extract_club_name, extract_player_id, league_name, route,
+)
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("https://fbref.com/en/comps/", FbrefUrl(PageType.COMPETITIONS)),
+    ("https://fbref.com/en/comps/9/history/Premier-League-Seasons",
+     FbrefUrl(PageType.HISTORY, comp_id="9", slug="Premier-League")),
+    ("https://fbref.com/en/comps/9/Premier-League-Stats",
+     FbrefUrl(PageType.COMPETITION, comp_id="9", slug="Premier-League")),
+    ("https://www.fbref.com/en/comps/9/2024-2025/2024-2025-Premier-League-Stats",
+     FbrefUrl(PageType.COMPETITION_SEASON, comp_id="9", season="2024-2025", slug="Premier-League")),
+    ("https://fbref.com/en/comps/Big5/2023-2024/shooting/players/2023-2024-Big-5-European-Leagues-Stats",
+     FbrefUrl(PageType.COMPETITION_SEASON, comp_id="Big5", season="2023-2024",
+              slug="Big-5-European-Leagues")),
+    ("/en/squads/822bd0ba/2024-2025/Liverpool-Stats",
+     FbrefUrl(PageType.SQUAD, season="2024-2025", squad_id="822bd0ba", slug="Liverpool")),
+    ("https://fbref.com/en/squads/822bd0ba/Liverpool-Stats",
+     FbrefUrl(PageType.SQUAD, squad_id="822bd0ba", slug="Liverpool")),
+    ("https://fbref.com/en/players/e342ad68/Mohamed-Salah",
+     FbrefUrl(PageType.PLAYER, player_id="e342ad68", slug="Mohamed-Salah")),
+    ("https://fbref.com/en/players/e342ad68/matchlogs/2024-2025/Mohamed-Salah-Match-Logs",
+     FbrefUrl(PageType.PLAYER, season="2024-2025", player_id="e342ad68", slug="Mohamed-Salah")),
+    ("https://fbref.com/en/players/e342ad68/Mohamed-Salah?utm=x",
+     FbrefUrl(PageType.PLAYER, player_id="e342ad68", slug="Mohamed-Salah")),
+])
+def test_route(url, expected):
+    assert route(url) == expected
+
+
+@pytest.mark.parametrize("url", [
+    "https://example.com/en/players/e342ad68/Mohamed-Salah",
+    "https://fbref.com/de/players/e342ad68/Mohamed-Salah",
+    "https://fbref.com/en/squads/NOTANID/Liverpool-Stats",
+    "https://fbref.com/en/country/ENG/England-Football",
+    "",
+])
+def test_route_unknown(url):
+    assert route(url).page_type is PageType.UNKNOWN
+
+
+def test_route_properties():
+    page = route("/en/squads/b8fd03ef/2024-2025/Manchester-City-Stats")
+    assert page.name == "Manchester City"
+    assert page.season_end == 2025
+    assert route("https://fbref.com/en/comps/").season_end is None
+
+
+def test_extract_helpers():
+    assert extract_player_id("https://fbref.com/en/players/e342ad68/Mohamed-Salah") == "e342ad68"
+    assert extract_club_id("/en/squads/822bd0ba/2024-2025/Liverpool-Stats") == "822bd0ba"
+    assert extract_club_name("/en/squads/822bd0ba/2024-2025/Liverpool-Stats") == "Liverpool"
+    assert league_name("https://fbref.com/en/comps/12/history/La-Liga-Seasons") == "La Liga"
+    assert league_name("https://fbref.com/en/players/e342ad68/Mohamed-Salah") == "Unknown"